@@ -0,0 +1,4 @@
+"""Benchmark suite for the Novan lexical network editor.
+
+Run `python -m bench --help` from the repository root.
+"""
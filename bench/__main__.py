@@ -0,0 +1,76 @@
+"""Run the benchmark suite and compare it to a baseline.
+
+Examples:
+    python -m bench
+    python -m bench --sizes 1000 10000 100000 1000000 --output bench-results.json
+    python -m bench --save-baseline
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import tempfile
+from .suite import run, compare
+
+SIZES = [1000, 10000]
+BASELINE_PATH = "bench/baseline.json"
+TOLERANCE = .3
+
+def main(argv=None) -> int:
+    """Run the benchmarks.
+
+    Returns:
+        1 if a benchmark regressed compared to the baseline, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of verbs of the lexicons")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic lexicons")
+    parser.add_argument("-o", "--output", help="path of the JSON results, stdout if not provided")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the JSON baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+        help="relative slowdown above which a benchmark is a regression")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(args.sizes, directory, args.seed, log=lambda message: print(message, file=sys.stderr))
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+    except (OSError, ValueError, KeyError):
+        baseline = None
+    if baseline is not None:
+        report["comparison"] = compare(results, baseline, args.tolerance)
+        for name, comparison in report["comparison"].items():
+            flag = "  REGRESSION" if comparison["regression"] else ""
+            print(f"{name:40} {comparison['seconds'] * 1e6:12.1f} us  x{comparison['ratio']:.2f}{flag}",
+                file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text)
+    if args.save_baseline:
+        # the comparison with the previous baseline is not part of the new one
+        with open(args.baseline, "w") as file:
+            file.write(json.dumps({"meta": report["meta"], "results": results}, indent=2))
+
+    regressions = [name for name, comparison in report.get("comparison", {}).items() if comparison["regression"]]
+    return 1 if regressions and not args.save_baseline else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
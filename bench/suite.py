@@ -0,0 +1,240 @@
+"""Benchmarks of the hot paths of the editor, on synthetic lexicons.
+
+The controllers are driven headlessly: their Tk variables live in a Tcl interpreter without display.
+Times are in seconds per operation, the best of several repeats.
+"""
+import typing as t
+import os
+import time
+import random
+import tkinter
+from model.nvn import is_valid, syllabify
+from model.generator import Generator
+from model.ngram import NgramGenerator, ORDERS
+from model.neighbours import NeighbourIndex
+from model.completion import CompletionIndex
+from model.integrity import check_lexicon
+from model.bundle import BUNDLE_SUFFIX, LexiconBundle, write_bundle
+from model.syllables import SYLLABLE_TABLE
+from model.snapshot import snapshot_path
+from model import audio
+from .synthetic import synthetic_verbs, write_synthetic_lexicon
+
+REPEAT = 5
+LARGE_LEXICON = 10000 # size from which the lexicon benchmarks are only run once
+WORDFORM_SAMPLE = 10000
+GENERATED_COUNT = 200
+PRONOUNCED_COUNT = 50
+SYLLABLE_COUNT = 2
+MIN_DISTANCE = 1.
+
+WEIGHT_MAPS = {
+    "uniform": {},
+    "vowels": {char: .2 for char in "hltpfkgxnmzs"},
+    "sparse": {char: 0. for char in "hxzgm"},
+}
+
+Results = t.Dict[str, float]
+
+def measure(function: t.Callable[[], t.Any], operations: int = 1, repeat: int = REPEAT,
+        setup: t.Optional[t.Callable[[], t.Any]] = None) -> float:
+    """Time a function.
+
+    Parameters:
+        function: The function to time.
+        operations: The number of operations done by one call of `function`.
+        repeat: The number of calls.
+        setup: If provided, a function called before each call of `function`, untimed.
+
+    Returns:
+        The best time per operation, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, (time.perf_counter() - start) / operations)
+    return best
+
+def use_tcl_root() -> tkinter.Tcl:
+    """Create a Tcl interpreter without display to host the Tk variables of the controllers."""
+    root = tkinter.Tcl()
+    # Tk variables created without master look the default root up
+    tkinter._default_root = root
+    return root
+
+def bench_wordforms(forms: t.Sequence[str]) -> Results:
+    """Time the functions of `model.nvn`, per wordform."""
+    return {
+        "is_valid": measure(lambda: [is_valid(form) for form in forms], len(forms)),
+        "syllabify": measure(lambda: [syllabify(form) for form in forms], len(forms)),
+    }
+
+def bench_generate(index: t.Optional[NeighbourIndex] = None) -> Results:
+    """Time `Generator.generate` under several weight maps, per wordform.
+
+    Parameters:
+        index: If provided, the generated wordforms are kept at `MIN_DISTANCE` of the wordforms of the index.
+    """
+    results = {}
+    for name, weights in WEIGHT_MAPS.items():
+        generator = Generator()
+        for char, weight in weights.items():
+            generator.set_weight(char, weight)
+        if index is None:
+            generate = lambda: [generator.generate(SYLLABLE_COUNT) for _ in range(GENERATED_COUNT)]
+            results[f"generate[{name}]"] = measure(generate, GENERATED_COUNT)
+        else:
+            generate = lambda: [
+                generator.generate(SYLLABLE_COUNT, index, index, MIN_DISTANCE) for _ in range(GENERATED_COUNT)]
+            results[f"generate[{name},min_distance]"] = measure(generate, GENERATED_COUNT, 1)
+    return results
+
+def bench_ngram(forms: t.Sequence[str]) -> Results:
+    """Time the training of `NgramGenerator` on wordforms, per wordform, and its generation, per wordform."""
+    results = {}
+    for order in ORDERS:
+        generator = NgramGenerator(order=order)
+        results[f"ngram_train[{order}]"] = measure(lambda: generator.train(forms), len(forms))
+        generate = lambda: [generator.generate(SYLLABLE_COUNT) for _ in range(GENERATED_COUNT)]
+        results[f"ngram_generate[{order}]"] = measure(generate, GENERATED_COUNT)
+    return results
+
+def bench_pronounce(forms: t.Sequence[str]) -> Results:
+    """Time the audio rendering of `WordformController.pronounce`, without playing, per wordform."""
+    from ctrl.wordform import WordformController
+    controllers = [WordformController(form, syllabify(form)) for form in forms]
+    render = lambda: [
+        audio.render(SYLLABLE_TABLE.encode(controller.get_syllable_list())) for controller in controllers]
+    return {
+        "pronounce[cold]": measure(render, len(forms), setup=audio.CLIPS.clear),
+        "pronounce[warm]": measure(render, len(forms)),
+    }
+
+def bench_lexicon(path: str, n: int, seed: int = 0) -> Results:
+    """Time the loading, saving and filtering of a lexicon of `n` verbs."""
+    from ctrl.verb_data import VerbDataController
+    from ctrl.verb_list import VerbSelectorController
+
+    write_synthetic_lexicon(path, n, seed)
+    repeat = REPEAT if n < LARGE_LEXICON else 1
+    results = {}
+
+    def remove_snapshot():
+        if os.path.exists(snapshot_path(path)):
+            os.remove(snapshot_path(path))
+    results["load[csv]"] = measure(lambda: VerbDataController(path), repeat=repeat, setup=remove_snapshot)
+
+    controllers = []
+    def load_snapshot():
+        controllers.append(VerbDataController(path))
+    results["load[snapshot]"] = measure(load_snapshot, repeat=repeat)
+    for controller in controllers:
+        controller.refresh_thread.join()
+
+    data_controller = controllers[-1]
+    results["save"] = measure(data_controller.write, repeat=repeat)
+
+    selector = VerbSelectorController(data_controller)
+    # a pseudo-English substring of a few verbs
+    search = data_controller.verbs[len(data_controller.verbs) // 2].en[:3]
+    results["filter_verbs[all]"] = measure(selector.filter_verbs, repeat=repeat)
+    selector.var_is_nvn.set(False)
+    selector.var_filter.set(search)
+    results["filter_verbs[search]"] = measure(selector.filter_verbs, repeat=repeat)
+    selector.var_is_nvn.set(True)
+    selector.var_check_similar.set(True)
+    selector.var_filter.set(data_controller.verbs[0].nvn)
+    data_controller.get_nvn_index()
+    results["filter_verbs[similar]"] = measure(selector.filter_verbs, repeat=repeat)
+
+    # the prefixes typed to enter a few wordforms
+    prefixes = [verb.nvn[:i] for verb in data_controller.verbs[:GENERATED_COUNT] for i in range(1, len(verb.nvn) + 1)]
+    results["completion_index"] = measure(
+        lambda: CompletionIndex((verb.nvn, verb) for verb in data_controller.verbs), repeat=repeat)
+    index = data_controller.get_completion_index()
+    results["suggest"] = measure(lambda: [index.suggest(prefix) for prefix in prefixes], len(prefixes))
+    verb = data_controller.verbs[0]
+    def update_and_suggest(prefix):
+        # an edited wordform invalidates the caches along its path
+        index.remove(verb.nvn, verb)
+        index.add(verb.nvn, verb)
+        return index.suggest(prefix)
+    results["suggest[updated]"] = measure(lambda: [update_and_suggest(prefix) for prefix in prefixes], len(prefixes))
+
+    lexicon = data_controller.lexicon
+    results["update_many"] = measure(
+        lambda: lexicon.update_many(lexicon.entries, is_state=lambda state: not state), len(lexicon), repeat)
+
+    bundle_path = os.path.splitext(path)[0] + BUNDLE_SUFFIX
+    write_bundle(data_controller.verbs, bundle_path)
+    results["bundle_open"] = measure(lambda: LexiconBundle(bundle_path).close(), repeat=repeat)
+    with LexiconBundle(bundle_path) as bundle:
+        results["bundle_find"] = measure(lambda: [bundle.find("nvn", prefix) for prefix in prefixes], len(prefixes))
+
+    cache = {}
+    results["check[cold]"] = measure(lambda: check_lexicon(data_controller.verbs, workers=1), repeat=repeat)
+    check_lexicon(data_controller.verbs, cache)
+    results["check[warm]"] = measure(lambda: check_lexicon(data_controller.verbs, cache), repeat=repeat)
+
+    results.update(bench_generate(data_controller.get_nvn_index()))
+    return results
+
+def run(sizes: t.Iterable[int], directory: str, seed: int = 0,
+        log: t.Callable[[str], t.Any] = print) -> Results:
+    """Run all the benchmarks.
+
+    Parameters:
+        sizes: The numbers of verbs of the synthetic lexicons.
+        directory: A directory for the lexicon files.
+        seed: The seed of the random generators.
+        log: Called with a message before each group of benchmarks.
+
+    Returns:
+        Name -> time per operation, in seconds; lexicon benchmarks are suffixed with `@<size>`.
+    """
+    use_tcl_root()
+    random.seed(seed)
+    results = {}
+
+    log("Wordforms")
+    forms = [verb.nvn for verb in synthetic_verbs(WORDFORM_SAMPLE, seed)]
+    results.update(bench_wordforms(forms))
+    log("Generators")
+    results.update(bench_generate())
+    results.update(bench_ngram(forms))
+    log("Audio")
+    playable = [form for form in forms
+        if all(os.path.exists(SYLLABLE_TABLE.wav_path(i)) for i in SYLLABLE_TABLE.encode_wordform(form))]
+    results.update(bench_pronounce(playable[:PRONOUNCED_COUNT]))
+
+    for n in sizes:
+        log(f"Lexicon of {n} verbs")
+        path = os.path.join(directory, f"verbs-{n}.csv")
+        results.update({f"{name}@{n}": seconds for name, seconds in bench_lexicon(path, n, seed).items()})
+    return results
+
+def compare(results: Results, baseline: Results, tolerance: float) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """Compare results to a baseline.
+
+    Parameters:
+        results: The new results.
+        baseline: The reference results.
+        tolerance: The relative slowdown above which a benchmark is a regression.
+
+    Returns:
+        Name -> `{"baseline", "seconds", "ratio", "regression"}` for the benchmarks found in both.
+    """
+    comparison = {}
+    for name, seconds in results.items():
+        if name in baseline and baseline[name] > 0:
+            ratio = seconds / baseline[name]
+            comparison[name] = {
+                "baseline": baseline[name],
+                "seconds": seconds,
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            }
+    return comparison
@@ -0,0 +1,81 @@
+"""Synthetic lexicons of any size, for the benchmarks."""
+import typing as t
+import random
+import string
+from model import Verb
+from model.syllables import SYLLABLE_TABLE, bitset_ids
+from model.storage import write_verbs
+
+PRIMES = ["", "Not a prime", "Action", "Meta", "Thing"]
+MAX_SYLLABLES = 4
+MAX_DESCRIPTION_WORDS = 8
+
+# syllables valid on their own, and the syllables that may follow each syllable
+STARTS = bitset_ids(SYLLABLE_TABLE.valid)
+SUCCESSORS = [bitset_ids(joins) for joins in SYLLABLE_TABLE.joins]
+
+def synthetic_wordform(rng: random.Random, syllable_count: int) -> str:
+    """Draw a valid Novan wordform by chaining compatible syllables.
+
+    Parameters:
+        rng: The random generator.
+        syllable_count: The maximum number of syllables, fewer if the chain reaches a syllable without successor.
+
+    Returns:
+        The wordform.
+    """
+    syllable = rng.choice(STARTS)
+    syllables = [syllable]
+    for _ in range(syllable_count - 1):
+        successors = SUCCESSORS[syllable]
+        if not successors:
+            break
+        syllable = rng.choice(successors)
+        syllables.append(syllable)
+    return "".join(SYLLABLE_TABLE.decode(syllables))
+
+def synthetic_word(rng: random.Random) -> str:
+    """Draw a pseudo-English word."""
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+
+def synthetic_verbs(n: int, seed: int = 0) -> t.List[Verb]:
+    """Create a lexicon of random verbs.
+
+    Parameters:
+        n: The number of verbs.
+        seed: The seed of the random generator, the same seed giving the same lexicon.
+
+    Returns:
+        The verbs.
+    """
+    rng = random.Random(seed)
+    verbs = []
+    for _ in range(n):
+        nvn = synthetic_wordform(rng, rng.randint(1, MAX_SYLLABLES))
+        verbs.append(Verb(
+            nvn=nvn,
+            en=synthetic_word(rng),
+            nvn_desc=" ".join(synthetic_wordform(rng, 2) for _ in range(rng.randint(0, MAX_DESCRIPTION_WORDS))),
+            en_desc=" ".join(synthetic_word(rng) for _ in range(rng.randint(0, MAX_DESCRIPTION_WORDS))),
+            prime=rng.choice(PRIMES),
+            is_generic=rng.random() < .2,
+            is_state=rng.random() < .2,
+            is_process=rng.random() < .2,
+            is_cognition=rng.random() < .2,
+            is_transfer=rng.random() < .2))
+    return verbs
+
+def write_synthetic_lexicon(path: str, n: int, seed: int = 0) -> t.List[Verb]:
+    """Create a lexicon of random verbs and write it as a verb data CSV.
+
+    Parameters:
+        path: The path of the CSV file.
+        n: The number of verbs.
+        seed: The seed of the random generator.
+
+    Returns:
+        The verbs.
+    """
+    verbs = synthetic_verbs(n, seed)
+    write_verbs(verbs, path)
+    return verbs
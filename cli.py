@@ -0,0 +1,393 @@
+"""Command-line tools for the Novan lexical network, without the editor.
+
+Only `model` is imported at startup; pandas and pydub are loaded by the commands reading the data files or rendering
+audio.
+
+Examples:
+    python cli.py validate kala tuh
+    python cli.py syllabify kalatu --wav kalatu.wav
+    python cli.py generate -n 10 --syllables 2 --unique --min-distance 1
+    python cli.py stats
+    python cli.py export -o data/verb-export.csv
+    python cli.py check-text --csv data/ex-export.csv --column nvn
+    python cli.py fit corpus.txt --name Corpus
+    python cli.py check --json -o integrity.json
+    python cli.py build-clips
+    python cli.py bundle -o data/verbs.nvnlex
+    python cli.py lookup --bundle data/verbs.nvnlex --field en --prefix al
+    python cli.py stats --data data/verbs.nvnlex
+    python cli.py layout -o data/layout.csv
+"""
+import time
+START_TIME = time.perf_counter()
+
+import argparse
+import csv
+import json
+import sys
+import random
+import typing as t
+from collections import Counter
+from model.nvn import is_valid, syllabify
+from model.storage import VERBS_PATH, GENERATORS_PATH, read_verbs, read_generators, write_generators, export_verbs
+from model.graph import VERB_TYPES, IGNORED_PRIMES
+from model.text import check_text, check_corpus
+from model.bundle import BUNDLE_PATH, INDEXED_FIELDS
+
+IMPORT_TIME = time.perf_counter()
+
+def read_forms(args: argparse.Namespace) -> t.List[str]:
+    """Return the wordforms of the command line, or the lines of the standard input if none were given."""
+    if args.forms:
+        return args.forms
+    return [line.strip() for line in sys.stdin if line.strip()]
+
+def validate(args: argparse.Namespace) -> int:
+    """Check Novan wordforms, or the wordforms of the lexicon if `--lexicon` is given."""
+    if args.lexicon:
+        verbs = read_verbs(args.data)
+        forms = [(verb.en, verb.nvn) for verb in verbs if verb.nvn]
+    else:
+        forms = [(form, form) for form in read_forms(args)]
+
+    invalid = 0
+    for name, form in forms:
+        if not is_valid(form):
+            invalid += 1
+            print(f"{name}\tinvalid\t{form}")
+        elif not args.quiet:
+            print(f"{name}\tvalid\t{form}")
+    print(f"{invalid} invalid wordform(s) out of {len(forms)}.", file=sys.stderr)
+    return 1 if invalid else 0
+
+def syllabify_forms(args: argparse.Namespace) -> int:
+    """Print the syllables of Novan wordforms, and optionally save their pronunciation."""
+    forms = read_forms(args)
+    invalid = [form for form in forms if not is_valid(form)]
+    if invalid:
+        print(f"Invalid wordform(s): {', '.join(invalid)}", file=sys.stderr)
+        return 1
+
+    for form in forms:
+        print(f"{form}\t{'.'.join(syllabify(form))}")
+
+    if args.wav is not None:
+        from model.audio import render
+        from model.syllables import SYLLABLE_TABLE
+        sound = render([syl_id for form in forms for syl_id in SYLLABLE_TABLE.encode_wordform(form)])
+        if sound is None:
+            print("Nothing to pronounce.", file=sys.stderr)
+            return 1
+        sound.export(args.wav, format="wav")
+    return 0
+
+class _Union:
+    """Membership test in any of several containers."""
+
+    def __init__(self, *containers: t.Container[str]):
+        self.containers = containers
+
+    def __contains__(self, item: str) -> bool:
+        return any(item in container for container in self.containers)
+
+def generate(args: argparse.Namespace) -> int:
+    """Generate new Novan wordforms."""
+    if args.seed is not None:
+        random.seed(args.seed)
+    generators = read_generators(args.generators)
+    if args.generator not in generators:
+        print(f"Unknown generator '{args.generator}', available: {', '.join(generators)}", file=sys.stderr)
+        return 1
+    generator = generators[args.generator]
+    is_ngram = getattr(generator, "order", 0) > 0
+    verbs = read_verbs(args.data) if is_ngram or args.unique or args.min_distance > 0 else []
+    if is_ngram: # n-gram generators learn from the lexicon
+        generator.train(verb.nvn for verb in verbs)
+
+    neighbours = None
+    forbidden = set()
+    if args.unique or args.min_distance > 0:
+        from model.neighbours import NeighbourIndex
+        neighbours = NeighbourIndex((verb.nvn, verb) for verb in verbs)
+        forbidden = neighbours
+
+    generated = set()
+    for _ in range(args.count):
+        try:
+            wordform = generator.generate(args.syllables, _Union(forbidden, generated), neighbours, args.min_distance)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            return 1
+        generated.add(wordform)
+        print(wordform)
+    return 0
+
+def stats(args: argparse.Namespace) -> int:
+    """Print statistics of the lexicon."""
+    verbs = read_verbs(args.data)
+    with_nvn = [verb for verb in verbs if verb.nvn]
+    syllables = Counter(syl for verb in with_nvn for syl in verb.nvn_syllables if syl)
+    forms = Counter(verb.nvn for verb in with_nvn)
+
+    print(f"Entries:\t{len(verbs)}")
+    print(f"With Novan wordform:\t{len(with_nvn)}")
+    print(f"Invalid wordforms:\t{sum(not is_valid(verb.nvn) for verb in with_nvn)}")
+    print(f"Shared wordforms:\t{sum(count for count in forms.values() if count > 1)}")
+    print(f"Distinct syllables:\t{len(syllables)}")
+    if syllables:
+        print(f"Most used syllables:\t{', '.join(f'{syl} ({count})' for syl, count in syllables.most_common(10))}")
+    for verb_type in VERB_TYPES:
+        print(f"{verb_type}:\t{sum(bool(getattr(verb, verb_type)) for verb in verbs)}")
+    primes = Counter(verb.prime for verb in verbs if verb.prime not in IGNORED_PRIMES)
+    for prime, count in sorted(primes.items()):
+        print(f"Prime {prime}:\t{count}")
+    return 0
+
+def export(args: argparse.Namespace) -> int:
+    """Export the lexicon in the entity format."""
+    verbs = read_verbs(args.data)
+    if args.output is None:
+        export_verbs(verbs, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            export_verbs(verbs, file)
+    return 0
+
+def check_texts(args: argparse.Namespace) -> int:
+    """Check Novan texts: files, or a column of a CSV file."""
+    if args.csv is not None:
+        with open(args.csv, encoding="utf-8", newline="") as file:
+            reader = csv.DictReader(file)
+            if args.column not in (reader.fieldnames or []):
+                print(f"No column '{args.column}' in '{args.csv}'.", file=sys.stderr)
+                return 1
+            results = list(check_corpus(
+                (f"{args.csv}:{row.get(args.key, index)}", row[args.column]) for index, row in enumerate(reader)))
+    else:
+        results = []
+        for path in args.files or ["-"]:
+            file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+            with file:
+                # stream the file in blocks
+                errors = check_text(iter(lambda: file.read(1 << 16), ""))
+            if errors:
+                results.append((path, errors))
+
+    for key, errors in results:
+        for error in errors:
+            print(f"{key}\t{error.start}-{error.end}\t{error.message}")
+    print(f"{sum(len(errors) for _, errors in results)} error(s) in {len(results)} text(s).", file=sys.stderr)
+    return 1 if results else 0
+
+def fit(args: argparse.Namespace) -> int:
+    """Fit a generator to Novan texts, or to the wordforms and descriptions of the lexicon, and save it."""
+    from model.fitting import count_lexicon, count_corpus, fit_weights
+    from model.generator import Generator
+    if args.files:
+        counts = 0
+        for path in args.files:
+            file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+            with file:
+                counts = counts + count_corpus(file)
+    else:
+        verbs = read_verbs(args.data)
+        counts = count_lexicon(verbs) + count_corpus(verb.nvn_desc for verb in verbs)
+    weight_map = fit_weights(counts)
+    print(f"{int(counts.sum())} syllables")
+    for char, weight in weight_map.items():
+        print(f"{char}\t{weight:.4f}")
+
+    if args.name is not None:
+        generators = read_generators(args.generators)
+        generators[args.name] = Generator(weight_map)
+        write_generators(generators, args.generators)
+        print(f"Saved generator '{args.name}' to '{args.generators}'.", file=sys.stderr)
+    return 0
+
+def check(args: argparse.Namespace) -> int:
+    """Check the integrity of the lexicon before a release, caching the results of the unchanged entries."""
+    from model.integrity import CACHE_SUFFIX, check_lexicon, read_cache, write_cache
+    verbs = read_verbs(args.data)
+    cache_path = args.cache or args.data + CACHE_SUFFIX
+    cache = {} if args.no_cache else read_cache(cache_path)
+    report = check_lexicon(verbs, cache, workers=args.workers)
+    if not args.no_cache:
+        write_cache(cache_path, cache)
+
+    if args.json:
+        data = json.dumps(report.to_dict(), indent=2) + "\n"
+    else:
+        data = "".join(f"{issue.row}\t{issue.uri}\t{issue.nvn}\t{issue.check}\t{issue.message}\n"
+            for issue in report.issues)
+    if args.output is None:
+        sys.stdout.write(data)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(data)
+    print(f"{len(report.issues)} issue(s) in {report.entries} entries, {report.checked} checked, "
+        f"{report.cached} cached, {report.duplicates} duplicate(s).", file=sys.stderr)
+    return 1 if report.issues else 0
+
+def build_clips(args: argparse.Namespace) -> int:
+    """Compile the audio clips of the syllables which changed since the last build."""
+    from model.audio import build_clips
+    compiled, unchanged, missing = build_clips(args.output, args.force)
+    print(f"{compiled} clip(s) compiled, {unchanged} up to date, {missing} syllable(s) without clip.", file=sys.stderr)
+    return 0
+
+def bundle(args: argparse.Namespace) -> int:
+    """Compile the lexicon into a read-only bundle."""
+    from model.bundle import write_bundle
+    verbs = read_verbs(args.data)
+    write_bundle(verbs, args.output)
+    print(f"Compiled {len(verbs)} verbs into '{args.output}'.", file=sys.stderr)
+    return 0
+
+def lookup(args: argparse.Namespace) -> int:
+    """Look verbs up in a compiled bundle, by Novan or English wordform."""
+    from model.bundle import LexiconBundle
+    found = 0
+    with LexiconBundle(args.bundle) as lexicon:
+        for value in read_forms(args):
+            rows = lexicon.find_prefix(args.field, value, args.limit) if args.prefix else lexicon.find(args.field, value)
+            for row in rows:
+                verb = lexicon[row]
+                print(f"{value}\t{row}\t{verb.nvn}\t{verb.en}\t{verb.en_desc}")
+            found += len(rows)
+    print(f"{found} verb(s) found.", file=sys.stderr)
+    return 0 if found else 1
+
+def layout(args: argparse.Namespace) -> int:
+    """Lay out the graph of the lexicon, only relaxing the neighbourhoods changed since the cached layout."""
+    from model.graph import LexiconGraph
+    from model.similarity import similarity_edges
+    from model.layout import GraphLayout
+    verbs = read_verbs(args.data)
+    graph = LexiconGraph.from_entries(verbs, extra_edges=similarity_edges(verbs))
+    graph_layout = GraphLayout.load(graph, args.cache)
+    graph_layout.save(args.cache)
+
+    file = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        writer = csv.writer(file)
+        writer.writerow(["uri", "nvn", "en", "x", "y"])
+        for verb, (x, y) in zip(verbs, graph_layout.positions):
+            writer.writerow([verb.uri, verb.nvn, verb.en, f"{x:.6f}", f"{y:.6f}"])
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    print(f"Laid out {graph.node_count} verbs and {graph.edge_count} edges.", file=sys.stderr)
+    return 0
+
+def make_parser() -> argparse.ArgumentParser:
+    """Create the parser of the command line."""
+    parser = argparse.ArgumentParser(description="Command-line tools for the Novan lexical network.")
+    parser.add_argument("--timings", action="store_true", help="print the startup and command times to stderr")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sub = subparsers.add_parser("validate", help="check Novan wordforms")
+    sub.add_argument("forms", nargs="*", help="wordforms to check, read from stdin if none")
+    sub.add_argument("--lexicon", action="store_true", help="check the wordforms of the lexicon instead")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.add_argument("-q", "--quiet", action="store_true", help="only print the invalid wordforms")
+    sub.set_defaults(function=validate)
+
+    sub = subparsers.add_parser("syllabify", help="split Novan wordforms into syllables")
+    sub.add_argument("forms", nargs="*", help="wordforms to split, read from stdin if none")
+    sub.add_argument("--wav", help="save the pronunciation of the wordforms to this WAV file")
+    sub.set_defaults(function=syllabify_forms)
+
+    sub = subparsers.add_parser("generate", help="generate new Novan wordforms")
+    sub.add_argument("-n", "--count", type=int, default=1, help="number of wordforms")
+    sub.add_argument("--syllables", type=int, default=1, help="number of syllables per wordform")
+    sub.add_argument("--generator", default="Custom", help="name of the generator")
+    sub.add_argument("--generators", default=GENERATORS_PATH, help="path to the generator CSV")
+    sub.add_argument("--unique", action="store_true", help="avoid the wordforms of the lexicon")
+    sub.add_argument("--min-distance", type=float, default=0,
+        help="avoid the wordforms within this phonological distance of the lexicon")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.add_argument("--seed", type=int, help="seed of the random generator")
+    sub.set_defaults(function=generate)
+
+    sub = subparsers.add_parser("stats", help="print statistics of the lexicon")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.set_defaults(function=stats)
+
+    sub = subparsers.add_parser("export", help="export the lexicon in the entity format")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.add_argument("-o", "--output", help="path to the exported CSV, stdout if not provided")
+    sub.set_defaults(function=export)
+
+    sub = subparsers.add_parser("check-text", help="check Novan texts, such as descriptions")
+    sub.add_argument("files", nargs="*", help="text files to check, stdin if none")
+    sub.add_argument("--csv", help="check a column of this CSV file instead")
+    sub.add_argument("--column", default="nvn_desc", help="column of the texts in the CSV file")
+    sub.add_argument("--key", default="Entity", help="column identifying the rows in the CSV file")
+    sub.set_defaults(function=check_texts)
+
+    sub = subparsers.add_parser("fit", help="fit the weights of a generator to Novan texts or to the lexicon")
+    sub.add_argument("files", nargs="*", help="Novan text files ('-' for stdin), the lexicon if none")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.add_argument("--name", help="save the fitted generator under this name")
+    sub.add_argument("--generators", default=GENERATORS_PATH, help="path to the generator CSV")
+    sub.set_defaults(function=fit)
+
+    sub = subparsers.add_parser("check", help="check the integrity of the lexicon")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.add_argument("--cache", help="path to the cache of the results, next to the data if not provided")
+    sub.add_argument("--no-cache", action="store_true", help="check all the entries, without cache")
+    sub.add_argument("--workers", type=int, help="number of processes checking large lexicons")
+    sub.add_argument("--json", action="store_true", help="print the report as JSON")
+    sub.add_argument("-o", "--output", help="path to the report, stdout if not provided")
+    sub.set_defaults(function=check)
+
+    sub = subparsers.add_parser("build-clips", help="compile the audio clips of the syllables")
+    sub.add_argument("-o", "--output", default="data/clip-cache", help="directory of the compiled clips")
+    sub.add_argument("--force", action="store_true", help="compile all the clips, even the unchanged ones")
+    sub.set_defaults(function=build_clips)
+
+    sub = subparsers.add_parser("bundle", help="compile the lexicon into a read-only bundle")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    sub.add_argument("-o", "--output", default=BUNDLE_PATH, help="path to the bundle")
+    sub.set_defaults(function=bundle)
+
+    sub = subparsers.add_parser("lookup", help="look verbs up in a compiled bundle")
+    sub.add_argument("forms", nargs="*", help="wordforms to look up, read from stdin if none")
+    sub.add_argument("--bundle", default=BUNDLE_PATH, help="path to the bundle")
+    sub.add_argument("--field", choices=INDEXED_FIELDS, default="nvn", help="field to look up")
+    sub.add_argument("--prefix", action="store_true", help="find the verbs starting with the wordforms")
+    sub.add_argument("--limit", type=int, help="maximum number of verbs per prefix")
+    sub.set_defaults(function=lookup)
+
+    sub = subparsers.add_parser("layout", help="lay out the graph of the lexicon, as CSV positions")
+    sub.add_argument("--data", default=VERBS_PATH, help="path to the verb data")
+    sub.add_argument("--cache", default="data/layout-cache.npz", help="path to the cached layout")
+    sub.add_argument("-o", "--output", help="path to the CSV positions, stdout if not provided")
+    sub.set_defaults(function=layout)
+    return parser
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    """Run the command line.
+
+    Parameters:
+        argv: The arguments, `sys.argv[1:]` if not provided.
+
+    Returns:
+        The exit status.
+    """
+    args = make_parser().parse_args(argv)
+    command_start = time.perf_counter()
+    try:
+        status = args.function(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        status = 1
+    if args.timings:
+        end = time.perf_counter()
+        print(f"imports: {(IMPORT_TIME - START_TIME) * 1000:.1f} ms, "
+            f"{args.command}: {(end - command_start) * 1000:.1f} ms, "
+            f"total: {(end - START_TIME) * 1000:.1f} ms", file=sys.stderr)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Bulk edit controller.
+
+Applies a field transform to all the verbs listed by the verb selector (the current search) as a single modification:
+the new values are validated together, the change is undone in one step and the views are refreshed once.
+"""
+from tkinter import StringVar, ttk, messagebox
+import typing as t
+from model.lexicon import Change, Transform
+from .verb_list import VerbSelectorController
+from .constants import PRIME_TYPES
+from .profiler import PROFILER
+
+SET = "Set"
+REPLACE = "Replace"
+OPERATIONS = [SET, REPLACE]
+FLAG_FIELDS = ["is_generic", "is_state", "is_process", "is_cognition", "is_transfer"]
+TEXT_FIELDS = ["en", "nvn", "en_desc", "nvn_desc"]
+BULK_FIELDS = ["prime"] + FLAG_FIELDS + TEXT_FIELDS
+FLAG_VALUES = ["True", "False"]
+
+class BulkEditController:
+    """Bulk edit controller class."""
+
+    verb_list_controller: VerbSelectorController
+
+    var_field: StringVar
+    var_operation: StringVar
+    var_find: StringVar
+    var_value: StringVar
+    operation_combobox: ttk.Combobox
+    value_combobox: ttk.Combobox
+    find_entry: ttk.Entry
+
+    def __init__(self, verb_list_controller: VerbSelectorController):
+        """Create a bulk edit controller.
+
+        Parameters:
+            verb_list_controller: The controller listing the verbs to edit.
+        """
+        self.verb_list_controller = verb_list_controller
+
+        self.var_field = StringVar(value=BULK_FIELDS[0])
+        self.var_operation = StringVar(value=SET)
+        self.var_find = StringVar(value="")
+        self.var_value = StringVar(value=PRIME_TYPES[0])
+        self.operation_combobox = None
+        self.value_combobox = None
+        self.find_entry = None
+
+    def refresh(self, *args):
+        """Update the operations and values proposed for the selected field."""
+        field = self.var_field.get()
+        if field in TEXT_FIELDS:
+            self.operation_combobox["values"] = OPERATIONS
+            self.value_combobox.config(values=(), state="normal")
+        else:
+            self.var_operation.set(SET)
+            self.operation_combobox["values"] = (SET,)
+            values = PRIME_TYPES if field == "prime" else FLAG_VALUES
+            self.value_combobox.config(values=values, state="readonly")
+            if self.var_value.get() not in values:
+                self.var_value.set(values[0])
+        self.find_entry.config(state="normal" if self.var_operation.get() == REPLACE else "disabled")
+
+    def transform(self) -> Transform:
+        """Return the transform of the field described by the view."""
+        field = self.var_field.get()
+        value = self.var_value.get()
+        if field in FLAG_FIELDS:
+            return value == "True"
+        if self.var_operation.get() == REPLACE:
+            find = self.var_find.get()
+            return lambda old: old.replace(find, value) if find else old
+        return value
+
+    @PROFILER.instrument()
+    def apply(self) -> t.List[Change]:
+        """Apply the transform to the listed verbs, after confirmation.
+
+        Returns:
+            The changes, empty if the edit was cancelled or invalid.
+        """
+        verbs = self.verb_list_controller.current_verbs or []
+        field = self.var_field.get()
+        if not verbs or not messagebox.askokcancel(
+                message=f'Are you sure you want to edit "{field}" for the {len(verbs)} listed verb(s)?',
+                icon='warning', title='Bulk edit'):
+            return []
+        try:
+            return self.verb_list_controller.verb_data_controller.lexicon.update_many(
+                verbs, **{field: self.transform()})
+        except ValueError as e:
+            messagebox.showerror(message=str(e), title='Bulk edit')
+            return []
+
+    def setup_ui(self, parent):
+        """Initialize the view, below the list of verbs.
+
+        Parameters:
+            parent: The parent widget.
+        """
+        frame = ttk.Labelframe(parent, text="Edit listed verbs")
+        frame.grid(sticky='nsew', row=3, column=0, columnspan=2)
+        frame.columnconfigure(1, weight=1)
+
+        ttk.Label(frame, text="Field ").grid(sticky='nsw', row=0, column=0)
+        field_combobox = ttk.Combobox(frame, textvariable=self.var_field, state="readonly", values=BULK_FIELDS)
+        field_combobox.grid(sticky='ew', row=0, column=1)
+        field_combobox.bind("<<ComboboxSelected>>", self.refresh)
+
+        ttk.Label(frame, text="Operation ").grid(sticky='nsw', row=1, column=0)
+        self.operation_combobox = ttk.Combobox(frame, textvariable=self.var_operation, state="readonly",
+            values=OPERATIONS)
+        self.operation_combobox.grid(sticky='ew', row=1, column=1)
+        self.operation_combobox.bind("<<ComboboxSelected>>", self.refresh)
+
+        ttk.Label(frame, text="Find ").grid(sticky='nsw', row=2, column=0)
+        self.find_entry = ttk.Entry(frame, textvariable=self.var_find)
+        self.find_entry.grid(sticky='ew', row=2, column=1)
+
+        ttk.Label(frame, text="Value ").grid(sticky='nsw', row=3, column=0)
+        self.value_combobox = ttk.Combobox(frame, textvariable=self.var_value)
+        self.value_combobox.grid(sticky='ew', row=3, column=1)
+
+        ttk.Button(frame, text="Apply to listed verbs", command=self.apply).grid(
+            sticky='nsew', row=4, column=0, columnspan=2)
+
+        self.refresh()
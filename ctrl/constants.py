@@ -2,3 +2,6 @@
 PRIME_TYPES = ["Not a prime", "Action", "Meta", "Thing"]
 PRIME_TAGS = {"Not a prime": ".", "Action": "A", "Meta": "M", "Thing": "T"}
 START = "0.0"
+SIMILAR_COUNT = 20
+SIMILAR_MAX_DISTANCE = 2
+ROW_UPDATE_LIMIT = 32
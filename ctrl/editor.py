@@ -1,10 +1,18 @@
 """Controller of the editor for the Novan lexical network verbs."""
 from tkinter import Tk, ttk, VERTICAL, messagebox
+import typing as t
 from model import Verb
+from model.lexicon import Change, UPDATE, REMOVE
+from model.history import History
+from model.merge import new_uri
 from .verb_data import VerbDataController
 from .verb_list import VerbSelectorController
 from .verb_editor import VerbEditorController
 from .generator import GeneratorController
+from .bulk_edit import BulkEditController
+from .profiler import PROFILER
+
+RELOAD_POLL_DELAY = 100 # ms
 
 class EditorController:
     """Controller of the editor for the Novan lexical network verbs."""
@@ -14,6 +22,8 @@ class EditorController:
     verb_data_controller: VerbDataController
     verb_list_controller: VerbSelectorController
     wordform_generator_controller: GeneratorController
+    bulk_edit_controller: BulkEditController
+    history: History
 
     def __init__(self):
         """Create a controller of the editor for the Novan lexical network verbs."""
@@ -24,9 +34,18 @@ class EditorController:
         self.verb_list_controller.editor_refresh = self.refresh
         self.verb_editor_controller = VerbEditorController(self.verb_list_controller)
         self.wordform_generator_controller = GeneratorController(self.verb_data_controller)
+        self.bulk_edit_controller = BulkEditController(self.verb_list_controller)
+        self.verb_data_controller.lexicon.subscribe(self.on_changes)
+        self.history = History(self.verb_data_controller.lexicon)
 
+    @PROFILER.instrument()
     def refresh(self):
         """Update view with data from the model."""
+        self.refresh_title()
+        self.verb_editor_controller.refresh()
+
+    def refresh_title(self):
+        """Update the window title with the current verb."""
         verb = self.verb_list_controller.current_verb
 
         if verb is not None:
@@ -34,7 +53,16 @@ class EditorController:
         else:
             self.root.title(f"Novan Lexical Network Editor")
 
-        self.verb_editor_controller.refresh()
+    def on_changes(self, changes: t.List[Change]):
+        """Update the window title if the wordform of the current verb changed.
+
+        Parameters:
+            changes: The changes of the lexicon.
+        """
+        verb = self.verb_list_controller.current_verb
+        if self.root is not None and any(
+                change.kind == UPDATE and change.entry is verb and change.field == "nvn" for change in changes):
+            self.refresh_title()
 
     def setup_ui(self, parent: Tk):
         """Initialize the view.
@@ -58,6 +86,8 @@ class EditorController:
         ui_right_frame.columnconfigure(0, weight=1)
         ui_right_frame.columnconfigure(1, weight=1)
         ui_right_frame.columnconfigure(2, weight=1)
+        ui_right_frame.columnconfigure(3, weight=1)
+        ui_right_frame.columnconfigure(4, weight=1)
         ui_right_frame.grid(sticky='nsew', row=1, column=0)
         sep = ttk.Separator(self.content, orient=VERTICAL)
         sep.grid(sticky='ns', row=1, column=1)
@@ -66,7 +96,7 @@ class EditorController:
 
         # notebook
         tabs = ttk.Notebook(ui_right_frame)
-        tabs.grid(sticky='nsew', row=0, columnspan=3)
+        tabs.grid(sticky='nsew', row=0, columnspan=5)
         tab_edit = ttk.Frame(tabs)
         tab_relate = ttk.Frame(tabs)
         tab_statistics = ttk.Frame(tabs)
@@ -78,35 +108,69 @@ class EditorController:
         button_new = ttk.Button(ui_right_frame, text="New Verb", command=self.create_verb)
         button_remove = ttk.Button(ui_right_frame, text="Remove Verb", command=self.remove_verb)
         button_save = ttk.Button(ui_right_frame, text="Save", command=self.verb_data_controller.save)
+        button_undo = ttk.Button(ui_right_frame, text="Undo", command=self.undo)
+        button_redo = ttk.Button(ui_right_frame, text="Redo", command=self.redo)
         button_new.grid(sticky='nsew', row=1, column=0)
         button_remove.grid(sticky='nsew', row=1, column=1)
         button_save.grid(sticky='nsew', row=1, column=2)
+        button_undo.grid(sticky='nsew', row=1, column=3)
+        button_redo.grid(sticky='nsew', row=1, column=4)
         self.root.bind("<Control-s>", lambda x: button_save.invoke())
+        self.root.bind("<Control-z>", lambda x: self.undo())
+        self.root.bind("<Control-y>", lambda x: self.redo())
+        self.root.bind("<Control-Z>", lambda x: self.redo())
 
         # sub-ui setup
         self.verb_editor_controller.setup_ui(tab_edit)
         self.verb_list_controller.setup_ui(ui_list_frame)
+        self.bulk_edit_controller.setup_ui(ui_list_frame)
 
         # generator window
         self.wordform_generator_controller.setup_ui(self.root)
 
+        # check the lexicon loaded from the snapshot
+        self.poll_reload()
+
+    def poll_reload(self):
+        """Apply the lexicon reloaded in the background, once the snapshot check is over."""
+        if self.verb_data_controller.apply_reload():
+            self.root.after(RELOAD_POLL_DELAY, self.poll_reload)
+
+    @PROFILER.instrument()
+    def undo(self):
+        """Undo the last modification of the lexicon, and select the verb it changed."""
+        self._select_changed(self.history.undo())
+
+    @PROFILER.instrument()
+    def redo(self):
+        """Redo the last undone modification of the lexicon, and select the verb it changed."""
+        self._select_changed(self.history.redo())
+
+    def _select_changed(self, changes: t.List[Change]):
+        """Select the last verb affected by changes, or no verb if it was removed."""
+        if not changes:
+            return
+        if len({id(change.entry) for change in changes}) > 1:
+            # keep the selection when a bulk edit is undone or redone
+            return
+        change = changes[-1]
+        self.verb_list_controller.select_verb(None if change.kind == REMOVE else change.entry)
+
+    @PROFILER.instrument()
     def create_verb(self):
         """Create a verb and set it active."""
         # If the new verb is in the list, select it
-        verb = Verb(nvn="#", en="new verb", prime="Not a prime")
-        self.verb_data_controller.verbs.append(verb)
-        self.verb_list_controller.current_verb = verb
-        self.verb_list_controller.refresh()
-        self.verb_editor_controller.refresh()
+        verb = Verb(uri=new_uri(), nvn="#", en="new verb", prime="Not a prime")
+        self.verb_data_controller.lexicon.add(verb)
+        self.verb_list_controller.select_verb(verb)
 
+    @PROFILER.instrument()
     def remove_verb(self):
         """Delete the currently selected verb."""
         verb = self.verb_list_controller.current_verb
 
-        if messagebox.askokcancel(
+        if verb is not None and messagebox.askokcancel(
                 message=f'Are you sure you want to remove "{verb.nvn}"?',
                 icon='warning', title='Remove verb'):
-            self.verb_data_controller.verbs.remove(verb)
-            self.verb_list_controller.current_verb = None
-            self.verb_list_controller.refresh()
-            self.verb_editor_controller.refresh()
+            self.verb_data_controller.lexicon.remove(verb)
+            self.verb_list_controller.select_verb(None)
@@ -7,11 +7,14 @@ from .wordform import WordformController
 from .entry_popup import ask_string
 from model.nvn import CONSONANTS, VOWELS
 from model.generator import Generator
-import pandas as pd
+from model.ngram import NgramGenerator, ORDERS
+from model.lexicon import Change
+from model.storage import GENERATORS_PATH, read_generators, write_generators
+from .profiler import PROFILER
 
 PAD = 5
 MINSIZE = 300
-GENERATORS_PATH = "data/generators.csv"
+UPDATE_DELAY = 16 # ms, about one frame
 class GeneratorController:
     """Wordform generator controller class."""
 
@@ -23,9 +26,15 @@ class GeneratorController:
     var_generator: StringVar
     var_limit_generator: BooleanVar
     var_syllable_count: StringVar
+    var_min_distance: StringVar
+    var_order: StringVar
 
     generators: t.Dict[str, Generator]
     generator_combobox: ttk.Combobox
+    window: Toplevel
+    pending_chars: t.Set[str]
+    update_job: t.Optional[str]
+    is_trained: bool
 
     def __init__(self, verb_data_controller: VerbDataController):
         """Create a wordform generator controller.
@@ -37,24 +46,25 @@ class GeneratorController:
         self.var_vowels = {v: StringVar() for v in VOWELS}
         self.var_consonants = {c: StringVar() for c in CONSONANTS}
         self.var_syllable_count = StringVar(value="1")
+        self.var_min_distance = StringVar(value="0")
         self.var_limit_generator = BooleanVar(value=True)
+        self.var_order = StringVar(value="0")
 
         self.verb_data_controller = verb_data_controller
         self.wordform_controller = WordformController()
         self.generator_combobox = None
+        self.window = None
+        self.pending_chars = set()
+        self.update_job = None
+        self.is_trained = False
+        self.verb_data_controller.lexicon.subscribe(self.on_changes)
 
         self.load_generators()
 
     def load_generators(self):
         """Load the generator dictionary."""
-        self.generators = {}
         try:
-            df = pd.read_csv(GENERATORS_PATH, index_col=0, keep_default_na=False)
-            for index, row in df.iterrows():
-                weight_map = {name: value for name, value in zip(df.columns, row)}
-                generator_name = weight_map.pop('generator_name')
-                generator = Generator(weight_map)
-                self.generators[generator_name] = generator
+            self.generators = read_generators(GENERATORS_PATH)
         except Exception as e:
             print(f"Unable to load file '{GENERATORS_PATH}', aborting: {e}")
             self.generators = {
@@ -66,45 +76,140 @@ class GeneratorController:
         if messagebox.askokcancel(
                 message=f'Are you sure you want to overwrite the generator data?',
                 icon='warning', title='Save'):
-            df = pd.DataFrame.from_records([
-                {'generator_name': generator_name, **generator.weight_map}
-                for generator_name, generator in self.generators.items()])
-            df.to_csv(GENERATORS_PATH)
+            write_generators(self.generators, GENERATORS_PATH)
 
     def current_generator(self) -> Generator:
         """Return the currently active wordform generator."""
         return self.generators[self.var_generator.get()]
 
+    def on_changes(self, changes: t.List[Change]):
+        """Retrain the n-gram generators on the next generation when a wordform changes.
+
+        Parameters:
+            changes: The changes of the lexicon.
+        """
+        if any(change.field in (None, "nvn") for change in changes):
+            self.is_trained = False
+
+    @PROFILER.instrument()
+    def train_generators(self):
+        """Train the n-gram generators on the wordforms of the lexicon, if they changed since the last training."""
+        if self.is_trained:
+            return
+        wordforms = [verb.nvn for verb in self.verb_data_controller.verbs]
+        for generator in self.generators.values():
+            if isinstance(generator, NgramGenerator):
+                generator.train(wordforms)
+        self.is_trained = True
+
+    def set_order(self):
+        """Replace the current generator with a generator of the selected n-gram order and the same weights."""
+        try:
+            order = int(self.var_order.get())
+        except ValueError: # the spinbox is being edited
+            return
+        generator = self.current_generator()
+        if order == getattr(generator, "order", 0):
+            return
+        try:
+            self.generators[self.var_generator.get()] = NgramGenerator(generator.weight_map, order) if order else \
+                Generator(generator.weight_map)
+        except ValueError as e:
+            messagebox.showwarning(message=str(e), title='Generator order')
+            return
+        self.is_trained = False
+
     def new_generator(self) -> Generator:
         """Create a new wordform generator."""
         self.generators[ask_string("Enter the name of the new generator")] = Generator()
         self.generator_combobox["values"] = tuple(self.generators.keys())
         self.refresh()
 
+    @PROFILER.instrument()
+    def fit_generator(self):
+        """Create a generator fitted to the wordforms and Novan descriptions of the lexicon, and save it."""
+        from model.fitting import count_lexicon, count_corpus, fit_weights
+        verbs = self.verb_data_controller.verbs
+        try:
+            weight_map = fit_weights(count_lexicon(verbs) + count_corpus(verb.nvn_desc for verb in verbs))
+        except ValueError as e:
+            messagebox.showwarning(message=str(e), title='Fit generator')
+            return
+        name = ask_string("Enter the name of the fitted generator")
+        if not name:
+            return
+        self.generators[name] = Generator(weight_map)
+        self.generator_combobox["values"] = tuple(self.generators.keys())
+        self.var_generator.set(name)
+        self.refresh()
+        self.save_generators()
+
+    @PROFILER.instrument()
     def generate(self):
         """Generate a wordform using the currently selected generator."""
-        forbidden = [
-            v.nvn for v in self.verb_data_controller.verbs
-        ] if self.var_limit_generator.get() else []
-        wordform = self.current_generator().generate(int(self.var_syllable_count.get()), forbidden)
+        try:
+            syllable_count = int(self.var_syllable_count.get())
+            min_distance = float(self.var_min_distance.get())
+        except ValueError: # a spinbox is being edited
+            return
+        index = self.verb_data_controller.get_nvn_index() \
+            if self.var_limit_generator.get() or min_distance > 0 else None
+        forbidden = index if self.var_limit_generator.get() else ()
+
+        self.train_generators()
+        try:
+            wordform = self.current_generator().generate(syllable_count, forbidden, index, min_distance)
+        except RuntimeError as e:
+            messagebox.showwarning(message=str(e), title='Generate')
+            return
         self.wordform_controller.nvn.set(wordform)
 
+    @PROFILER.instrument()
     def refresh(self):
         """Update view with data from the model."""
+        # Drop the slider moves not yet applied to the previous generator
+        if self.update_job is not None:
+            self.window.after_cancel(self.update_job)
+            self.update_job = None
+        self.pending_chars.clear()
+
+        self.var_order.set(getattr(self.current_generator(), "order", 0))
+
         # Load the values from the weight dict
         for key in self.var_consonants.keys():
             self.var_consonants[key].set(self.current_generator().weight_map[key] * 100)
         for key in self.var_vowels.keys():
             self.var_vowels[key].set(self.current_generator().weight_map[key] * 100)
 
+    def schedule_update(self, char: str):
+        """Update the weight of a character in the model on the next frame.
+
+        Consecutive moves of the sliders are coalesced into a single update.
+
+        Parameters:
+            char: The character whose weight changed.
+        """
+        self.pending_chars.add(char)
+        if self.update_job is None:
+            self.update_job = self.window.after(UPDATE_DELAY, self.update)
+
+    @PROFILER.instrument()
     def update(self, *args):
-        """Update model with data from the view."""
+        """Update model with data from the view.
+
+        Only the characters whose weight changed since the last update are read, all of them if none is pending.
+        """
+        self.update_job = None
+        chars, self.pending_chars = self.pending_chars or set(self.var_consonants) | set(self.var_vowels), set()
+
         # Set the values of the weight dict
-        for key in self.var_consonants.keys():
-            self.current_generator().weight_map[key] = float(self.var_consonants[key].get()) / 100
-        for key in self.var_vowels.keys():
-            self.current_generator().weight_map[key] = float(self.var_vowels[key].get()) / 100
-        self.current_generator().update_weights()
+        generator = self.current_generator()
+        for char in chars:
+            var = self.var_consonants[char] if char in self.var_consonants else self.var_vowels[char]
+            try:
+                generator.set_weight(char, float(var.get()) / 100)
+            except ValueError: # the spinbox is being edited
+                pass
 
     def setup_ui(self, parent):
         """Initialize the view.
@@ -112,7 +217,7 @@ class GeneratorController:
         Parameters:
             parent: The parent widget.
         """
-        window = Toplevel(parent)
+        window = self.window = Toplevel(parent)
         window.protocol("WM_DELETE_WINDOW", parent._root().destroy)
         window.title("Wordform Generator - Novan Lexical Network Editor")
         content = ttk.Frame(window)
@@ -186,10 +291,24 @@ class GeneratorController:
         syllable_count = ttk.Spinbox(frame, width=5, from_=1, to=10, textvariable=self.var_syllable_count)
         syllable_count.grid(sticky='nsew', column=2, row=1)
 
+        label = ttk.Label(frame, text="Min distance ")
+        label.grid(sticky='nsw', column=1, row=2)
+        min_distance = ttk.Spinbox(frame, width=5, from_=0, to=5, increment=.5, textvariable=self.var_min_distance)
+        min_distance.grid(sticky='nsew', column=2, row=2)
+
+        label = ttk.Label(frame, text="N-gram order ")
+        label.grid(sticky='nsw', column=1, row=3)
+        order = ttk.Spinbox(frame, width=5, from_=0, to=max(ORDERS), textvariable=self.var_order,
+            command=self.set_order)
+        order.grid(sticky='nsew', column=2, row=3)
+        order.bind("<FocusOut>", lambda event: self.set_order())
+
         button = ttk.Button(frame, text="New generator", command=self.new_generator)
-        button.grid(sticky='ew', row=2, column=0)
+        button.grid(sticky='ew', row=4, column=0)
         button = ttk.Button(frame, text="Save generators", command=self.save_generators)
-        button.grid(sticky='ew', row=2, column=1, columnspan=2)
+        button.grid(sticky='ew', row=4, column=1, columnspan=2)
+        button = ttk.Button(frame, text="Fit to lexicon", command=self.fit_generator)
+        button.grid(sticky='ew', row=5, column=0, columnspan=3)
 
     def _setup_vowels_ui(self, parent):
         """Initialize the vowels weights view.
@@ -205,9 +324,11 @@ class GeneratorController:
             var = self.var_vowels[v]
             label = ttk.Label(frame, text=v)
             label.grid(sticky='nsw', column=0, row=i, padx=PAD)
-            scale = ttk.Scale(frame, orient=HORIZONTAL, from_=0, to=100, variable=var, command=self.update)
+            scale = ttk.Scale(frame, orient=HORIZONTAL, from_=0, to=100, variable=var,
+                command=lambda value, char=v: self.schedule_update(char))
             scale.grid(sticky='nsew', column=1, row=i, padx=PAD)
-            spinbox = ttk.Spinbox(frame, textvariable=var, command=self.update, width=5, from_=0, to=100)
+            spinbox = ttk.Spinbox(frame, textvariable=var, command=lambda char=v: self.schedule_update(char),
+                width=5, from_=0, to=100)
             spinbox.grid(sticky='nse', column=2, row=i, padx=PAD)
 
     def _setup_consonants_ui(self, parent):
@@ -224,7 +345,9 @@ class GeneratorController:
             var = self.var_consonants[c]
             label = ttk.Label(frame, text=c)
             label.grid(sticky='nsw', column=0, row=i, padx=PAD)
-            scale = ttk.Scale(frame, orient=HORIZONTAL, from_=0, to=100, variable=var, command=self.update)
+            scale = ttk.Scale(frame, orient=HORIZONTAL, from_=0, to=100, variable=var,
+                command=lambda value, char=c: self.schedule_update(char))
             scale.grid(sticky='nsew', column=1, row=i, padx=PAD)
-            spinbox = ttk.Spinbox(frame, textvariable=var, command=self.update, width=5, from_=0, to=100)
+            spinbox = ttk.Spinbox(frame, textvariable=var, command=lambda char=c: self.schedule_update(char),
+                width=5, from_=0, to=100)
             spinbox.grid(sticky='nse', column=2, row=i, padx=PAD)
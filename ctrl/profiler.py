@@ -0,0 +1,233 @@
+"""Opt-in instrumentation of the controllers.
+
+Set the `NVN_PROFILE` environment variable to enable it, to `1` or to the path of the trace file:
+
+    NVN_PROFILE=trace.json python editor.py
+
+When enabled, the instrumented callbacks are timed and counted, the latency between a Tk input event and the next
+idle time (once the handlers ran and the widgets were redrawn) is measured, a summary is printed periodically, and the
+trace is written in the Chrome trace event format, which `chrome://tracing` or https://ui.perfetto.dev can open.
+When disabled, `instrument` returns the callbacks unchanged, so that instrumentation costs nothing.
+"""
+from tkinter import Tk
+import typing as t
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import contextlib
+
+ENV_VARIABLE = "NVN_PROFILE"
+DEFAULT_TRACE_PATH = "nvn-trace.json"
+SUMMARY_INTERVAL = 10000 # ms
+MAX_TRACE_EVENTS = 1000000
+LATENCY_EVENTS = ["<KeyPress>", "<ButtonPress>", "<ButtonRelease>", "<MouseWheel>"]
+LATENCY_NAME = "event-to-idle"
+LATENCY_TAG = "NvnLatency" # bindtag placed first on every widget, before the bindings which may "break"
+
+class Profiler:
+    """Timers, counters and trace of the instrumented callbacks."""
+
+    enabled: bool
+    trace_path: str
+    timings: t.Dict[str, t.List[float]] # name -> [count, total, maximum] in seconds
+    counters: t.Dict[str, int]
+    trace_events: t.List[t.Dict[str, t.Any]]
+    dropped_events: int
+
+    def __init__(self, trace_path: t.Optional[str] = None):
+        """Create a profiler.
+
+        Parameters:
+            trace_path: The path of the trace file, `None` to disable the profiler.
+        """
+        self.enabled = trace_path is not None
+        self.trace_path = trace_path
+        self.timings = {}
+        self.counters = {}
+        self.trace_events = []
+        self.dropped_events = 0
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._pending_latency = None
+        self._root = None
+        # the background threads record timings too
+        self._lock = threading.Lock()
+
+    def instrument(self, name: t.Optional[str] = None) -> t.Callable[[t.Callable], t.Callable]:
+        """Decorate a function to time each call.
+
+        Parameters:
+            name: The name of the timer, the qualified name of the function if not provided.
+
+        Returns:
+            The decorator, which leaves the function unchanged if the profiler is disabled.
+        """
+        def decorator(function: t.Callable) -> t.Callable:
+            if not self.enabled:
+                return function
+            timer_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(timer_name, start, time.perf_counter())
+            return wrapper
+        return decorator
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        """Time a block of code.
+
+        Parameters:
+            name: The name of the timer.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def count(self, name: str, n: int = 1):
+        """Increment a counter.
+
+        Parameters:
+            name: The name of the counter.
+            n: The increment.
+        """
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, start: float, end: float):
+        """Record a timed operation.
+
+        Parameters:
+            name: The name of the timer.
+            start: The `time.perf_counter` at the start of the operation.
+            end: The `time.perf_counter` at the end of the operation.
+        """
+        duration = end - start
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                self.timings[name] = [1, duration, duration]
+            else:
+                timing[0] += 1
+                timing[1] += duration
+                if duration > timing[2]:
+                    timing[2] = duration
+
+            if len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append({
+                    "name": name, "ph": "X", "pid": self._pid, "tid": threading.get_ident(),
+                    "ts": (start - self._origin) * 1e6, "dur": duration * 1e6})
+            else:
+                self.dropped_events += 1
+
+    def watch(self, root: Tk, summary_interval: int = SUMMARY_INTERVAL):
+        """Measure the event-to-idle latency of a Tk application, and print summaries periodically.
+
+        Parameters:
+            root: The root window.
+            summary_interval: The time between two summaries, in milliseconds.
+        """
+        if not self.enabled:
+            return
+        self._root = root
+        for sequence in LATENCY_EVENTS:
+            # the "all" bindings would not run after a binding returning "break", the first bindtag always does
+            root.bind_class(LATENCY_TAG, sequence, self._on_input, add="+")
+        self._tag_widgets(str(root))
+        # widgets created later are tagged when they are shown
+        root.bind_all("<Map>", lambda event: self._tag_widget(str(event.widget)), add="+")
+        root.after(summary_interval, self._periodic_summary, summary_interval)
+
+    def _tag_widget(self, path: str):
+        """Put `LATENCY_TAG` first in the bindtags of a widget."""
+        tk = self._root.tk
+        tags = tk.splitlist(tk.call("bindtags", path))
+        if LATENCY_TAG not in tags:
+            tk.call("bindtags", path, (LATENCY_TAG, *tags))
+
+    def _tag_widgets(self, path: str):
+        """Put `LATENCY_TAG` first in the bindtags of a widget and of its descendants."""
+        self._tag_widget(path)
+        for child in self._root.tk.splitlist(self._root.tk.call("winfo", "children", path)):
+            self._tag_widgets(str(child))
+
+    def _on_input(self, event):
+        """Start measuring the latency of an input event, unless one is already being measured."""
+        if self._pending_latency is None:
+            self._pending_latency = (time.perf_counter(), str(event.type))
+            self._root.after_idle(self._on_idle)
+
+    def _on_idle(self):
+        """Finish measuring the latency of an input event."""
+        start, event_type = self._pending_latency
+        self._pending_latency = None
+        self.record(LATENCY_NAME, start, time.perf_counter())
+        self.count(f"events.{event_type}")
+
+    def _periodic_summary(self, interval: int):
+        """Print the summary and save the trace, then schedule the next summary."""
+        print(self.summary(), file=sys.stderr)
+        self.write_trace()
+        self._root.after(interval, self._periodic_summary, interval)
+
+    def summary(self) -> str:
+        """Summarize the timers and counters, the slowest timers first."""
+        with self._lock:
+            timings = [(name, tuple(timing)) for name, timing in self.timings.items()]
+            counters = list(self.counters.items())
+        lines = [f"{'timer':48} {'count':>8} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for name, (count, total, maximum) in sorted(timings, key=lambda item: -item[1][1]):
+            lines.append(f"{name:48} {count:8} {total * 1e3:10.1f} {total / count * 1e3:9.2f} {maximum * 1e3:9.2f}")
+        for name, value in sorted(counters):
+            lines.append(f"{name:48} {value:8}")
+        if self.dropped_events:
+            lines.append(f"{self.dropped_events} trace events dropped")
+        return "\n".join(lines)
+
+    def write_trace(self, path: t.Optional[str] = None):
+        """Write the trace in the Chrome trace event format.
+
+        Parameters:
+            path: The path of the trace file, `trace_path` if not provided.
+        """
+        if not self.enabled:
+            return
+        path = path or self.trace_path
+        elapsed = (time.perf_counter() - self._origin) * 1e6
+        with self._lock:
+            trace_events = self.trace_events + [
+                {"name": name, "ph": "C", "pid": self._pid, "ts": elapsed, "args": {"value": value}}
+                for name, value in self.counters.items()]
+        try:
+            with open(path, "w") as file:
+                json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
+        except OSError as e:
+            print(f"Unable to write file '{path}': {e}")
+
+    def close(self):
+        """Print the final summary and write the trace."""
+        if self.enabled:
+            print(self.summary(), file=sys.stderr)
+            self.write_trace()
+
+def _trace_path() -> t.Optional[str]:
+    """Read the trace path from the environment, `None` if profiling is disabled."""
+    value = os.environ.get(ENV_VARIABLE, "")
+    if value in ("", "0"):
+        return None
+    return DEFAULT_TRACE_PATH if value == "1" else value
+
+PROFILER = Profiler(_trace_path())
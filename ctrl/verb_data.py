@@ -1,13 +1,24 @@
 """Verb data controller.
 
 Controlls I/O of verb data between the model and the actual data.
+
+Several editors may share the CSV file: the controller keeps the version of the file it loaded (its hash and the fields
+of its entries), and a save holding the write lock of the file merges the changes saved by others since then.
 """
 
 from tkinter import messagebox
+import threading
 import typing as t
 from model import Verb
-import pandas as pd
-from ast import literal_eval
+from model.neighbours import NeighbourIndex
+from model.completion import CompletionIndex
+from model.lexicon import Lexicon, Change, ADD, REMOVE, RESET
+from model.storage import VERBS_PATH, read_verbs, write_verbs, lock_file
+from model.snapshot import Snapshot, read_snapshot, write_snapshot, is_fresh, is_unchanged, file_digest
+from model.merge import Fields, Merge, Conflict, assign_uris, entry_fields, diff, three_way_merge, resolve
+from .profiler import PROFILER
+
+MAX_LISTED_CONFLICTS = 10
 
 class VerbDataController:
     """Verb data controller class.
@@ -16,10 +27,17 @@ class VerbDataController:
     """
 
     data_path: str
-    verbs: t.List[Verb]
-    #is_modified: bool
+    lexicon: Lexicon
+    nvn_index: t.Optional[NeighbourIndex]
+    completion_index: t.Optional[CompletionIndex]
+    is_modified: bool
+    refresh_thread: t.Optional[threading.Thread]
+    reloaded_verbs: t.Optional[t.Tuple[t.List[Verb], t.Optional[str]]] # verbs, hash of the file
+    base: t.Dict[str, Fields] # URI -> fields of the verbs of the loaded or saved file
+    base_digest: t.Optional[str]
+    changed_verbs: t.Dict[int, t.Tuple[Verb, bool]] # id -> verb changed since the base, is in the lexicon
 
-    def __init__(self, data_path: str = "data/verbs.csv"):
+    def __init__(self, data_path: str = VERBS_PATH):
         """Create a verb data controller.
 
         Controlls I/O of verb data between the model and the actual data.
@@ -28,26 +46,263 @@ class VerbDataController:
             data_path: Path to the verb data CSV.
         """
         self.data_path = data_path
-        self.verbs = []
+        self.lexicon = Lexicon()
+        self.lexicon.subscribe(self.on_changes)
+        self.nvn_index = None
+        self.completion_index = None
+        self.is_modified = False
+        self.refresh_thread = None
+        self.reloaded_verbs = None
+        self.base = {}
+        self.base_digest = None
+        self.changed_verbs = {}
         self.load()
 
+    @property
+    def verbs(self) -> t.List[Verb]:
+        """The verbs of the lexicon (modify them through `lexicon`)."""
+        return self.lexicon.entries
+
     def save(self):
         """Save the verb data to the CSV file."""
         if messagebox.askokcancel(
                 message=f'Are you sure you want to overwrite the data?',
                 icon='warning', title='Save'):
-            df = pd.DataFrame.from_records([v.__dict__ for v in self.verbs])
-            df.to_csv(self.data_path)
-        
+            try:
+                self.write()
+            except OSError as e: # including a timeout of the lock
+                messagebox.showerror(message=f"Unable to save '{self.data_path}': {e}", title='Save')
+
+    @PROFILER.instrument()
+    def write(self) -> bool:
+        """Write the verb data to the CSV file and its snapshot, without confirmation.
+
+        If the file changed since it was loaded, the changes saved by others are merged into the lexicon first. The
+        conflicts of the merge are resolved without holding the lock of the file, which is checked again afterwards.
+
+        Returns:
+            `True` if the data was written, `False` if the conflicts of the merge were not resolved.
+
+        Raises:
+            OSError: The file cannot be written, or its lock was not acquired.
+        """
+        assign_uris(self.verbs)
+        while True:
+            with lock_file(self.data_path):
+                try:
+                    digest = file_digest(self.data_path)
+                except OSError: # no file yet
+                    digest = None
+                if digest is None or digest == self.base_digest:
+                    write_verbs(self.verbs, self.data_path)
+                    snapshot = self.save_snapshot(self.verbs)
+                    break
+                theirs = read_verbs(self.data_path)
+            if not self.merge_file(theirs, digest):
+                return False
+        self.set_base(snapshot.digest if snapshot is not None else None)
+        return True
+
+    @PROFILER.instrument()
+    def merge_file(self, theirs: t.List[Verb], digest: str) -> bool:
+        """Merge the changes saved in the CSV file by others into the lexicon.
+
+        The merged version of the file becomes the base of the next merge, our changes being kept.
+
+        Parameters:
+            theirs: The verbs of the file.
+            digest: The hash of the file.
+
+        Returns:
+            `True` if the changes were merged, `False` if the conflicts were not resolved.
+        """
+        assign_uris(theirs, digest)
+        ours = {verb.uri: entry_fields(verb) if is_present else None
+            for verb, is_present in self.changed_verbs.values()}
+
+        merge = three_way_merge(self.base, ours, diff(self.base, theirs))
+        if merge.conflicts:
+            keep_ours = self.ask_conflicts(merge.conflicts)
+            if keep_ours is None:
+                return False
+            merge = resolve(merge, not keep_ours)
+        base = {verb.uri: entry_fields(verb) for verb in theirs}
+        self.apply_merge(merge)
+        self.base, self.base_digest = base, digest
+        return True
+
+    def ask_conflicts(self, conflicts: t.List[Conflict]) -> t.Optional[bool]:
+        """Ask which side of the conflicts of a merge to keep.
+
+        Returns:
+            `True` to keep our changes, `False` to take theirs, `None` to cancel the save.
+        """
+        lines = []
+        for conflict in conflicts[:MAX_LISTED_CONFLICTS]:
+            if conflict.field is None:
+                side = "you" if conflict.ours is None else "another editor"
+                lines.append(f"{conflict.uri}: deleted by {side}, modified by the other")
+            else:
+                lines.append(f"{conflict.uri}, {conflict.field}: yours {conflict.ours!r}, theirs {conflict.theirs!r}")
+        if len(conflicts) > MAX_LISTED_CONFLICTS:
+            lines.append(f"... and {len(conflicts) - MAX_LISTED_CONFLICTS} more")
+        return messagebox.askyesnocancel(
+            message=f"'{self.data_path}' was modified by another editor, and {len(conflicts)} change(s) conflict "
+                "with yours:\n\n" + "\n".join(lines) + "\n\nKeep your changes (Yes), take theirs (No), "
+                "or cancel the save?",
+            icon='warning', title='Concurrent modification')
+
+    def apply_merge(self, merge: Merge):
+        """Apply the changes of a merge to the lexicon, as a single modification."""
+        if not len(merge):
+            return
+        verbs = {verb.uri: verb for verb in self.verbs}
+        with self.lexicon.batch():
+            for uri in merge.removed:
+                if uri in verbs:
+                    self.lexicon.remove(verbs[uri])
+            for uri, fields in merge.updated.items():
+                if uri in verbs:
+                    self.lexicon.update(verbs[uri], **fields)
+            for verb in merge.added:
+                self.lexicon.add(verb)
+
+    def set_base(self, digest: t.Optional[str]):
+        """Take the current verbs as the version of the file with a given hash."""
+        self.base = {verb.uri: entry_fields(verb) for verb in self.verbs}
+        self.base_digest = digest
+        self.changed_verbs.clear()
+        self.is_modified = False
+
+    @PROFILER.instrument()
     def load(self):
-        """Load the verb data from the CSV file."""
-        self.verbs = []
+        """Load the verb data, from the snapshot of the CSV file if the file did not change.
+
+        A snapshot matching the size and modification time of the file is used directly, and its hash is checked in
+        the background (see `apply_reload`).
+        """
+        try:
+            snapshot = read_snapshot(self.data_path)
+        except (OSError, ValueError):
+            snapshot = None
+
+        if snapshot is not None and is_fresh(snapshot, self.data_path):
+            self.reset(snapshot.entries, snapshot.digest)
+            self.refresh_thread = threading.Thread(target=self.verify_snapshot, args=(snapshot,), daemon=True)
+            self.refresh_thread.start()
+        elif snapshot is not None and is_unchanged(snapshot, self.data_path):
+            # the file was only touched
+            self.reset(snapshot.entries, snapshot.digest)
+            self.save_snapshot(snapshot.entries, snapshot.digest)
+        else:
+            self.load_csv()
+
+    @PROFILER.instrument()
+    def load_csv(self):
+        """Load the verb data from the CSV file, and save its snapshot."""
+        verbs = []
+        snapshot = None
         try:
-            df = pd.read_csv(self.data_path, index_col=0, keep_default_na=False,
-                converters={'nvn_syllables': literal_eval})
-            for index, row in df.iterrows():
-                verb_dict = {name: value for name, value in zip(df.columns, row)}
-                verb = Verb(**verb_dict)
-                self.verbs.append(verb)
+            verbs = read_verbs(self.data_path)
         except Exception as e:
             print(f"Unable to load file '{self.data_path}', aborting: {e}")
+        else:
+            snapshot = self.save_snapshot(verbs)
+        self.reset(verbs, snapshot.digest if snapshot is not None else None)
+
+    def reset(self, verbs: t.List[Verb], digest: t.Optional[str] = None):
+        """Replace the verbs of the lexicon with the unmodified verbs of a file.
+
+        Parameters:
+            verbs: The verbs.
+            digest: The hash of the file, which the verbs without URI get their URI from.
+        """
+        assign_uris(verbs, digest)
+        self.lexicon.reset(verbs)
+        self.set_base(digest)
+
+    def save_snapshot(self, verbs: t.List[Verb], digest: t.Optional[str] = None) -> t.Optional[Snapshot]:
+        """Save the snapshot of the CSV file, with the verbs it holds."""
+        try:
+            return write_snapshot(self.data_path, verbs, digest)
+        except Exception as e:
+            print(f"Unable to save the snapshot of '{self.data_path}': {e}")
+            return None
+
+    @PROFILER.instrument()
+    def verify_snapshot(self, snapshot: Snapshot):
+        """Parse the CSV file again if its hash does not match the snapshot.
+
+        Runs in a background thread: the parsed verbs and the hash of the file are left in `reloaded_verbs` for
+        `apply_reload`.
+        """
+        if is_unchanged(snapshot, self.data_path):
+            return
+        try:
+            verbs = read_verbs(self.data_path)
+        except Exception as e:
+            print(f"Unable to load file '{self.data_path}', keeping its snapshot: {e}")
+            return
+        snapshot = self.save_snapshot(verbs)
+        self.reloaded_verbs = verbs, snapshot.digest if snapshot is not None else None
+
+    @PROFILER.instrument()
+    def apply_reload(self) -> bool:
+        """Replace the verbs loaded from a stale snapshot with the verbs parsed in the background.
+
+        Must be called from the main thread; the lexicon is kept if it was modified in the meantime.
+
+        Returns:
+            `True` if the background check is still running, `False` otherwise.
+        """
+        if self.refresh_thread is not None and self.refresh_thread.is_alive():
+            return True
+        self.refresh_thread = None
+        reloaded, self.reloaded_verbs = self.reloaded_verbs, None
+        if reloaded is not None:
+            if self.is_modified:
+                print(f"'{self.data_path}' changed on disk, keeping the modified verbs; they are merged on save.")
+            else:
+                self.reset(*reloaded)
+        return False
+
+    def on_changes(self, changes: t.List[Change]):
+        """Keep the modification flag and the wordform indexes up to date with the changes of the lexicon.
+
+        Parameters:
+            changes: The changes of the lexicon.
+        """
+        PROFILER.count("lexicon.changes", len(changes))
+        if any(change.kind != RESET for change in changes):
+            self.is_modified = True
+        for change in changes:
+            if change.kind != RESET:
+                self.changed_verbs[id(change.entry)] = (change.entry, change.kind != REMOVE)
+        if any(change.kind == RESET for change in changes):
+            self.nvn_index = self.completion_index = None
+            return
+        for index in (self.nvn_index, self.completion_index):
+            if index is None:
+                continue
+            for change in changes:
+                if change.kind == ADD:
+                    index.add(change.entry.nvn, change.entry)
+                elif change.kind == REMOVE:
+                    index.remove(change.entry.nvn, change.entry)
+                elif change.field == "nvn":
+                    index.remove(change.old, change.entry)
+                    index.add(change.new, change.entry)
+
+    @PROFILER.instrument()
+    def get_nvn_index(self) -> NeighbourIndex:
+        """Return the index of the Novan wordforms of the verbs, building it on first use."""
+        if self.nvn_index is None:
+            self.nvn_index = NeighbourIndex((verb.nvn, verb) for verb in self.verbs)
+        return self.nvn_index
+
+    @PROFILER.instrument()
+    def get_completion_index(self) -> CompletionIndex:
+        """Return the completion index of the Novan wordforms of the verbs, building it on first use."""
+        if self.completion_index is None:
+            self.completion_index = CompletionIndex((verb.nvn, verb) for verb in self.verbs)
+        return self.completion_index
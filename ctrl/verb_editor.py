@@ -1,10 +1,17 @@
 """Verb editor controller."""
-from tkinter import StringVar, BooleanVar, VERTICAL
+from tkinter import StringVar, BooleanVar, Variable, VERTICAL
 from tkinter import ttk
+import typing as t
+from model.lexicon import Change, UPDATE
+from model.text import check_text, token_window
 from view.var_text import VarText
 from .verb_list import VerbSelectorController
 from .wordform import WordformController
 from .constants import PRIME_TYPES
+from .profiler import PROFILER
+
+INVALID_TAG = "invalid"
+SUGGESTION_COUNT = 5
 
 class VerbEditorController:
     """Verb list and selector controller class."""
@@ -12,9 +19,10 @@ class VerbEditorController:
     verb_list_controller: VerbSelectorController
 
     nvn_controller: WordformController
-    nvn_description_controller: WordformController
 
     var_en: StringVar
+    var_nvn_desc: StringVar
+    var_nvn_suggestions: StringVar
 
     var_is_generic: BooleanVar
     var_is_state: BooleanVar
@@ -23,6 +31,10 @@ class VerbEditorController:
     var_is_transfer: BooleanVar
     var_prime: StringVar
 
+    field_vars: t.Dict[str, Variable] # verb field -> view variable
+    text_nvn_desc: VarText
+    highlight_job: t.Optional[str]
+
     def __init__(self, verb_list_controller: VerbSelectorController):
         """Create a verb list and selector controller.
         
@@ -32,49 +44,52 @@ class VerbEditorController:
         self.verb_list_controller = verb_list_controller
 
         self.nvn_controller = WordformController()
-        self.nvn_description_controller = WordformController()
-
-        self.var_en = StringVar("")
-        self.var_is_generic = BooleanVar(False)
-        self.var_is_state = BooleanVar(False)
-        self.var_is_process = BooleanVar(False)
-        self.var_is_cognition = BooleanVar(False)
-        self.var_is_transfer = BooleanVar(False)
-        self.var_prime = StringVar("")
-
-        self.var_en_desc = StringVar("")
 
+        self.var_en = StringVar(value="")
+        self.var_is_generic = BooleanVar(value=False)
+        self.var_is_state = BooleanVar(value=False)
+        self.var_is_process = BooleanVar(value=False)
+        self.var_is_cognition = BooleanVar(value=False)
+        self.var_is_transfer = BooleanVar(value=False)
+        self.var_prime = StringVar(value="")
+
+        self.var_nvn_desc = StringVar(value="")
+        self.var_nvn_suggestions = StringVar(value="")
+        self.var_en_desc = StringVar(value="")
+        self.text_nvn_desc = None
+        self.highlight_job = None
+
+        self.field_vars = {
+            "nvn": self.nvn_controller.nvn,
+            "en": self.var_en,
+            "is_generic": self.var_is_generic,
+            "is_state": self.var_is_state,
+            "is_process": self.var_is_process,
+            "is_cognition": self.var_is_cognition,
+            "is_transfer": self.var_is_transfer,
+            "prime": self.var_prime,
+            "nvn_desc": self.var_nvn_desc,
+            "en_desc": self.var_en_desc,
+        }
+
+        self.verb_list_controller.verb_data_controller.lexicon.subscribe(self.on_changes)
+        self.nvn_controller.nvn.trace("w", self.suggest_nvn)
+
+    @PROFILER.instrument()
     def refresh(self):
         """Update view with data from the model."""
         verb = self.verb_list_controller.current_verb
 
         if verb is not None:
-            self.nvn_controller.nvn.set(verb.nvn)
-            self.nvn_controller.nvn_syllables.set('|'.join(verb.nvn_syllables))
-            self.var_en.set(verb.en)
-            self.var_is_generic.set(verb.is_generic)
-            self.var_is_state.set(verb.is_state)
-            self.var_is_process.set(verb.is_process)
-            self.var_is_cognition.set(verb.is_cognition)
-            self.var_is_transfer.set(verb.is_transfer)
-            self.var_prime.set(verb.prime)
-
-            self.nvn_description_controller.nvn.set(verb.nvn_desc)
-            self.var_en_desc.set(verb.en_desc)
+            for field, var in self.field_vars.items():
+                self._set_var(var, getattr(verb, field))
+            self.nvn_controller.nvn_syllables.set(tuple(verb.nvn_syllables))
 
         else:
-            self.nvn_controller.nvn.set("")
-            self.var_en.set("")
-            self.var_is_generic.set(False)
-            self.var_is_state.set(False)
-            self.var_is_process.set(False)
-            self.var_is_cognition.set(False)
-            self.var_is_transfer.set(False)
-            self.var_prime.set("")
-
-            self.nvn_description_controller.nvn.set("")
-            self.var_en_desc.set("")
+            for var in self.field_vars.values():
+                self._set_var(var, False if isinstance(var, BooleanVar) else "")
 
+    @PROFILER.instrument()
     def update(self, *args):
         """Update model with data from the view."""
         verb = self.verb_list_controller.current_verb
@@ -83,22 +98,66 @@ class VerbEditorController:
             return
 
         try:
-            verb.set_nvn(self.nvn_controller.nvn.get())
+            self.verb_list_controller.verb_data_controller.lexicon.update(
+                verb, **{field: var.get() for field, var in self.field_vars.items()})
         except ValueError:
             return
 
-        verb.en = self.var_en.get()
-        verb.is_generic = self.var_is_generic.get()
-        verb.is_state = self.var_is_state.get()
-        verb.is_process = self.var_is_process.get()
-        verb.is_cognition = self.var_is_cognition.get()
-        verb.is_transfer = self.var_is_transfer.get()
-        verb.prime = self.var_prime.get()
+    @PROFILER.instrument()
+    def on_changes(self, changes: t.List[Change]):
+        """Update the widgets of the changed fields of the current verb.
 
-        verb.nvn_desc = self.nvn_description_controller.nvn.get()
-        verb.en_desc = self.var_en_desc.get()
+        Parameters:
+            changes: The changes of the lexicon.
+        """
+        verb = self.verb_list_controller.current_verb
+        for change in changes:
+            if change.kind == UPDATE and change.entry is verb and change.field in self.field_vars:
+                self._set_var(self.field_vars[change.field], change.new)
 
-        self.verb_list_controller.refresh()
+    @PROFILER.instrument()
+    def suggest_nvn(self, *args):
+        """Show the characters that may follow the Novan wordform and the other entries starting with it."""
+        verb = self.verb_list_controller.current_verb
+        nvn = self.nvn_controller.nvn.get()
+        if not nvn:
+            self.var_nvn_suggestions.set("")
+            return
+        suggestions = self.verb_list_controller.verb_data_controller.get_completion_index().suggest(
+            nvn, SUGGESTION_COUNT + 1)
+        completions = []
+        for form, entries in suggestions.completions:
+            entries = [entry for entry in entries if entry is not verb]
+            if entries:
+                completions.append(f"{form} ({', '.join(entry.en for entry in entries)})")
+        self.var_nvn_suggestions.set(
+            f"Next: {' '.join(suggestions.next_chars) or '-'}    "
+            f"Existing: {', '.join(completions[:SUGGESTION_COUNT]) or '-'}")
+
+    def schedule_highlight(self, *args):
+        """Highlight the Novan description once the text is synchronised with its variable."""
+        if self.highlight_job is None:
+            self.highlight_job = self.text_nvn_desc.after_idle(self.highlight_nvn_desc)
+
+    @PROFILER.instrument()
+    def highlight_nvn_desc(self):
+        """Highlight the invalid spans of the Novan description, in the tokens around the edited range."""
+        self.highlight_job = None
+        edited_range = self.text_nvn_desc.take_edited_range()
+        if edited_range is None:
+            return
+        text = self.text_nvn_desc.text
+        start, end = token_window(text, *edited_range)
+        self.text_nvn_desc.tag_remove(INVALID_TAG, f"1.0 + {start} chars", f"1.0 + {end} chars")
+        for error in check_text(text[start:end]):
+            self.text_nvn_desc.tag_add(INVALID_TAG, f"1.0 + {start + error.start} chars",
+                f"1.0 + {start + error.end} chars")
+
+    @staticmethod
+    def _set_var(var: Variable, value):
+        """Set a variable only if its value changes, to avoid firing its traces needlessly."""
+        if var.get() != value:
+            var.set(value)
 
     def setup_ui(self, parent):
         """Initialize the view.
@@ -132,6 +191,7 @@ class VerbEditorController:
         # Novan
         nvn_label = ttk.Label(parent, text="Novan ")
         nvn_entry = ttk.Entry(parent, textvariable=self.nvn_controller.nvn)
+        nvn_suggestions = ttk.Label(parent, textvariable=self.var_nvn_suggestions)
         # Novan syllables
         nvn_syllables_label = ttk.Label(parent, text="Syllables ")
         nvn_syllables = ttk.Label(parent, textvariable=self.nvn_controller.nvn_syllables)
@@ -145,16 +205,17 @@ class VerbEditorController:
 
         nvn_label.grid(sticky='ew', row=0, column=0)
         nvn_entry.grid(sticky='ew', row=0, column=1, columnspan=2)
-        nvn_syllables_label.grid(sticky='ew', row=1, column=0)
-        nvn_syllables.grid(sticky='ew', row=1, column=1)
-        nvn_play.grid(sticky='ew', row=1, column=2)
-        en_label.grid(sticky='ew', row=2, column=0)
-        en_entry.grid(sticky='ew', row=2, column=1, columnspan=2)
-        prime_label.grid(sticky='ew', row=3, column=0)
-        prime_box.grid(sticky='ew', row=3, column=1, columnspan=2)
+        nvn_suggestions.grid(sticky='ew', row=1, column=1, columnspan=2)
+        nvn_syllables_label.grid(sticky='ew', row=2, column=0)
+        nvn_syllables.grid(sticky='ew', row=2, column=1)
+        nvn_play.grid(sticky='ew', row=2, column=2)
+        en_label.grid(sticky='ew', row=3, column=0)
+        en_entry.grid(sticky='ew', row=3, column=1, columnspan=2)
+        prime_label.grid(sticky='ew', row=4, column=0)
+        prime_box.grid(sticky='ew', row=4, column=1, columnspan=2)
 
         # Bindings
-        reg = parent.register(lambda x: self.nvn_description_controller.validate_entry(nvn_entry, x))
+        reg = parent.register(lambda x: self.nvn_controller.validate_entry(nvn_entry, x))
         nvn_entry['validate'] = "key"
         nvn_entry['validatecommand'] = (reg, '%P')
 
@@ -189,8 +250,7 @@ class VerbEditorController:
     def _setup_desc_ui(self, parent):
         """Initialize the description editors of the view.
 
-        TODO:
-            Add Novan description validation.
+        The invalid words of the Novan description are highlighted.
         
         Parameters:
             parent: The parent widget.
@@ -220,7 +280,8 @@ class VerbEditorController:
         # Text fields
         # Novan
         self.text_nvn_desc = VarText(nvn_desc_label, wrap="word", height=10, width=60,
-            variable=self.nvn_description_controller.nvn)
+            variable=self.var_nvn_desc)
+        self.text_nvn_desc.tag_configure(INVALID_TAG, foreground='red', underline=True)
         self.text_nvn_desc.grid(sticky='nsew', column=0, row=0)
         nvn_scrollbar = ttk.Scrollbar(nvn_desc_label, orient=VERTICAL, command=self.text_nvn_desc.yview)
         self.text_nvn_desc.configure(yscrollcommand=nvn_scrollbar.set)
@@ -234,5 +295,7 @@ class VerbEditorController:
         en_scrollbar.grid(sticky='nse', column=1, row=0)
 
         # Bindings
+        self.var_nvn_desc.trace("w", self.schedule_highlight)
+        self.schedule_highlight()
         self.text_nvn_desc.bind("<KeyRelease>", self.update)
         self.text_en_desc.bind("<KeyRelease>", self.update)
@@ -1,9 +1,13 @@
 """Verb list and selector controller."""
-from tkinter import StringVar, BooleanVar, ttk, Listbox, VERTICAL
+from tkinter import StringVar, BooleanVar, ttk, VERTICAL
 import typing as t
+import bisect
 from model import Verb
+from model.lexicon import Change, REMOVE, RESET
+from view.virtual_list import VirtualListbox
 from .verb_data import VerbDataController
-from .constants import PRIME_TAGS
+from .constants import PRIME_TAGS, SIMILAR_COUNT, SIMILAR_MAX_DISTANCE, ROW_UPDATE_LIMIT
+from .profiler import PROFILER
 
 class VerbSelectorController:
     """Verb list and selector controller class."""
@@ -16,10 +20,13 @@ class VerbSelectorController:
     var_is_nvn: BooleanVar
     var_check_prime: BooleanVar
     var_check_completion: BooleanVar
+    var_check_similar: BooleanVar
     
     current_verbs: t.List[Verb]
-    var_verbs: StringVar
-    listbox_verbs: Listbox
+    current_labels: t.List[str]
+    verb_labels: t.Dict[int, str] # id of the verb -> label of its row in the list
+    is_sorted: bool # the list is sorted by label
+    listbox_verbs: VirtualListbox
 
     def __init__(self, verb_data_controller: VerbDataController):
         """Create a verb list and selector controller.
@@ -36,27 +43,59 @@ class VerbSelectorController:
         self.var_filter = StringVar(value="")
         self.var_check_prime = BooleanVar(value=False)
         self.var_check_completion = BooleanVar(value=False)
+        self.var_check_similar = BooleanVar(value=False)
 
-        self.var_verbs = StringVar()
         self.current_verbs = None
+        self.current_labels = None
+        self.verb_labels = {}
+        self.is_sorted = True
+        self.listbox_verbs = None
 
-    def refresh(self):
+        self.verb_data_controller.lexicon.subscribe(self.on_changes)
+
+    @PROFILER.instrument()
+    def refresh(self, *args):
         """Update view with data from the model."""
         self.filter_verbs()
+        self.listbox_verbs.set_rows(len(self.current_labels), self.current_labels.__getitem__)
 
         # If the currently edited verb is in the list, select it
-        if self.current_verb is not None and self.current_verb in self.current_verbs:
-            index = self.current_verbs.index(self.current_verb)
-            self.listbox_verbs.selection_clear(0, len(self.current_verbs))
-            self.listbox_verbs.selection_set(index, index)
-
-        if self.editor_refresh is not None:
-            self.editor_refresh()
+        self.listbox_verbs.select(self.verb_row(self.current_verb))
 
     def update(self, *args):
         """Update model with data from the view."""
         pass
 
+    @PROFILER.instrument()
+    def on_changes(self, changes: t.List[Change]):
+        """Update the rows of the changed verbs.
+
+        Parameters:
+            changes: The changes of the lexicon.
+        """
+        if self.listbox_verbs is None:
+            return
+
+        # last state of each changed verb: id -> (verb, is in the lexicon)
+        changed = {}
+        for change in changes:
+            if change.kind == RESET:
+                self.current_verb = None
+                self.refresh()
+                if self.editor_refresh is not None:
+                    self.editor_refresh()
+                return
+            changed[id(change.entry)] = (change.entry, change.kind != REMOVE)
+
+        if self.is_similar_search() or len(changed) > ROW_UPDATE_LIMIT:
+            self.refresh()
+            return
+
+        for verb, is_present in changed.values():
+            self._update_row(verb, is_present)
+        self.listbox_verbs.set_rows(len(self.current_labels), self.current_labels.__getitem__)
+        self.listbox_verbs.select(self.verb_row(self.current_verb))
+
     def setup_ui(self, parent):
         """Initialize the view.
         
@@ -82,15 +121,18 @@ class VerbSelectorController:
             command=self.refresh)
         check_prime = ttk.Checkbutton(search_ui, text='Prime label', variable=self.var_check_prime)
         check_completion = ttk.Checkbutton(search_ui, text='Completion rate', variable=self.var_check_completion)
+        check_similar = ttk.Checkbutton(search_ui, text='Sounds like (Novan)', variable=self.var_check_similar)
         radio_nvn.grid(sticky='ew', row=1, column=0)
         radio_en.grid(sticky='ew', row=1, column=1)
         check_prime.grid(sticky='ew', row=2, column=0)
         check_completion.grid(sticky='ew', row=2, column=1)
+        check_similar.grid(sticky='ew', row=3, column=0, columnspan=2)
         check_prime["command"] = self.refresh
         check_completion["command"] = self.refresh
+        check_similar["command"] = self.refresh
 
         # list
-        self.listbox_verbs = Listbox(parent, height=10, listvariable=self.var_verbs)
+        self.listbox_verbs = VirtualListbox(parent, height=10)
         self.listbox_verbs.bind("<<ListboxSelect>>", self.select_event)
         scrollbar = ttk.Scrollbar(parent, orient=VERTICAL, command=self.listbox_verbs.yview)
         self.listbox_verbs.configure(yscrollcommand=scrollbar.set)
@@ -98,45 +140,142 @@ class VerbSelectorController:
         scrollbar.grid(sticky='nse', row=2, column=2)
 
         self.refresh()
+        self.select_verb(self.current_verb)
 
     def select_event(self, *args):
         """Update the current verb in accordance to the selected verb in the list."""
         if len(indices := self.listbox_verbs.curselection()) == 1:
             index = int(indices[0])
-            self.current_verb = self.current_verbs[index]
-            self.refresh()
+            self.select_verb(self.current_verbs[index])
+
+    @PROFILER.instrument()
+    def select_verb(self, verb: t.Optional[Verb]):
+        """Set the current verb, select it in the list and refresh the editor.
+
+        Parameters:
+            verb: The verb to edit, `None` to edit no verb.
+        """
+        self.current_verb = verb
+        self.listbox_verbs.select(self.verb_row(verb))
+
+        if self.editor_refresh is not None:
+            self.editor_refresh()
+
+    def is_similar_search(self) -> bool:
+        """Return `True` if the list shows the phonological neighbours of the search, `False` otherwise."""
+        return bool(self.var_is_nvn.get() and self.var_filter.get().strip() and self.var_check_similar.get())
 
+    def verb_label(self, verb: Verb, is_nvn: bool, check_completion: bool, check_prime: bool) -> str:
+        """Compute the label of a verb in the list.
+
+        Parameters:
+            verb: The verb to label.
+            is_nvn: `True` to label with the Novan wordform, `False` for the English one.
+            check_completion: `True` to add the completion rate of the verb.
+            check_prime: `True` to add the prime tag of the verb.
+
+        Returns:
+            The label of the verb.
+        """
+        # get label in the correct language
+        verb_label = verb.nvn if is_nvn else verb.en
+
+        # add completion rate
+        if check_completion:
+            criterion = (
+                any((verb.is_cognition,
+                    verb.is_generic,
+                    verb.is_process,
+                    verb.is_state,
+                    verb.is_transfer)),
+                verb.nvn != "",
+                verb.en != "",
+                verb.nvn_desc != "",
+                verb.en_desc != "",
+                verb.prime != "")
+            verb_label = f"[{sum(criterion)}/{len(criterion)}] " + verb_label
+
+        # add prime label
+        if check_prime:
+            verb_label = PRIME_TAGS.get(verb.prime, "?") + " " + verb_label
+
+        return verb_label
+
+    @PROFILER.instrument()
     def filter_verbs(self):
         """Filter the list of verbs from the data controller."""
+        is_nvn = self.var_is_nvn.get()
+        check_completion = self.var_check_completion.get()
+        check_prime = self.var_check_prime.get()
+        search = self.var_filter.get().strip().lower()
+        # phonological neighbours of the searched wordform, closest first
+        similar = self.is_similar_search()
+
+        if similar:
+            verbs = [verb
+                for _, _, neighbours in self.verb_data_controller.get_nvn_index().nearest(
+                    search, SIMILAR_COUNT, SIMILAR_MAX_DISTANCE)
+                for verb in neighbours]
+        else:
+            verbs = self.verb_data_controller.verbs
+
         verb_list = []
-        for verb in self.verb_data_controller.verbs:
-            # get label in the correct language
-            verb_label = verb.nvn if self.var_is_nvn.get() else verb.en
-
-            # add completion rate
-            if self.var_check_completion.get():
-                criterion = (
-                    any((verb.is_cognition,
-                        verb.is_generic,
-                        verb.is_process,
-                        verb.is_state,
-                        verb.is_transfer)),
-                    verb.nvn != "",
-                    verb.en != "",
-                    verb.nvn_desc != "",
-                    verb.en_desc != "",
-                    verb.prime != "")
-                verb_label = f"[{sum(criterion)}/{len(criterion)}] " + verb_label
-
-            # add prime label
-            if self.var_check_prime.get():
-                verb_label = PRIME_TAGS.get(verb.prime, "?") + " " + verb_label
+        for verb in verbs:
+            verb_label = self.verb_label(verb, is_nvn, check_completion, check_prime)
 
             # filtering
-            if not (search := self.var_filter.get().strip().lower()) or search in verb_label:
+            if similar or not search or search in verb_label:
                 verb_list.append((verb_label, verb,))
 
-        verb_list = sorted(verb_list, key=lambda x: x[0])
+        if not similar:
+            verb_list = sorted(verb_list, key=lambda x: x[0])
 
         self.current_verbs = [x[1] for x in verb_list]
-        self.var_verbs.set(tuple(x[0] for x in verb_list))
+        self.current_labels = [x[0] for x in verb_list]
+        self.verb_labels = {id(verb): label for label, verb in verb_list}
+        self.is_sorted = not similar
+
+    def verb_row(self, verb: t.Optional[Verb]) -> t.Optional[int]:
+        """Find the row of a verb in the list.
+
+        The row is looked up by the label of the verb rather than stored, so that moving a row does not renumber the
+        rows after it.
+
+        Parameters:
+            verb: The verb.
+
+        Returns:
+            The row of the verb, `None` if it is not listed.
+        """
+        label = self.verb_labels.get(id(verb))
+        if label is None:
+            return None
+        if not self.is_sorted:
+            return next(row for row, other in enumerate(self.current_verbs) if other is verb)
+        row = bisect.bisect_left(self.current_labels, label)
+        while self.current_verbs[row] is not verb: # rows of equal labels
+            row += 1
+        return row
+
+    def _update_row(self, verb: Verb, is_present: bool):
+        """Move, insert or remove the row of a verb, keeping the list sorted.
+
+        Parameters:
+            verb: The changed verb.
+            is_present: `True` if the verb is in the lexicon, `False` if it was removed.
+        """
+        row = self.verb_row(verb)
+        if row is not None:
+            del self.current_verbs[row]
+            del self.current_labels[row]
+            del self.verb_labels[id(verb)]
+
+        if is_present:
+            search = self.var_filter.get().strip().lower()
+            verb_label = self.verb_label(verb, self.var_is_nvn.get(), self.var_check_completion.get(),
+                self.var_check_prime.get())
+            if not search or search in verb_label:
+                row = bisect.bisect_right(self.current_labels, verb_label)
+                self.current_verbs.insert(row, verb)
+                self.current_labels.insert(row, verb_label)
+                self.verb_labels[id(verb)] = verb_label
@@ -5,12 +5,10 @@ Handles the processes to go manipulate wordforms and the corresponding sounds.
 from tkinter import StringVar, Text, ttk
 import typing as t
 from model.nvn import ALPHABET, is_valid, syllabify
-from pydub import AudioSegment
+from model.syllables import SYLLABLE_TABLE
+from model.audio import render
 from pydub.playback import play
-
-WAV_PATH = "nvn-syl/{}.wav"
-INTER_SYLLABLE_BLANK_DURATION = -250
-VOLUME_AJUST = lambda sound: sound + 0
+from .profiler import PROFILER
 
 class WordformController:
     """Wordform controller class.
@@ -30,21 +28,21 @@ class WordformController:
             nvn: The Novan wordform.
             nvn_syllables: The syllables corresponding to the Novan wordform.
         """
-        self.nvn = StringVar(nvn)
-        self.nvn_syllables = StringVar(tuple(syl for syl in nvn_syllables))
+        self.nvn = StringVar(value=nvn)
+        self.nvn_syllables = StringVar(value=tuple(syl for syl in nvn_syllables))
         self.nvn.trace("w", self.syllabify)
 
+    @PROFILER.instrument()
     def pronounce(self):
         """Plays audio corresponding to the syllables."""
         print(f"Pronouncing {self.nvn_syllables.get()}.")
-        syls = self.get_syllable_list()
-        if len(syls) > 0:
-            full_sound = AudioSegment.from_wav(WAV_PATH.format(syls[0]))[:INTER_SYLLABLE_BLANK_DURATION]
-            for syl in syls[1:]:
-                full_sound += AudioSegment.from_wav(WAV_PATH.format(syl))[:INTER_SYLLABLE_BLANK_DURATION]
-            
-        play(full_sound)
+        with PROFILER.span("WordformController.pronounce.render"):
+            full_sound = render(SYLLABLE_TABLE.encode(self.get_syllable_list()))
+        if full_sound is not None:
+            with PROFILER.span("WordformController.pronounce.play"):
+                play(full_sound)
 
+    @PROFILER.instrument()
     def validate_entry(self, entry: ttk.Entry, nvn: t.Optional[str] = None):
         """Validate the content of a Tkinter entry.
 
@@ -106,6 +104,7 @@ class WordformController:
 
         return is_alphabetic
 
+    @PROFILER.instrument()
     def syllabify(self, *args):
         """Fire when nvn gets updated."""
         nvn = self.nvn.get()
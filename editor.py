@@ -1,6 +1,7 @@
 """Editor for the Novan lexical network."""
 from tkinter import Tk, font
 from ctrl.editor import EditorController
+from ctrl.profiler import PROFILER
 
 if __name__ == "__main__":
     # verb mode
@@ -26,5 +27,9 @@ if __name__ == "__main__":
         font_ = font.nametofont(font_name)
         font_.configure(size=font_["size"] - 6)
 
+    # measure the responsiveness if profiling is enabled
+    PROFILER.watch(root)
+
     # run
     root.mainloop()
+    PROFILER.close()
@@ -1,2 +1,12 @@
 # /bin/bash
-pyinstaller -F editor.py --exclude-module IPython:ipykernel
+# the editor only concatenates the compiled clips of the syllables
+python cli.py build-clips
+# read-only tools can read the compiled lexicon without parsing the CSV
+python cli.py bundle
+# the compiled clips and lexicon are packaged, the files found next to the executable taking precedence
+pyinstaller -F editor.py --exclude-module IPython:ipykernel --add-data "data/clip-cache:data/clip-cache"
+# the command-line tools do not need the GUI; pandas and pydub are still bundled for the commands loading them
+pyinstaller -F cli.py --exclude-module IPython:ipykernel --exclude-module tkinter \
+    --add-data "data/clip-cache:data/clip-cache" --add-data "data/verbs.nvnlex:data"
+# one-file builds unpack themselves on every start, check the cold-start time of the result
+python startup_time.py dist/cli validate kala
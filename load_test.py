@@ -0,0 +1,178 @@
+"""Load test of the lookup service of `server.py`: throughput and latency percentiles.
+
+Each connection sends its requests one after the other over a kept-alive connection; the wordforms are drawn among
+`--distinct` synthetic wordforms, so that the share of cached answers can be tuned.
+
+Examples:
+    python load_test.py --serve --endpoint syllabify --connections 32 --requests 20000
+    python load_test.py --endpoint batch-validate --batch-size 1000 --requests 200
+    python load_test.py --port 8765 --endpoint generate --syllables 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import typing as t
+from urllib.parse import quote
+from bench.synthetic import synthetic_wordform
+
+HOST = "127.0.0.1"
+PORT = 8765
+ENDPOINTS = ["validate", "syllabify", "pronounce", "generate", "batch-validate", "batch-syllabify"]
+STARTUP_TIMEOUT = 30. # s
+PERCENTILES = [50, 90, 99]
+
+def make_requests(args: argparse.Namespace) -> t.List[bytes]:
+    """Create the HTTP requests sent by the load test.
+
+    Parameters:
+        args: The options of the load test.
+
+    Returns:
+        The raw requests, in the order they are sent.
+    """
+    rng = random.Random(args.seed)
+    forms = [synthetic_wordform(rng, rng.randint(1, args.syllables)) for _ in range(args.distinct)]
+    host = f"Host: {args.host}:{args.port}\r\n"
+    requests = []
+    for _ in range(args.requests):
+        if args.endpoint.startswith("batch-"):
+            body = json.dumps({"nvn": rng.choices(forms, k=args.batch_size)}).encode()
+            requests.append(
+                f"POST /batch/{args.endpoint[len('batch-'):]} HTTP/1.1\r\n{host}"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        elif args.endpoint == "generate":
+            requests.append(f"GET /generate?syllables={args.syllables} HTTP/1.1\r\n{host}\r\n".encode())
+        else:
+            requests.append(f"GET /{args.endpoint}?nvn={quote(rng.choice(forms))} HTTP/1.1\r\n{host}\r\n".encode())
+    return requests
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    """Read an HTTP response, returning its status."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+async def run_connection(host: str, port: int, requests: t.List[bytes], latencies: t.List[float],
+        statuses: t.Dict[int, int]):
+    """Send requests one after the other over a connection, recording their latency and status."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+async def load_test(args: argparse.Namespace) -> t.Dict[str, t.Any]:
+    """Run the load test.
+
+    Returns:
+        The report: counts, throughput in requests per second, and latencies in milliseconds.
+    """
+    requests = make_requests(args)
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(args.host, args.port, requests[i::args.connections], latencies, statuses)
+        for i in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "endpoint": args.endpoint,
+        "connections": args.connections,
+        "requests": len(latencies),
+        "statuses": statuses,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1e3,
+            **{f"p{p}": quantiles[p - 1] * 1e3 for p in PERCENTILES},
+            "max": latencies[-1] * 1e3,
+        },
+    }
+
+async def wait_for_server(host: str, port: int, timeout: float = STARTUP_TIMEOUT):
+    """Wait until the service accepts connections.
+
+    Raises:
+        TimeoutError: The service did not start in time.
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"No service on {host}:{port} after {timeout} s.")
+            await asyncio.sleep(.1)
+            continue
+        writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+        await read_response(reader)
+        writer.close()
+        return
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    """Run the load test and print its report.
+
+    Returns:
+        1 if a request failed, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST, help="host of the service")
+    parser.add_argument("--port", type=int, default=PORT, help="port of the service")
+    parser.add_argument("--serve", action="store_true", help="start the service for the duration of the test")
+    parser.add_argument("--workers", type=int, help="number of worker processes of the started service")
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="syllabify", help="endpoint to load")
+    parser.add_argument("-c", "--connections", type=int, default=16, help="number of concurrent connections")
+    parser.add_argument("-n", "--requests", type=int, default=10000, help="total number of requests")
+    parser.add_argument("--distinct", type=int, default=1000, help="number of distinct wordforms looked up")
+    parser.add_argument("--batch-size", type=int, default=100, help="wordforms per batch request")
+    parser.add_argument("--syllables", type=int, default=3, help="maximum number of syllables of the wordforms")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic wordforms")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.serve:
+        command = [sys.executable, "server.py", "--host", args.host, "--port", str(args.port)]
+        if args.workers is not None:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command)
+    try:
+        asyncio.run(wait_for_server(args.host, args.port, STARTUP_TIMEOUT if server else 0))
+        report = asyncio.run(load_test(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report["latency_ms"]
+        print(f"{report['requests']} requests to /{report['endpoint']} over {report['connections']} connections "
+            f"in {report['seconds']:.2f} s: {report['throughput']:.0f} req/s")
+        print("latency (ms): " + ", ".join(f"{name} {value:.2f}" for name, value in latency.items()))
+        print("statuses: " + ", ".join(f"{status} x{count}" for status, count in sorted(report["statuses"].items())))
+    return 0 if set(report["statuses"]) <= {200} else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
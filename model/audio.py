@@ -0,0 +1,185 @@
+"""Pronunciation of Novan wordforms from the audio clips of their syllables.
+
+The clips of `nvn-syl/` are compiled by `build_clips` (`python cli.py build-clips`): converted to a single format, their
+silences cut to fixed margins and their loudness normalized, then stored as raw samples in `CLIP_CACHE`. At runtime a
+clip is read as ready-to-play bytes, and the sound of a wordform is the concatenation of the bytes of its syllables.
+A clip missing from the cache or older than its source is compiled in memory when it is loaded.
+
+pydub is only imported when a clip is compiled or a sound is rendered, so that importing `model` stays fast.
+"""
+import typing as t
+import os
+import json
+from .syllables import SYLLABLE_TABLE
+from .snapshot import file_stat
+from .storage import packaged_path
+
+CLIP_CACHE = "data/clip-cache"
+CLIP_SUFFIX = ".pcm"
+MANIFEST_NAME = "manifest.json"
+CLIP_VERSION = 1
+FRAME_RATE = 22050 # Hz
+SAMPLE_WIDTH = 2 # bytes
+CHANNELS = 1
+SILENCE_THRESHOLD = -50. # dBFS
+LEADING_SILENCE = 100 # ms, kept before the sound of a syllable
+TRAILING_SILENCE = 50 # ms, kept after the sound of a syllable
+TARGET_LOUDNESS = -24. # dBFS
+MAX_PEAK = -1. # dBFS
+
+CLIPS: t.Dict[int, bytes] = {} # syllable ID -> compiled clip
+MANIFESTS: t.Dict[str, t.Dict[str, t.List[int]]] = {} # cache directory -> syllable -> size and mtime of the source
+
+def clip_settings() -> t.Dict[str, t.Any]:
+    """Return the settings of the compilation, the compiled clips being rebuilt when they change."""
+    return {
+        "version": CLIP_VERSION,
+        "frame_rate": FRAME_RATE,
+        "sample_width": SAMPLE_WIDTH,
+        "channels": CHANNELS,
+        "silence_threshold": SILENCE_THRESHOLD,
+        "leading_silence": LEADING_SILENCE,
+        "trailing_silence": TRAILING_SILENCE,
+        "target_loudness": TARGET_LOUDNESS,
+        "max_peak": MAX_PEAK,
+    }
+
+def compile_clip(path: str) -> bytes:
+    """Compile the audio clip of a syllable.
+
+    Parameters:
+        path: The path of the WAV clip.
+
+    Returns:
+        The raw samples of the clip, in the format of the settings.
+
+    Raises:
+        OSError: The clip cannot be read.
+    """
+    from pydub import AudioSegment
+    from pydub.silence import detect_leading_silence
+    sound = AudioSegment.from_wav(path).set_channels(CHANNELS).set_sample_width(SAMPLE_WIDTH).set_frame_rate(FRAME_RATE)
+    start = detect_leading_silence(sound, SILENCE_THRESHOLD)
+    end = len(sound) - detect_leading_silence(sound.reverse(), SILENCE_THRESHOLD)
+    if end > start: # a silent clip is left as it is
+        speech = sound[start:end]
+        speech = speech.apply_gain(min(TARGET_LOUDNESS - speech.dBFS, MAX_PEAK - speech.max_dBFS))
+        sound = (AudioSegment.silent(LEADING_SILENCE, FRAME_RATE) + speech
+            + AudioSegment.silent(TRAILING_SILENCE, FRAME_RATE))
+    return sound.raw_data
+
+def clip_path(syllable: str, directory: str = CLIP_CACHE) -> str:
+    """Return the path of the compiled clip of a syllable."""
+    return os.path.join(directory, syllable + CLIP_SUFFIX)
+
+def read_manifest(directory: str = CLIP_CACHE) -> t.Dict[str, t.List[int]]:
+    """Read the manifest of compiled clips.
+
+    Parameters:
+        directory: The directory of the compiled clips.
+
+    Returns:
+        Syllable -> size and modification time of the source of its compiled clip; empty if the manifest is missing
+        or was compiled with other settings.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("clips", {}) if manifest.get("settings") == clip_settings() else {}
+
+def build_clips(directory: str = CLIP_CACHE, force: bool = False) -> t.Tuple[int, int, int]:
+    """Compile the audio clips of the syllables which changed since they were last compiled.
+
+    Parameters:
+        directory: The directory of the compiled clips.
+        force: `True` to compile all the clips.
+
+    Returns:
+        The number of compiled clips, of clips up to date, and of syllables without clip.
+    """
+    os.makedirs(directory, exist_ok=True)
+    previous = {} if force else read_manifest(directory)
+    clips = {}
+    compiled = missing = 0
+    for syllable_id, syllable in enumerate(SYLLABLE_TABLE.syllables):
+        source = SYLLABLE_TABLE.wav_path(syllable_id)
+        try:
+            stat = list(file_stat(source))
+        except OSError:
+            missing += 1
+            continue
+        path = clip_path(syllable, directory)
+        if previous.get(syllable) != stat or not os.path.exists(path):
+            with open(path + ".tmp", "wb") as file:
+                file.write(compile_clip(source))
+            os.replace(path + ".tmp", path)
+            compiled += 1
+        clips[syllable] = stat
+
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as file:
+        json.dump({"settings": clip_settings(), "clips": clips}, file)
+    os.replace(path + ".tmp", path)
+    MANIFESTS.pop(directory, None)
+    return compiled, len(clips) - compiled, missing
+
+def load_clip(syllable_id: int, directory: str = CLIP_CACHE) -> bytes:
+    """Read the compiled clip of a syllable, or compile it if it is missing or outdated.
+
+    Parameters:
+        syllable_id: The ID of the syllable in `SYLLABLE_TABLE`.
+        directory: The directory of the compiled clips.
+
+    Raises:
+        OSError: The syllable has no clip.
+    """
+    if directory not in MANIFESTS:
+        MANIFESTS[directory] = read_manifest(directory)
+    syllable = SYLLABLE_TABLE.syllables[syllable_id]
+    source = SYLLABLE_TABLE.wav_path(syllable_id)
+    stat = MANIFESTS[directory].get(syllable)
+    if stat is not None:
+        try:
+            is_fresh = list(file_stat(source)) == stat
+        except OSError: # the compiled clips may be distributed without their source
+            is_fresh = True
+        if is_fresh:
+            try:
+                with open(clip_path(syllable, directory), "rb") as file:
+                    return file.read()
+            except OSError:
+                pass
+    return compile_clip(source)
+
+def get_clip(syllable_id: int) -> bytes:
+    """Load the compiled clip of a syllable, once.
+
+    Parameters:
+        syllable_id: The ID of the syllable in `SYLLABLE_TABLE`.
+
+    Raises:
+        OSError: The syllable has no clip.
+    """
+    if syllable_id not in CLIPS:
+        CLIPS[syllable_id] = load_clip(syllable_id, packaged_path(CLIP_CACHE))
+    return CLIPS[syllable_id]
+
+def render(syllable_ids: t.Sequence[int]) -> t.Optional["AudioSegment"]:
+    """Concatenate the clips of syllables.
+
+    Parameters:
+        syllable_ids: The IDs of the syllables in `SYLLABLE_TABLE`.
+
+    Returns:
+        The sound of the syllables, `None` if there are no syllables.
+
+    Raises:
+        OSError: A syllable has no clip.
+    """
+    if len(syllable_ids) == 0:
+        return None
+    from pydub import AudioSegment
+    data = b"".join([get_clip(syllable_id) for syllable_id in syllable_ids])
+    return AudioSegment(data=data, sample_width=SAMPLE_WIDTH, frame_rate=FRAME_RATE, channels=CHANNELS)
@@ -0,0 +1,242 @@
+"""Compiled, read-only lexicon bundle.
+
+A bundle is a single binary file holding the verbs of the lexicon, read through a memory map without pandas and without
+parsing the whole file, so that it opens instantly and its pages are shared by all the processes reading it.
+
+Layout (little-endian):
+    header: magic, version, number of entries, and the offsets of the sections;
+    records: one fixed-width record per entry, holding the offset and length of each text field in the string pool and
+        the boolean fields packed as bits;
+    indexes: for each field of `INDEXED_FIELDS`, the rows of the entries sorted by the UTF-8 value of the field;
+    string pool: the distinct UTF-8 strings of the text fields.
+"""
+import typing as t
+import os
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from .verb import Verb
+from .storage import packaged_path
+
+BUNDLE_PATH = "data/verbs.nvnlex"
+BUNDLE_SUFFIX = ".nvnlex"
+BUNDLE_MAGIC = b"NVNLEX\0\0"
+BUNDLE_VERSION = 1
+TEXT_FIELDS = ["uri", "nvn", "nvn_syllables", "en", "nvn_desc", "en_desc", "prime"]
+FLAG_FIELDS = ["is_generic", "is_state", "is_process", "is_cognition", "is_transfer"]
+INDEXED_FIELDS = ["nvn", "en"]
+SYLLABLE_SEPARATOR = "."
+
+HEADER = struct.Struct("<8sII" + "I" * (2 + len(INDEXED_FIELDS))) # magic, version, count, records, pool, indexes
+RECORD = struct.Struct("<" + "II" * len(TEXT_FIELDS) + "B3x") # (offset, length) per text field, flags
+TEXT = struct.Struct("<II")
+ROW = struct.Struct("<I")
+
+def _text(entry: Verb, field: str) -> str:
+    """Return a field of an entry as stored in the string pool."""
+    if field == "nvn_syllables":
+        return SYLLABLE_SEPARATOR.join(entry.nvn_syllables)
+    return getattr(entry, field)
+
+def write_bundle(entries: t.Sequence[Verb], path: str = BUNDLE_PATH):
+    """Compile verbs into a bundle.
+
+    The bundle is written to a temporary file first and then replaced, so that readers never see a partial file;
+    readers holding the previous bundle keep their map of it.
+
+    Parameters:
+        entries: The verbs.
+        path: The path of the bundle.
+    """
+    pool = bytearray()
+    offsets = {} # UTF-8 string -> offset in the pool
+    keys = {field: [] for field in INDEXED_FIELDS}
+    records = bytearray(RECORD.size * len(entries))
+    for row, entry in enumerate(entries):
+        values = []
+        for field in TEXT_FIELDS:
+            data = _text(entry, field).encode()
+            if data not in offsets:
+                offsets[data] = len(pool)
+                pool += data
+            values += [offsets[data], len(data)]
+            if field in keys:
+                keys[field].append(data)
+        flags = sum(bool(getattr(entry, field)) << bit for bit, field in enumerate(FLAG_FIELDS))
+        RECORD.pack_into(records, RECORD.size * row, *values, flags)
+
+    # rows of equal values stay in the order of the lexicon
+    indexes = [struct.pack(f"<{len(entries)}I", *sorted(range(len(entries)), key=keys[field].__getitem__))
+        for field in INDEXED_FIELDS]
+    records_offset = HEADER.size
+    index_offsets = [records_offset + len(records) + i * ROW.size * len(entries) for i in range(len(indexes))]
+    pool_offset = records_offset + len(records) + sum(len(index) for index in indexes)
+    header = HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(entries), records_offset, pool_offset, *index_offsets)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        for section in [header, records, *indexes, pool]:
+            file.write(section)
+    os.replace(temporary_path, path)
+
+class _Keys:
+    """Sorted values of an indexed field, read on access for the binary searches."""
+
+    def __init__(self, bundle: "LexiconBundle", field: str):
+        self.bundle = bundle
+        self.offset = bundle.index_offsets[field]
+        self.field = TEXT_FIELDS.index(field)
+
+    def __len__(self) -> int:
+        return len(self.bundle)
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.bundle._raw(self.row(i), self.field)
+
+    def row(self, i: int) -> int:
+        """Return the row of the `i`-th entry in the order of the index."""
+        return ROW.unpack_from(self.bundle.map, self.offset + ROW.size * i)[0]
+
+class LexiconBundle:
+    """Read-only access to a bundle through a memory map.
+
+    Rows are the positions of the entries in the lexicon the bundle was compiled from.
+    """
+
+    path: str
+    map: mmap.mmap
+    count: int
+    records_offset: int
+    pool_offset: int
+    index_offsets: t.Dict[str, int]
+
+    def __init__(self, path: str = BUNDLE_PATH):
+        """Open a bundle.
+
+        Parameters:
+            path: The path of the bundle, looked up in the archive of a PyInstaller build if it is not found locally.
+
+        Raises:
+            OSError: The bundle cannot be read.
+            ValueError: The file is not a bundle, or was compiled by another version.
+        """
+        self.path = path = packaged_path(path)
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.map) < HEADER.size:
+                raise ValueError(f"'{path}' is not a lexicon bundle.")
+            magic, version, self.count, self.records_offset, self.pool_offset, *index_offsets = \
+                HEADER.unpack_from(self.map)
+            if magic != BUNDLE_MAGIC:
+                raise ValueError(f"'{path}' is not a lexicon bundle.")
+            if version != BUNDLE_VERSION:
+                raise ValueError(f"Bundle version {version} is not {BUNDLE_VERSION}.")
+        except ValueError:
+            self.map.close()
+            raise
+        self.index_offsets = dict(zip(INDEXED_FIELDS, index_offsets))
+        self._keys = {field: _Keys(self, field) for field in INDEXED_FIELDS}
+
+    def __enter__(self) -> "LexiconBundle":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the memory map; the entries already read stay valid."""
+        self.map.close()
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return self.count
+
+    def __iter__(self) -> t.Iterator[Verb]:
+        """Iterate over the entries, in the order of the lexicon."""
+        return (self[row] for row in range(self.count))
+
+    def __getitem__(self, row: int) -> Verb:
+        """Read an entry.
+
+        Raises:
+            IndexError: No entry has this row.
+        """
+        if not 0 <= row < self.count:
+            raise IndexError(f"Row {row} out of the {self.count} entries of the bundle.")
+        values = RECORD.unpack_from(self.map, self.records_offset + RECORD.size * row)
+        fields = {field: self._string(values[2 * i], values[2 * i + 1]) for i, field in enumerate(TEXT_FIELDS)}
+        fields["nvn_syllables"] = fields["nvn_syllables"].split(SYLLABLE_SEPARATOR)
+        fields.update((field, bool(values[-1] >> bit & 1)) for bit, field in enumerate(FLAG_FIELDS))
+        # the entries were validated when the bundle was compiled
+        verb = Verb.__new__(Verb)
+        vars(verb).update(fields)
+        return verb
+
+    def get(self, row: int, field: str) -> str:
+        """Read a text field of an entry, without reading the other fields.
+
+        Parameters:
+            row: The row of the entry.
+            field: The field, in `TEXT_FIELDS`.
+        """
+        return self._raw(row, TEXT_FIELDS.index(field)).decode()
+
+    def find(self, field: str, value: str) -> t.List[int]:
+        """Find the entries whose field has a value.
+
+        Parameters:
+            field: The field, in `INDEXED_FIELDS`.
+            value: The value.
+
+        Returns:
+            The rows of the entries, in the order of the lexicon.
+        """
+        keys = self._keys[field]
+        data = value.encode()
+        start = bisect_left(keys, data)
+        end = bisect_right(keys, data, start)
+        return [keys.row(i) for i in range(start, end)]
+
+    def find_prefix(self, field: str, prefix: str, limit: t.Optional[int] = None) -> t.List[int]:
+        """Find the entries whose field starts with a prefix.
+
+        Parameters:
+            field: The field, in `INDEXED_FIELDS`.
+            prefix: The prefix.
+            limit: The maximum number of entries, all if not provided.
+
+        Returns:
+            The rows of the entries, in the order of their field.
+        """
+        keys = self._keys[field]
+        data = prefix.encode()
+        start = bisect_left(keys, data)
+        # no UTF-8 string contains the byte 0xff, so it follows all the strings starting with the prefix
+        end = bisect_left(keys, data + b"\xff", start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [keys.row(i) for i in range(start, end)]
+
+    def lookup(self, field: str, value: str) -> t.List[Verb]:
+        """Read the entries whose field has a value, see `find`."""
+        return [self[row] for row in self.find(field, value)]
+
+    def _raw(self, row: int, field: int) -> bytes:
+        """Read the UTF-8 value of the `field`-th text field of an entry."""
+        offset, length = TEXT.unpack_from(self.map, self.records_offset + RECORD.size * row + TEXT.size * field)
+        return self.map[self.pool_offset + offset:self.pool_offset + offset + length]
+
+    def _string(self, offset: int, length: int) -> str:
+        """Read a string of the pool."""
+        return self.map[self.pool_offset + offset:self.pool_offset + offset + length].decode()
+
+def read_bundle(path: str = BUNDLE_PATH) -> t.List[Verb]:
+    """Read all the verbs of a bundle.
+
+    Raises:
+        OSError: The bundle cannot be read.
+        ValueError: The file is not a bundle, or was compiled by another version.
+    """
+    with LexiconBundle(path) as bundle:
+        return list(bundle)
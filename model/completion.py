@@ -0,0 +1,163 @@
+"""Package to complete Novan wordforms while they are typed.
+
+The wordforms of the lexicon are stored in a trie, each node caching the first `TOP_K` wordforms of its subtree, the
+shortest first.
+The caches are built on the first query of a node and cleared along the path of a wordform when it is added or
+removed, so that an update only costs the length of the wordform and a query the length of the prefix.
+"""
+import typing as t
+from .nvn import next_chars
+
+TOP_K = 10
+
+class _Node:
+    """Node of the trie, holding the items of the wordform ending at the node."""
+
+    __slots__ = ("children", "items", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.items = []
+        self.top = None # (length, wordform, node) of the first wordforms of the subtree, `None` when outdated
+
+class Suggestions(t.NamedTuple):
+    """Suggestions for a prefix of a wordform.
+
+    Attributes:
+        completions: `(wordform, items)` pairs of the lexicon wordforms starting with the prefix, the shortest first.
+        next_chars: The characters that may follow the prefix in a valid wordform.
+        lexicon_chars: The characters following the prefix in a wordform of the lexicon.
+    """
+
+    completions: t.List[t.Tuple[str, t.List[t.Any]]]
+    next_chars: str
+    lexicon_chars: str
+
+class CompletionIndex:
+    """Trie over Novan wordforms, to complete a prefix.
+
+    Each wordform is associated with one or more items (typically lexical entries).
+    """
+
+    root: _Node
+
+    def __init__(self, items: t.Iterable[t.Tuple[str, t.Any]] = ()):
+        """Create a completion index of Novan wordforms.
+
+        Parameters:
+            items: Pairs of wordforms and associated items to add to the index.
+        """
+        self.root = _Node()
+        for form, item in items:
+            self.add(form, item)
+
+    def __contains__(self, form: str) -> bool:
+        """Check if a wordform is associated with at least one item."""
+        node = self._find(form)
+        return node is not None and bool(node.items)
+
+    def add(self, form: str, item: t.Any):
+        """Associate an item with a wordform.
+
+        Empty wordforms are ignored.
+
+        Parameters:
+            form: The wordform.
+            item: The item to associate with the wordform.
+        """
+        if not form:
+            return
+        node = self.root
+        node.top = None
+        for char in form:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            node.top = None
+        node.items.append(item)
+
+    def remove(self, form: str, item: t.Any):
+        """Dissociate an item from a wordform, pruning the branches left without wordform.
+
+        Parameters:
+            form: The wordform.
+            item: The item to dissociate from the wordform.
+        """
+        path = [self.root]
+        for char in form:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].items = [other for other in path[-1].items if other is not item]
+
+        for node in path:
+            node.top = None
+        for depth in range(len(form), 0, -1):
+            node = path[depth]
+            if node.items or node.children:
+                break
+            del path[depth - 1].children[form[depth - 1]]
+
+    def complete(self, prefix: str, k: int = TOP_K) -> t.List[t.Tuple[str, t.List[t.Any]]]:
+        """Find the wordforms starting with a prefix.
+
+        Parameters:
+            prefix: The prefix, which is a completion of itself if it is a wordform of the index.
+            k: The maximum number of wordforms to return.
+
+        Returns:
+            A list of `(wordform, items)` pairs, the shortest wordforms first.
+        """
+        node = self._find(prefix)
+        if node is None or k <= 0:
+            return []
+        top = self._top(node, prefix) if k <= TOP_K else sorted(self._forms(node, prefix))
+        return [(form, list(other.items)) for _, form, other in top[:k]]
+
+    def suggest(self, prefix: str, k: int = TOP_K) -> Suggestions:
+        """Suggest completions and next characters for a prefix.
+
+        Parameters:
+            prefix: The prefix.
+            k: The maximum number of completions.
+
+        Returns:
+            The suggestions.
+        """
+        node = self._find(prefix)
+        legal = next_chars(prefix)
+        lexicon_chars = "" if node is None else "".join(char for char in legal if char in node.children)
+        return Suggestions(self.complete(prefix, k), legal, lexicon_chars)
+
+    def _find(self, prefix: str) -> t.Optional[_Node]:
+        """Return the node of a prefix, `None` if no wordform starts with it."""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _top(self, node: _Node, prefix: str) -> t.List[t.Tuple[int, str, _Node]]:
+        """Return the first `TOP_K` wordforms of a subtree, building the outdated caches.
+
+        The wordforms are ranked the shortest first, then in alphabetical order.
+        """
+        if node.top is None:
+            forms = [(len(prefix), prefix, node)] if node.items else []
+            for char, child in node.children.items():
+                forms.extend(self._top(child, prefix + char))
+            forms.sort()
+            node.top = forms[:TOP_K]
+        return node.top
+
+    def _forms(self, node: _Node, prefix: str) -> t.Iterator[t.Tuple[int, str, _Node]]:
+        """Iterate over all the wordforms of a subtree, with their length and node."""
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            if node.items:
+                yield len(prefix), prefix, node
+            stack.extend((child, prefix + char) for char, child in node.children.items())
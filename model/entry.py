@@ -5,6 +5,7 @@ Handles calls to `nvn.syllabify` and `nvn.is_valid` when setting the Novan wordf
 """
 import typing as t
 from .nvn import syllabify, is_valid
+from .text import check_text
 from abc import ABC
 
 class AbstractEntry(ABC):
@@ -77,10 +78,10 @@ class AbstractEntry(ABC):
         Raises:
             ValueError: The provided `nvn` is not a valid text in Novan.
         """
-        if True:
-            raise NotImplementedError
-        else:
-            raise ValueError(f"Form '{nvn}' is invalid in Novan.")
+        errors = check_text(nvn)
+        if errors:
+            raise ValueError(f"Text '{nvn}' is invalid in Novan: {errors[0].message}")
+        self.nvn_desc = nvn
 
     def __hash__(self):
         """Generate a hash for the entry."""
@@ -0,0 +1,144 @@
+"""Fitting of the weight maps of the wordform generators to observed wordforms.
+
+`Generator` draws a syllable with a weight equal to the product of the weights of its characters, which is a
+log-linear model of the syllables: `log P(syl) = sum(count(char, syl) * log(weight[char])) - log(Z)`.
+The weights are fitted by maximum likelihood on syllable counts, with Newton's method; the likelihood is concave, and
+the 17 parameters make each step a tiny linear system.
+Words are counted first, so that each distinct word is validated and syllabified once.
+"""
+import typing as t
+import re
+from collections import Counter
+import numpy as np
+from .nvn import ALPHABET, VOWELS, is_valid, syllabify
+from .syllables import SYLLABLE_TABLE
+from .entry import AbstractEntry
+
+SMOOTHING = .5 # pseudo-count of each syllable, keeps the weights of unseen characters above zero
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-10
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+NOVAN_WORD_PATTERN = re.compile(f"[{ALPHABET}]+")
+
+# (syllable, character) -> number of occurrences of the character in the syllable
+FEATURES = np.array([[syl.count(char) for char in ALPHABET] for syl in SYLLABLE_TABLE.syllables], dtype=float)
+VOWEL_MASK = np.array([char in VOWELS for char in ALPHABET])
+
+def count_words(words: t.Iterable[str], counts: t.Optional[Counter] = None) -> np.ndarray:
+    """Count the syllables of words.
+
+    Parameters:
+        words: The words, invalid words are ignored.
+        counts: If provided, the counts of the distinct words instead of `words` occurrences.
+
+    Returns:
+        The number of occurrences of each syllable, indexed by syllable ID.
+    """
+    counts = Counter(words) if counts is None else counts
+    syllable_counts = Counter()
+    ids = SYLLABLE_TABLE.ids
+    for word, count in counts.items():
+        word = word.lower()
+        if NOVAN_WORD_PATTERN.fullmatch(word) and is_valid(word):
+            for syl in syllabify(word):
+                syllable_counts[syl] += count
+    result = np.zeros(len(SYLLABLE_TABLE))
+    for syl, count in syllable_counts.items():
+        result[ids[syl]] += count
+    return result
+
+def count_lexicon(entries: t.Iterable[AbstractEntry]) -> np.ndarray:
+    """Count the syllables of the Novan wordforms of a lexicon.
+
+    Parameters:
+        entries: The entries.
+
+    Returns:
+        The number of occurrences of each syllable, indexed by syllable ID.
+    """
+    return count_words(entry.nvn for entry in entries if entry.nvn)
+
+def count_corpus(texts: t.Iterable[str]) -> np.ndarray:
+    """Count the syllables of the words of Novan texts.
+
+    Parameters:
+        texts: The texts, such as lines or descriptions.
+
+    Returns:
+        The number of occurrences of each syllable, indexed by syllable ID.
+    """
+    counts = Counter()
+    for text in texts:
+        counts.update(WORD_PATTERN.findall(text.lower()))
+    return count_words((), counts)
+
+def fit_weights(syllable_counts: np.ndarray, smoothing: float = SMOOTHING, max_iterations: int = MAX_ITERATIONS,
+        tolerance: float = TOLERANCE) -> t.Dict[str, float]:
+    """Fit the character weights whose syllable distribution best matches syllable counts.
+
+    Scaling all the vowels by the same factor leaves the distribution unchanged (each syllable holds one vowel), so
+    the weights are scaled to make the heaviest vowel weigh 1; consonants may weigh more than 1.
+
+    Parameters:
+        syllable_counts: The number of occurrences of each syllable, indexed by syllable ID.
+        smoothing: The pseudo-count added to each syllable.
+        max_iterations: The maximum number of Newton steps.
+        tolerance: The log-likelihood improvement per observation under which the fit stops.
+
+    Returns:
+        The weight map, character -> weight.
+
+    Raises:
+        ValueError: There are no syllables to fit.
+    """
+    syllable_counts = np.asarray(syllable_counts, dtype=float)
+    if syllable_counts.sum() <= 0:
+        raise ValueError("No Novan syllables to fit the weights to.")
+    counts = syllable_counts + smoothing
+    total = counts.sum()
+    observed = FEATURES.T @ counts
+
+    def log_likelihood(theta):
+        scores = FEATURES @ theta
+        top = scores.max()
+        return observed @ theta - total * (top + np.log(np.exp(scores - top).sum()))
+
+    theta = np.zeros(len(ALPHABET))
+    current = log_likelihood(theta)
+    for _ in range(max_iterations):
+        scores = FEATURES @ theta
+        p = np.exp(scores - scores.max())
+        p /= p.sum()
+        expected = FEATURES.T @ p
+        gradient = observed - total * expected
+        hessian = total * (FEATURES.T @ (FEATURES * p[:, None]) - np.outer(expected, expected))
+        # the hessian is singular along the vowel scale, the least-squares solution ignores that direction
+        step = np.linalg.lstsq(hessian, gradient, rcond=None)[0]
+
+        # backtracking line search
+        scale = 1.
+        while scale > 1e-6:
+            candidate = log_likelihood(theta + scale * step)
+            if candidate >= current:
+                break
+            scale /= 2
+        theta += scale * step
+        improvement = candidate - current
+        current = candidate
+        if improvement < tolerance * total:
+            break
+
+    theta[VOWEL_MASK] -= theta[VOWEL_MASK].max()
+    return {char: float(weight) for char, weight in zip(ALPHABET, np.exp(theta))}
+
+def syllable_distribution(weight_map: t.Dict[str, float]) -> np.ndarray:
+    """Compute the syllable distribution of a weight map, as drawn by `Generator`.
+
+    Parameters:
+        weight_map: The weight map, character -> weight.
+
+    Returns:
+        The probability of each syllable, indexed by syllable ID.
+    """
+    weights = np.prod(np.array([weight_map[char] for char in ALPHABET]) ** FEATURES, axis=1)
+    return weights / weights.sum()
@@ -1,19 +1,23 @@
 """Package to generate Novan wordforms."""
 from .nvn import CONSONANTS, VOWELS, ALPHABET, is_valid
+from .neighbours import NeighbourIndex
+from .syllables import SYLLABLE_TABLE
 import typing as t
 import random
 # import scipy.special.softmax as softmax
 
+MAX_ATTEMPTS = 100000
+
 SYL = ['V', 'CV', 'VC', 'CVC']
-SYLS = list(VOWELS)
-SYLS += [c + v for c in CONSONANTS for v in VOWELS]
-SYLS += [v + c for c in CONSONANTS for v in VOWELS]
-SYLS += [c + v + cc for c in CONSONANTS for cc in CONSONANTS for v in VOWELS]
+SYLS = SYLLABLE_TABLE.syllables
+CHAR_SYLLABLES = {char: SYLLABLE_TABLE.with_char(char) for char in ALPHABET}
+
 class Generator:
     """Generator class with a specific distribution of syllables."""
 
     weights: t.List[float]
     weight_map: t.Dict[str, float]
+    dirty_chars: t.Set[str]
 
     def __init__(self, weight_map: t.Optional[t.Dict[str, float]] = None):
         """Create a generator with a specific distribution of syllables.
@@ -26,30 +30,73 @@ class Generator:
             self.weight_map = {char: 1 for char in ALPHABET}
         else:
             self.weight_map = weight_map
+        self.dirty_chars = set()
         self.update_weights()
 
-    def generate(self, n: int = 1, forbidden: t.Iterable[str] = []) -> str:
+    def generate(self, n: int = 1, forbidden: t.Container[str] = [],
+            neighbours: t.Optional[NeighbourIndex] = None, min_distance: float = 0) -> str:
         """Generate a Novan wordform.
         
         Parameters:
             n: The number of syllables.
-            forbidden: An iterable of wordform to avoid.
+            forbidden: A container of wordforms to avoid.
+                Prefer a set or a `NeighbourIndex` for fast membership tests.
+            neighbours: If provided with a positive `min_distance`, wordforms within `min_distance` of a wordform of
+                the index are avoided.
+            min_distance: The phonological distance under which a wordform of `neighbours` is too close.
 
         Returns:
             A randomely generated wordform.
+
+        Raises:
+            RuntimeError: No acceptable wordform was found after `MAX_ATTEMPTS` attempts.
+        """
+        self.update_dirty_weights()
+        for _ in range(MAX_ATTEMPTS):
+            wordform = self.draw(n)
+            if (wordform != "" and is_valid(wordform) and wordform not in forbidden and
+                    not (neighbours is not None and min_distance > 0 and
+                        neighbours.any_within(wordform, min_distance))):
+                return wordform
+        raise RuntimeError(f"Unable to generate a new wordform of {n} syllables after {MAX_ATTEMPTS} attempts.")
+
+    def draw(self, n: int) -> str:
+        """Draw a candidate wordform, which `generate` may reject.
+
+        Parameters:
+            n: The number of syllables.
+
+        Returns:
+            The concatenated syllables.
+        """
+        return "".join(random.choices(SYLS, self.weights, k=n))
+
+    def set_weight(self, char: str, weight: float):
+        """Set the weight of a character.
+
+        The weights of the syllables containing the character are updated lazily, on the next generation.
+
+        Parameters:
+            char: The character.
+            weight: The new weight of the character.
         """
-        wordform = ""
-        while not is_valid(wordform) or wordform == "" or wordform in forbidden:
-            wordform = "".join(random.choices(
-                SYLS,
-                self.weights, k=n))
-        return wordform
+        if self.weight_map.get(char) != weight:
+            self.weight_map[char] = weight
+            self.dirty_chars.add(char)
 
     def update_weights(self):
         """Compute the weights of the syllables from the individual weights of the characters."""
         self.weights = []
         for syl in SYLS:
             self.weights.append(self.p(syl))
+        self.dirty_chars.clear()
+
+    def update_dirty_weights(self):
+        """Recompute the weights of the syllables containing a character whose weight changed."""
+        for char in self.dirty_chars:
+            for i in CHAR_SYLLABLES[char]:
+                self.weights[i] = self.p(SYLS[i])
+        self.dirty_chars.clear()
 
     def p(self, syl: str) -> float:
         """Compute the probability of a syllable to appear given the generator settings.
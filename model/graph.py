@@ -0,0 +1,301 @@
+"""Graph of the Novan lexical network.
+
+Nodes are the entries of the lexicon, identified by their position in the entry list.
+Edges link entries sharing a syllable, a semantic prime category or a verb type, and entries whose description
+mentions another entry.
+Large groups of entries sharing a property are not fully linked, their entries being linked to a few representatives of
+the group instead, so that the number of edges stays linear in the size of the group.
+Entries whose Novan wordforms sound alike are linked by the edges of `model.similarity.similarity_edges`.
+The adjacency is stored in CSR (compressed sparse row) arrays: the neighbours of node `i` are
+`indices[indptr[i]:indptr[i + 1]]`, sorted, and `kinds` holds the kinds of each edge as a bitmask.
+"""
+from array import array
+import re
+import typing as t
+from .entry import AbstractEntry
+
+SYLLABLE = 1
+PRIME = 2
+VERB_TYPE = 4
+REFERENCE = 8
+SOUND = 16
+ALL_KINDS = SYLLABLE | PRIME | VERB_TYPE | REFERENCE | SOUND
+
+VERB_TYPES = ["is_generic", "is_state", "is_process", "is_cognition", "is_transfer"]
+IGNORED_PRIMES = {"", "Not a prime"}
+MAX_GROUP_SIZE = 100
+GROUP_REPRESENTATIVES = 8
+WORD_PATTERN = re.compile(r"\w+")
+
+Edge = t.Tuple[int, int, int]
+
+def group_edges(groups: t.Iterable[t.List[int]], kind: int, max_group_size: int = MAX_GROUP_SIZE,
+        representatives: int = GROUP_REPRESENTATIVES) -> t.Iterator[Edge]:
+    """Link the nodes of each group.
+
+    Parameters:
+        groups: Lists of nodes sharing a property.
+        kind: The kind of the edges.
+        max_group_size: Groups up to this size are fully linked. In larger groups, as the number of edges would grow
+            with the square of the group size, the smallest `representatives` nodes are linked together and every
+            other node is linked to each of them: all the nodes of a group stay within two edges of each other.
+        representatives: The number of representatives of a large group.
+
+    Yields:
+        `(source, target, kind)` edges, with `source < target`.
+    """
+    for nodes in groups:
+        nodes = sorted(set(nodes))
+        linked = len(nodes) if len(nodes) <= max_group_size else representatives
+        for i, source in enumerate(nodes[:linked]):
+            for target in nodes[i + 1:]:
+                yield source, target, kind
+
+def reference_edges(entries: t.Sequence[AbstractEntry]) -> t.Iterator[Edge]:
+    """Link the entries whose descriptions mention the wordform of another entry.
+
+    Novan descriptions are matched against Novan wordforms, English descriptions against the English wordforms
+    (each `;`-separated alternative of a one-word English wordform).
+
+    Parameters:
+        entries: The entries of the lexicon.
+
+    Yields:
+        `(source, target, REFERENCE)` edges.
+    """
+    nvn_nodes = {}
+    en_nodes = {}
+    for node, entry in enumerate(entries):
+        if entry.nvn:
+            nvn_nodes.setdefault(entry.nvn, []).append(node)
+        for en in entry.en.split(";"):
+            if (en := en.strip().lower()):
+                en_nodes.setdefault(en, []).append(node)
+
+    for node, entry in enumerate(entries):
+        referenced = set()
+        for word in WORD_PATTERN.findall(entry.nvn_desc.lower()):
+            referenced.update(nvn_nodes.get(word, ()))
+        for word in WORD_PATTERN.findall(entry.en_desc.lower()):
+            referenced.update(en_nodes.get(word, ()))
+        referenced.discard(node)
+        for target in referenced:
+            yield node, target, REFERENCE
+
+class LexiconGraph:
+    """Graph of the Novan lexical network, stored as CSR arrays."""
+
+    entries: t.List[AbstractEntry]
+    indptr: array
+    indices: array
+    kinds: array
+
+    def __init__(self, entries: t.Sequence[AbstractEntry], indptr: array, indices: array, kinds: array):
+        """Create a graph from CSR arrays.
+
+        Parameters:
+            entries: The entries of the lexicon, in the order of the node IDs.
+            indptr: Start of the neighbours of each node in `indices`, followed by the number of stored edges.
+            indices: Neighbours of the nodes.
+            kinds: Bitmask of the kinds of each stored edge.
+        """
+        self.entries = list(entries)
+        self.indptr = indptr
+        self.indices = indices
+        self.kinds = kinds
+        self._components = None
+
+    @classmethod
+    def from_edges(cls, entries: t.Sequence[AbstractEntry], edges: t.Iterable[Edge]) -> "LexiconGraph":
+        """Build an undirected graph from a list of edges.
+
+        Parameters:
+            entries: The entries of the lexicon, in the order of the node IDs.
+            edges: `(source, target, kind)` edges, duplicated edges have their kinds merged.
+
+        Returns:
+            The graph.
+        """
+        n = len(entries)
+        # (min node * n + max node) -> kinds
+        merged = {}
+        for source, target, kind in edges:
+            if source == target:
+                continue
+            key = source * n + target if source < target else target * n + source
+            merged[key] = merged.get(key, 0) | kind
+
+        degrees = array("q", [0]) * (n + 1)
+        for key in merged:
+            degrees[key // n + 1] += 1
+            degrees[key % n + 1] += 1
+        indptr = degrees
+        for i in range(n):
+            indptr[i + 1] += indptr[i]
+
+        # filling in key order keeps each row sorted
+        indices = array("l", [0]) * indptr[n]
+        kinds = array("B", [0]) * indptr[n]
+        cursor = array("q", indptr[:n])
+        for key in sorted(merged):
+            source, target = divmod(key, n)
+            kind = merged[key]
+            indices[cursor[source]] = target
+            kinds[cursor[source]] = kind
+            cursor[source] += 1
+            indices[cursor[target]] = source
+            kinds[cursor[target]] = kind
+            cursor[target] += 1
+
+        return cls(entries, indptr, indices, kinds)
+
+    @classmethod
+    def from_entries(cls, entries: t.Sequence[AbstractEntry], kinds: int = ALL_KINDS,
+            max_group_size: int = MAX_GROUP_SIZE, extra_edges: t.Iterable[Edge] = ()) -> "LexiconGraph":
+        """Build the graph of a lexicon.
+
+        Parameters:
+            entries: The entries of the lexicon.
+            kinds: Bitmask of the kinds of edges to build, `SOUND` edges are only added through `extra_edges`.
+            max_group_size: Shared syllables, primes and verb types with more entries than this link the entries to a
+                few representatives instead of linking all of them, see `group_edges`.
+            extra_edges: Other `(source, target, kind)` edges to add to the graph.
+
+        Returns:
+            The graph.
+        """
+        edges = []
+        if kinds & SYLLABLE:
+            groups = {}
+            for node, entry in enumerate(entries):
+                for syl in entry.nvn_syllables:
+                    if syl:
+                        groups.setdefault(syl, []).append(node)
+            edges.append(group_edges(groups.values(), SYLLABLE, max_group_size))
+        if kinds & PRIME:
+            groups = {}
+            for node, entry in enumerate(entries):
+                if entry.prime not in IGNORED_PRIMES:
+                    groups.setdefault(entry.prime, []).append(node)
+            edges.append(group_edges(groups.values(), PRIME, max_group_size))
+        if kinds & VERB_TYPE:
+            groups = [
+                [node for node, entry in enumerate(entries) if getattr(entry, verb_type, False)]
+                for verb_type in VERB_TYPES]
+            edges.append(group_edges(groups, VERB_TYPE, max_group_size))
+        if kinds & REFERENCE:
+            edges.append(reference_edges(entries))
+        edges.append(extra_edges)
+
+        return cls.from_edges(entries, (edge for kind_edges in edges for edge in kind_edges))
+
+    @property
+    def node_count(self) -> int:
+        """Number of nodes."""
+        return len(self.indptr) - 1
+
+    @property
+    def edge_count(self) -> int:
+        """Number of undirected edges."""
+        return len(self.indices) // 2
+
+    def degree(self, node: int) -> int:
+        """Return the number of neighbours of a node.
+
+        Parameters:
+            node: The ID of the node.
+        """
+        return self.indptr[node + 1] - self.indptr[node]
+
+    def neighbours(self, node: int, kinds: int = ALL_KINDS) -> t.List[int]:
+        """List the neighbours of a node.
+
+        Parameters:
+            node: The ID of the node.
+            kinds: Bitmask of the kinds of edges to follow.
+
+        Returns:
+            The sorted IDs of the neighbours.
+        """
+        start, end = self.indptr[node], self.indptr[node + 1]
+        if kinds == ALL_KINDS:
+            return self.indices[start:end].tolist()
+        return [self.indices[i] for i in range(start, end) if self.kinds[i] & kinds]
+
+    def edges(self, node: int) -> t.List[Edge]:
+        """List the edges of a node.
+
+        Parameters:
+            node: The ID of the node.
+
+        Returns:
+            The `(node, neighbour, kinds)` edges.
+        """
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return [(node, self.indices[i], self.kinds[i]) for i in range(start, end)]
+
+    def neighbourhood(self, nodes: t.Iterable[int], hops: int = 1, kinds: int = ALL_KINDS) -> t.Set[int]:
+        """Find the nodes within a number of hops of some nodes.
+
+        Parameters:
+            nodes: The IDs of the starting nodes.
+            hops: The maximum number of edges to follow.
+            kinds: Bitmask of the kinds of edges to follow.
+
+        Returns:
+            The IDs of the reached nodes, including the starting nodes.
+        """
+        reached = set(nodes)
+        frontier = list(reached)
+        for _ in range(hops):
+            next_frontier = []
+            for node in frontier:
+                for neighbour in self.neighbours(node, kinds):
+                    if neighbour not in reached:
+                        reached.add(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return reached
+
+    def components(self) -> array:
+        """Label the connected components of the graph.
+
+        Returns:
+            The component of each node, components being numbered from 0 in order of their smallest node.
+        """
+        if self._components is None:
+            n = self.node_count
+            labels = array("l", [-1]) * n
+            indptr, indices = self.indptr, self.indices
+            label = 0
+            for root in range(n):
+                if labels[root] != -1:
+                    continue
+                labels[root] = label
+                stack = [root]
+                while stack:
+                    node = stack.pop()
+                    for neighbour in indices[indptr[node]:indptr[node + 1]]:
+                        if labels[neighbour] == -1:
+                            labels[neighbour] = label
+                            stack.append(neighbour)
+                label += 1
+            self._components = labels
+        return self._components
+
+    def component_count(self) -> int:
+        """Return the number of connected components."""
+        return max(self.components(), default=-1) + 1
+
+    def component(self, node: int) -> t.List[int]:
+        """List the nodes of the connected component of a node.
+
+        Parameters:
+            node: The ID of the node.
+
+        Returns:
+            The sorted IDs of the nodes of the component.
+        """
+        labels = self.components()
+        label = labels[node]
+        return [other for other in range(len(labels)) if labels[other] == label]
@@ -0,0 +1,149 @@
+"""Undo and redo of the modifications of a lexicon.
+
+Each list of changes dispatched by the lexicon (a single modification, or a whole `Lexicon.batch`) is a step of the
+history. The changes hold the previous values of the fields and the positions of the entries, so a step is undone by
+applying its inverse operations, and the changes this produces are the step that redoes it.
+A step only references the changed entries and values, so the memory grows with the size of the edits, not with the
+size of the lexicon, and undoing or redoing a step costs the size of the step.
+"""
+import typing as t
+import time
+from collections import deque
+from .lexicon import Lexicon, Change, ADD, REMOVE, UPDATE, RESET
+
+HISTORY_LIMIT = 1000 # steps
+COALESCE_DELAY = 1. # s
+
+class _Step(t.NamedTuple):
+    """Step of the history: the changes, and the time of the last one."""
+
+    changes: t.List[Change]
+    time: float
+
+class History:
+    """Undo and redo history of a lexicon."""
+
+    lexicon: Lexicon
+    undo_steps: t.Deque[_Step]
+    redo_steps: t.List[_Step]
+    coalesce_delay: float
+    clock: t.Callable[[], float]
+
+    def __init__(self, lexicon: Lexicon, limit: int = HISTORY_LIMIT, coalesce_delay: float = COALESCE_DELAY,
+            clock: t.Callable[[], float] = time.monotonic):
+        """Record the modifications of a lexicon.
+
+        Parameters:
+            lexicon: The lexicon.
+            limit: The maximum number of steps that can be undone.
+            coalesce_delay: Consecutive updates of a single entry are grouped into one step when they are made less
+                than this many seconds apart, so that typing a word is undone at once; 0 to never group them.
+            clock: The function giving the current time in seconds.
+        """
+        self.lexicon = lexicon
+        self.undo_steps = deque(maxlen=limit)
+        self.redo_steps = []
+        self.coalesce_delay = coalesce_delay
+        self.clock = clock
+        self._replayed = None # changes made while undoing or redoing a step
+        lexicon.subscribe(self.on_changes)
+
+    def can_undo(self) -> bool:
+        """Check if there is a step to undo."""
+        return bool(self.undo_steps)
+
+    def can_redo(self) -> bool:
+        """Check if there is a step to redo."""
+        return bool(self.redo_steps)
+
+    def clear(self):
+        """Forget all the steps."""
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+
+    def on_changes(self, changes: t.List[Change]):
+        """Record the changes of the lexicon as a new step.
+
+        Parameters:
+            changes: The changes of the lexicon.
+        """
+        if any(change.kind == RESET for change in changes):
+            self.clear()
+            return
+        if self._replayed is not None:
+            self._replayed.extend(changes)
+            return
+
+        now = self.clock()
+        self.redo_steps.clear()
+        if self.undo_steps and now - self.undo_steps[-1].time < self.coalesce_delay:
+            merged = _coalesce(self.undo_steps[-1].changes, changes)
+            if merged is not None:
+                self.undo_steps.pop()
+                if merged:
+                    self.undo_steps.append(_Step(merged, now))
+                return
+        self.undo_steps.append(_Step(list(changes), now))
+
+    def undo(self) -> t.List[Change]:
+        """Undo the last step.
+
+        Returns:
+            The changes made to undo the step, empty if there was nothing to undo.
+        """
+        if not self.undo_steps:
+            return []
+        changes = self._revert(self.undo_steps.pop().changes)
+        if changes:
+            self.redo_steps.append(_Step(changes, self.clock()))
+        return changes
+
+    def redo(self) -> t.List[Change]:
+        """Redo the last undone step.
+
+        Returns:
+            The changes made to redo the step, empty if there was nothing to redo.
+        """
+        if not self.redo_steps:
+            return []
+        changes = self._revert(self.redo_steps.pop().changes)
+        if changes:
+            # a redone step is never grouped with the next modifications
+            self.undo_steps.append(_Step(changes, -float("inf")))
+        return changes
+
+    def _revert(self, changes: t.List[Change]) -> t.List[Change]:
+        """Apply the inverse of changes, in reverse order, and return the resulting changes."""
+        self._replayed = []
+        try:
+            with self.lexicon.batch():
+                for change in reversed(changes):
+                    if change.kind == ADD:
+                        self.lexicon.remove(change.entry, change.new)
+                    elif change.kind == REMOVE:
+                        self.lexicon.insert(change.old, change.entry)
+                    elif change.kind == UPDATE:
+                        self.lexicon.update(change.entry, **{change.field: change.old})
+        finally:
+            replayed, self._replayed = self._replayed, None
+        return replayed
+
+def _coalesce(previous: t.List[Change], changes: t.List[Change]) -> t.Optional[t.List[Change]]:
+    """Group two steps updating the same single entry.
+
+    Parameters:
+        previous: The changes of the previous step.
+        changes: The new changes.
+
+    Returns:
+        The changes of the grouped step, without the fields set back to their initial value; `None` if the steps
+        cannot be grouped.
+    """
+    entry = previous[0].entry
+    if any(change.kind != UPDATE or change.entry is not entry for change in previous + changes):
+        return None
+    merged = {change.field: change for change in previous}
+    for change in changes:
+        first = merged.get(change.field, change)
+        merged[change.field] = change._replace(old=first.old)
+    return [change for change in merged.values() if change.old != change.new]
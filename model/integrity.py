@@ -0,0 +1,245 @@
+"""Integrity checks of a lexicon, run before a release.
+
+The checks of an entry only depend on its Novan wordform and syllables, so their results are cached by these fields,
+hashed by the dictionary of the cache: only the entries changed since the previous run are checked again, in several
+processes for large lexicons. The cache is stored as JSON, so that reading a cache found next to the data cannot run
+code.
+Only these per-entry checks are cached: the checks involving several entries (unique URIs and wordforms) or the file
+system (audio clips) run over the whole lexicon on every call, so a warm run still costs a few passes over the entries.
+"""
+import typing as t
+import os
+import json
+from collections import Counter, defaultdict
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor
+from .entry import AbstractEntry
+from .nvn import is_valid, syllabify
+from .syllables import SYLLABLE_TABLE, WAV_PATH
+
+INTEGRITY_VERSION = 2 # to change with the checks, invalidating the caches
+CACHE_SUFFIX = ".integrity"
+PARALLEL_THRESHOLD = 50000 # unchecked entries from which the checks are spread over processes
+CHUNK_SIZE = 10000 # entries per task of a process
+MAX_LISTED_ROWS = 10 # rows listed in the message of a duplicate
+
+INVALID_NVN = "invalid_nvn"
+SYLLABLES = "syllables"
+UNKNOWN_SYLLABLE = "unknown_syllable"
+MISSING_CLIP = "missing_clip"
+DUPLICATE_URI = "duplicate_uri"
+DUPLICATE_NVN = "duplicate_nvn"
+CHECKS = [INVALID_NVN, SYLLABLES, UNKNOWN_SYLLABLE, MISSING_CLIP, DUPLICATE_URI, DUPLICATE_NVN]
+
+Key = t.Tuple[str, ...] # wordform and syllables of an entry
+Result = t.List[t.Tuple[str, str]] # (check, message) of the failed checks of an entry
+
+class Issue(t.NamedTuple):
+    """Failed check of an entry.
+
+    Attributes:
+        row: The position of the entry in the lexicon.
+        uri: The URI of the entry.
+        nvn: The Novan wordform of the entry.
+        check: The name of the check, in `CHECKS`.
+        message: The description of the issue.
+    """
+
+    row: int
+    uri: str
+    nvn: str
+    check: str
+    message: str
+
+class Report(t.NamedTuple):
+    """Result of the integrity checks of a lexicon.
+
+    Attributes:
+        entries: The number of entries.
+        checked: The number of entries checked.
+        cached: The number of entries whose result was in the cache.
+        duplicates: The number of entries sharing the checked fields of an entry checked before them, which reuse its
+            result.
+        issues: The issues, by row.
+    """
+
+    entries: int
+    checked: int
+    cached: int
+    duplicates: int
+    issues: t.List[Issue]
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """Convert the report into JSON-serializable data."""
+        counts = {check: 0 for check in CHECKS}
+        for issue in self.issues:
+            counts[issue.check] += 1
+        return {
+            "entries": self.entries,
+            "checked": self.checked,
+            "cached": self.cached,
+            "duplicates": self.duplicates,
+            "counts": counts,
+            "issues": [issue._asdict() for issue in self.issues],
+        }
+
+def entry_key(entry: AbstractEntry) -> Key:
+    """Return the fields of an entry which its checks depend on.
+
+    The fields are used as they are rather than through a digest: a tuple of short strings is hashed several times
+    faster than a cryptographic digest is computed, and does not collide.
+    """
+    return (entry.nvn, *entry.nvn_syllables)
+
+def check_entry(nvn: str, syllables: t.Sequence[str]) -> Result:
+    """Check the Novan wordform and syllables of an entry.
+
+    Parameters:
+        nvn: The Novan wordform.
+        syllables: The stored syllables of the wordform.
+
+    Returns:
+        The failed checks and their message.
+    """
+    result = []
+    if not is_valid(nvn):
+        result.append((INVALID_NVN, f"'{nvn}' is not a valid Novan wordform"))
+    else:
+        expected = syllabify(nvn)
+        if list(syllables) != expected:
+            result.append((SYLLABLES, f"syllables {'.'.join(syllables)} instead of {'.'.join(expected)}"))
+    for syllable in syllables:
+        if syllable and syllable not in SYLLABLE_TABLE.ids:
+            result.append((UNKNOWN_SYLLABLE, f"unknown syllable '{syllable}'"))
+    return result
+
+def _check_entries(items: t.List[t.Tuple[str, t.List[str]]]) -> t.List[Result]:
+    """Check the wordforms and syllables of entries, in a worker process."""
+    return [check_entry(nvn, syllables) for nvn, syllables in items]
+
+def read_cache(path: str) -> t.Dict[Key, Result]:
+    """Read cached results, empty if the cache is missing, corrupted or outdated.
+
+    Parameters:
+        path: The path of the cache.
+
+    Returns:
+        Fields of an entry -> result of its checks, see `entry_key`.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = json.load(file)
+        if data["version"] != INTEGRITY_VERSION:
+            return {}
+        return {tuple(key): [tuple(failure) for failure in result] for key, result in data["results"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+def write_cache(path: str, cache: t.Dict[Key, Result]):
+    """Write cached results, replacing the previous cache at once.
+
+    Raises:
+        OSError: The cache cannot be written.
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump({"version": INTEGRITY_VERSION, "results": list(cache.items())}, file, ensure_ascii=False,
+            separators=(",", ":"))
+    os.replace(temporary_path, path)
+
+def available_clips(wav_path: str = WAV_PATH) -> t.Set[str]:
+    """List the syllables having an audio clip.
+
+    Parameters:
+        wav_path: The path of the clips, with `{}` standing for the syllable.
+    """
+    directory, pattern = os.path.split(wav_path)
+    prefix, _, suffix = pattern.partition("{}")
+    try:
+        names = os.listdir(directory or ".")
+    except OSError:
+        return set()
+    return {name[len(prefix):len(name) - len(suffix)] for name in names
+        if name.startswith(prefix) and name.endswith(suffix) and len(name) > len(prefix) + len(suffix)}
+
+def _duplicates(entries: t.Sequence[AbstractEntry], field: str, check: str) -> t.Iterator[Issue]:
+    """Find the entries sharing a non-empty value of a field."""
+    values = list(map(attrgetter(field), entries))
+    # counted in C, the rows are only collected for the repeated values
+    repeated = {value for value, count in Counter(values).items() if count > 1 and value}
+    rows = defaultdict(list)
+    if repeated:
+        for row, value in enumerate(values):
+            if value in repeated:
+                rows[value].append(row)
+    for value, shared in rows.items():
+        listed = ", ".join(str(row) for row in shared[:MAX_LISTED_ROWS])
+        message = f"{field} '{value}' shared by {len(shared)} entries: rows {listed}"
+        if len(shared) > MAX_LISTED_ROWS:
+            message += ", ..."
+        for row in shared:
+            yield Issue(row, entries[row].uri, entries[row].nvn, check, message)
+
+def check_lexicon(entries: t.Sequence[AbstractEntry], cache: t.Optional[t.Dict[Key, Result]] = None,
+        wav_path: str = WAV_PATH, workers: t.Optional[int] = None,
+        parallel_threshold: int = PARALLEL_THRESHOLD) -> Report:
+    """Check the integrity of a lexicon.
+
+    Checks that the Novan wordforms are valid, that the stored syllables are those of `syllabify`, that every syllable
+    is known and has an audio clip, and that the URIs and wordforms are unique.
+    Only the checks of the wordform and syllables of each entry are cached; the audio clips and the unique fields are
+    checked over the whole lexicon on every call.
+
+    Parameters:
+        entries: The entries of the lexicon.
+        cache: Fields of an entry -> result of its checks (see `entry_key`), updated in place to hold the results of
+            the current entries only; nothing is cached if not provided.
+        wav_path: The path of the audio clips, with `{}` standing for the syllable.
+        workers: The number of processes checking the entries, the number of CPUs if not provided.
+        parallel_threshold: The number of entries to check from which several processes are used.
+
+    Returns:
+        The report.
+    """
+    cache = {} if cache is None else cache
+    keys = [entry_key(entry) for entry in entries]
+
+    # entries of identical content are checked once
+    unchecked = {}
+    cached = duplicates = 0
+    for key, entry in zip(keys, entries):
+        if key in cache:
+            cached += 1
+        elif key in unchecked:
+            duplicates += 1
+        else:
+            unchecked[key] = (entry.nvn, list(entry.nvn_syllables))
+    items = list(unchecked.values())
+    if len(items) >= parallel_threshold and (workers or os.cpu_count() or 1) > 1:
+        chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+        with ProcessPoolExecutor(workers) as executor:
+            results = [result for chunk in executor.map(_check_entries, chunks) for result in chunk]
+    else:
+        results = _check_entries(items)
+    fresh = dict(zip(unchecked, results))
+
+    # only keep the results of the current entries
+    current = set(keys)
+    for key in cache.keys() - current:
+        del cache[key]
+    cache.update(fresh)
+
+    clips = available_clips(wav_path)
+    issues = []
+    for row, (key, entry) in enumerate(zip(keys, entries)):
+        for check, message in cache[key]:
+            issues.append(Issue(row, entry.uri, entry.nvn, check, message))
+        for syllable in entry.nvn_syllables:
+            if syllable and syllable not in clips:
+                issues.append(Issue(row, entry.uri, entry.nvn, MISSING_CLIP,
+                    f"no audio clip '{wav_path.format(syllable)}'"))
+    issues.extend(_duplicates(entries, "uri", DUPLICATE_URI))
+    issues.extend(_duplicates(entries, "nvn", DUPLICATE_NVN))
+    # stable: the issues of a row already follow the order of `CHECKS`
+    issues.sort(key=attrgetter("row"))
+    return Report(len(entries), len(unchecked), cached, duplicates, issues)
@@ -0,0 +1,327 @@
+"""Force-directed layout of the graph of the Novan lexical network.
+
+The layout follows Fruchterman and Reingold, vectorized with NumPy:
+- neighbours attract each other along the edges of the CSR adjacency,
+- nodes repel the nodes of the 3x3 surrounding cells of a fine grid exactly,
+- the other nodes are approximated by the centroids of the cells of a coarse grid, each centroid only standing for the
+  nodes of its cell outside the exact window.
+
+Positions are cached to disk by entry key, so that a layout is only computed once, and after entries are added or
+edited only the neighbourhood of the changed nodes is relaxed.
+"""
+import typing as t
+import zlib
+import numpy as np
+from .graph import LexiconGraph
+from .entry import AbstractEntry
+
+LAYOUT_PATH = "data/layout-cache.npz"
+ITERATIONS = 50
+RELAX_ITERATIONS = 20
+RELAX_HOPS = 1
+COARSE_CELLS = 16
+CHUNK_SIZE = 1 << 14
+EPSILON = 1e-9
+
+def entry_keys(entries: t.Sequence[AbstractEntry]) -> t.List[str]:
+    """Compute a key identifying each entry across edits of the lexicon.
+
+    The key is the URI of the entry, or its Novan or English wordform if it has no URI; repeated keys are numbered.
+
+    Parameters:
+        entries: The entries of the lexicon.
+
+    Returns:
+        The keys of the entries.
+    """
+    keys = []
+    seen = {}
+    for entry in entries:
+        key = entry.uri or (f"nvn:{entry.nvn}" if entry.nvn else f"en:{entry.en}")
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keys.append(key if count == 0 else f"{key}#{count}")
+    return keys
+
+def neighbour_signatures(graph: LexiconGraph, keys: t.Sequence[str]) -> np.ndarray:
+    """Compute a checksum of the neighbour keys of each node, to detect the nodes whose edges changed.
+
+    Parameters:
+        graph: The graph.
+        keys: The keys of the nodes.
+
+    Returns:
+        The checksum of each node.
+    """
+    return np.array([
+        zlib.crc32("\0".join(sorted(keys[neighbour] for neighbour in graph.neighbours(node))).encode())
+        for node in range(graph.node_count)], dtype=np.uint32)
+
+class GraphLayout:
+    """Force-directed layout of the graph of the Novan lexical network."""
+
+    graph: LexiconGraph
+    keys: t.List[str]
+    positions: np.ndarray
+    k: float
+    rng: np.random.Generator
+
+    def __init__(self, graph: LexiconGraph, positions: t.Optional[np.ndarray] = None, seed: t.Optional[int] = None):
+        """Create a layout of a graph.
+
+        Parameters:
+            graph: The graph to lay out.
+            positions: The initial `(node_count, 2)` positions, random in the unit square if not provided.
+            seed: The seed of the random initial positions.
+        """
+        self.graph = graph
+        self.keys = entry_keys(graph.entries)
+        n = graph.node_count
+        self.rng = np.random.default_rng(seed)
+        self.positions = self.rng.random((n, 2)) if positions is None else np.asarray(positions, dtype=float)
+        # ideal edge length for the unit square
+        self.k = 1 / np.sqrt(max(n, 1))
+
+        self._indptr = np.asarray(graph.indptr, dtype=np.int64)
+        self._edge_targets = np.asarray(graph.indices, dtype=np.int64)
+
+    def run(self, iterations: int = ITERATIONS, nodes: t.Optional[np.ndarray] = None, temperature: float = .1):
+        """Move the nodes, cooling down linearly.
+
+        Parameters:
+            iterations: The number of iterations.
+            nodes: The IDs of the nodes allowed to move, all of them if not provided.
+            temperature: The maximum displacement of a node at the first iteration.
+        """
+        nodes = np.arange(self.graph.node_count) if nodes is None else np.asarray(nodes, dtype=np.int64)
+        if len(nodes) == 0:
+            return
+        for i in range(iterations):
+            step = temperature * (1 - i / iterations)
+            forces = self.forces(nodes)
+            lengths = np.linalg.norm(forces, axis=1, keepdims=True)
+            self.positions[nodes] += forces / np.maximum(lengths, EPSILON) * np.minimum(lengths, step)
+
+    def relax(self, changed: t.Iterable[int], hops: int = RELAX_HOPS, iterations: int = RELAX_ITERATIONS):
+        """Move only the neighbourhood of changed nodes, the rest of the layout staying fixed.
+
+        Parameters:
+            changed: The IDs of the added or edited nodes.
+            hops: The size of the neighbourhood to move.
+            iterations: The number of iterations.
+        """
+        nodes = np.fromiter(self.graph.neighbourhood(changed, hops), dtype=np.int64)
+        self.run(iterations, np.sort(nodes), temperature=self.k)
+
+    def forces(self, nodes: np.ndarray) -> np.ndarray:
+        """Compute the forces applied to some nodes.
+
+        Parameters:
+            nodes: The IDs of the nodes.
+
+        Returns:
+            The `(len(nodes), 2)` forces.
+        """
+        near, rows, others = self._near_repulsion(nodes)
+        return self._attraction(nodes) + near + self._far_repulsion(nodes, rows, others)
+
+    def _attraction(self, nodes: np.ndarray) -> np.ndarray:
+        """Compute the attraction of the neighbours, `d² / k` along each edge."""
+        forces = np.zeros((len(nodes), 2))
+        counts = self._indptr[nodes + 1] - self._indptr[nodes]
+        if counts.sum() == 0:
+            return forces
+        rows = np.repeat(np.arange(len(nodes)), counts)
+        edge_ids = np.repeat(self._indptr[nodes] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        delta = self.positions[self._edge_targets[edge_ids]] - self.positions[nodes[rows]]
+        pull = delta * (np.linalg.norm(delta, axis=1, keepdims=True) / self.k)
+        forces[:, 0] = np.bincount(rows, pull[:, 0], len(nodes))
+        forces[:, 1] = np.bincount(rows, pull[:, 1], len(nodes))
+        return forces
+
+    def _near_repulsion(self, nodes: np.ndarray) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute the exact repulsion `k² / d` of the nodes of the 3x3 surrounding cells of a grid of size `2k`.
+
+        Returns:
+            The `(len(nodes), 2)` forces, and the `(row, other)` pairs of the window of each node, `row` being the
+            position of the node in `nodes`; each node is in its own window.
+        """
+        forces = np.zeros((len(nodes), 2))
+        all_rows, all_others = [], []
+        cell_size = 2 * self.k
+        origin = self.positions.min(axis=0)
+        cells = np.floor((self.positions - origin) / cell_size).astype(np.int64)
+        width = cells[:, 1].max() + 3
+        cell_ids = (cells[:, 0] + 1) * width + cells[:, 1] + 1
+
+        # nodes sorted by cell, with the range of each cell
+        order = np.argsort(cell_ids, kind="stable")
+        sorted_cells = cell_ids[order]
+        unique_cells, starts, counts = np.unique(sorted_cells, return_index=True, return_counts=True)
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                neighbour_cells = cell_ids[nodes] + dx * width + dy
+                found = np.searchsorted(unique_cells, neighbour_cells)
+                found = np.minimum(found, len(unique_cells) - 1)
+                present = unique_cells[found] == neighbour_cells
+                pair_counts = np.where(present, counts[found], 0)
+                total = pair_counts.sum()
+                if total == 0:
+                    continue
+                rows = np.repeat(np.arange(len(nodes)), pair_counts)
+                offsets = np.arange(total) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+                others = order[np.repeat(starts[found], pair_counts) + offsets]
+                all_rows.append(rows)
+                all_others.append(others)
+                delta = self.positions[nodes[rows]] - self.positions[others]
+                squared = np.maximum((delta ** 2).sum(axis=1), EPSILON)
+                push = delta * (self.k ** 2 / squared)[:, None]
+                push[others == nodes[rows]] = 0
+                forces[:, 0] += np.bincount(rows, push[:, 0], len(nodes))
+                forces[:, 1] += np.bincount(rows, push[:, 1], len(nodes))
+        return forces, np.concatenate(all_rows), np.concatenate(all_others)
+
+    def _far_repulsion(self, nodes: np.ndarray, rows: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Approximate the repulsion of the nodes outside the exact window by the centroids of a coarse grid.
+
+        The nodes of the window of a node are removed from the centroids of their cells, so that every node is counted
+        exactly once: the cells holding none of them are used as they are, the others through the centroid of their
+        remaining nodes. As the remaining nodes are outside the window, such a centroid is not taken closer than the
+        half-width `2k` of the window.
+
+        Parameters:
+            nodes: The IDs of the nodes.
+            rows: The positions in `nodes` of the nodes of the window pairs, see `_near_repulsion`.
+            others: The other nodes of the window pairs.
+        """
+        forces = np.zeros((len(nodes), 2))
+        origin = self.positions.min(axis=0)
+        size = np.maximum(self.positions.max(axis=0) - origin, EPSILON)
+        cells = np.minimum((self.positions - origin) / size * COARSE_CELLS, COARSE_CELLS - 1).astype(np.int64)
+        cell_ids = cells[:, 0] * COARSE_CELLS + cells[:, 1]
+        masses = np.bincount(cell_ids, minlength=COARSE_CELLS ** 2).astype(float)
+        occupied = np.flatnonzero(masses)
+        centroids = np.stack([
+            np.bincount(cell_ids, self.positions[:, 0], COARSE_CELLS ** 2)[occupied],
+            np.bincount(cell_ids, self.positions[:, 1], COARSE_CELLS ** 2)[occupied]], axis=1)
+        sums = centroids.copy()
+        centroids /= masses[occupied, None]
+        masses = masses[occupied]
+
+        # (row, cell) -> mass and sum of the positions of the nodes of the window in the cell
+        pair_keys = rows * len(occupied) + np.searchsorted(occupied, cell_ids[others])
+        window_keys, inverse = np.unique(pair_keys, return_inverse=True)
+        window_rows, window_cells = np.divmod(window_keys, len(occupied))
+        window_masses = np.bincount(inverse, minlength=len(window_keys))
+        window_sums = np.stack([
+            np.bincount(inverse, self.positions[others, 0], len(window_keys)),
+            np.bincount(inverse, self.positions[others, 1], len(window_keys))], axis=1)
+
+        for start in range(0, len(nodes), CHUNK_SIZE):
+            chunk = nodes[start:start + CHUNK_SIZE]
+            dx = self.positions[chunk, 0, None] - centroids[None, :, 0]
+            dy = self.positions[chunk, 1, None] - centroids[None, :, 1]
+            weights = (self.k ** 2 * masses)[None, :] / np.maximum(dx * dx + dy * dy, EPSILON)
+            # the cells holding nodes of the window are added below
+            in_chunk = (window_rows >= start) & (window_rows < start + len(chunk))
+            weights[window_rows[in_chunk] - start, window_cells[in_chunk]] = 0
+            forces[start:start + len(chunk), 0] = (dx * weights).sum(axis=1)
+            forces[start:start + len(chunk), 1] = (dy * weights).sum(axis=1)
+
+        remaining = masses[window_cells] - window_masses
+        kept = remaining > 0
+        remaining, window_rows = remaining[kept], window_rows[kept]
+        remaining_centroids = (sums[window_cells[kept]] - window_sums[kept]) / remaining[:, None]
+        delta = self.positions[nodes[window_rows]] - remaining_centroids
+        squared = np.maximum((delta ** 2).sum(axis=1), (2 * self.k) ** 2)
+        push = delta * (self.k ** 2 * remaining / squared)[:, None]
+        forces[:, 0] += np.bincount(window_rows, push[:, 0], len(nodes))
+        forces[:, 1] += np.bincount(window_rows, push[:, 1], len(nodes))
+        return forces
+
+    def save(self, path: str = LAYOUT_PATH):
+        """Save the positions of the nodes, by entry key.
+
+        Parameters:
+            path: The path of the cache file.
+        """
+        np.savez(path, keys=np.array(self.keys, dtype=str), positions=self.positions,
+            signatures=neighbour_signatures(self.graph, self.keys))
+
+    @classmethod
+    def load(cls, graph: LexiconGraph, path: str = LAYOUT_PATH, seed: t.Optional[int] = None) -> "GraphLayout":
+        """Create the layout of a graph from a cache file.
+
+        Nodes found in the cache keep their position, and only the neighbourhood of the new nodes and of the nodes
+        whose neighbours changed is relaxed.
+        The layout is computed from scratch if the cache file cannot be read.
+
+        Parameters:
+            graph: The graph to lay out.
+            path: The path of the cache file.
+            seed: The seed of the random initial positions.
+
+        Returns:
+            The layout.
+        """
+        layout = cls(graph, seed=seed)
+        try:
+            with np.load(path) as cache:
+                cached_keys = cache["keys"].tolist()
+                cached_positions = cache["positions"]
+                cached_signatures = cache["signatures"]
+        except (OSError, KeyError, ValueError):
+            layout.run()
+            return layout
+
+        layout.adopt(dict(zip(cached_keys, zip(cached_positions, cached_signatures))))
+        return layout
+
+    def adopt(self, cached: t.Dict[str, t.Tuple[np.ndarray, int]]):
+        """Reuse the positions of a previous layout and relax the changed neighbourhoods.
+
+        Parameters:
+            cached: Entry key -> (position, neighbour signature) of the previous layout.
+        """
+        signatures = neighbour_signatures(self.graph, self.keys)
+        known = np.zeros(self.graph.node_count, dtype=bool)
+        changed = []
+        for node, key in enumerate(self.keys):
+            if key in cached:
+                position, signature = cached[key]
+                self.positions[node] = position
+                known[node] = True
+                if signature != signatures[node]:
+                    changed.append(node)
+            else:
+                changed.append(node)
+
+        if not known.any():
+            self.run()
+            return
+
+        # start the new nodes next to their placed neighbours
+        for node in np.flatnonzero(~known):
+            placed = [other for other in self.graph.neighbours(node) if known[other]]
+            if placed:
+                self.positions[node] = self.positions[placed].mean(axis=0)
+            else:
+                self.positions[node] = self.positions[known].mean(axis=0)
+            self.positions[node] += self.rng.normal(scale=self.k, size=2)
+
+        self.relax(changed)
+
+    def update(self, graph: LexiconGraph) -> "GraphLayout":
+        """Lay out the graph of an edited lexicon, relaxing only the changed neighbourhoods.
+
+        Parameters:
+            graph: The new graph.
+
+        Returns:
+            The layout of the new graph.
+        """
+        layout = GraphLayout(graph)
+        layout.rng = self.rng
+        layout.adopt(dict(zip(self.keys, zip(self.positions, neighbour_signatures(self.graph, self.keys)))))
+        return layout
@@ -0,0 +1,238 @@
+"""Observable collection of lexical entries.
+
+Every modification of the lexicon goes through a `Lexicon` object, which notifies its listeners with the list of
+changes, entry by entry and field by field.
+Changes made inside `Lexicon.batch` are dispatched together when the batch ends.
+"""
+import typing as t
+from contextlib import contextmanager
+from .entry import AbstractEntry
+from .nvn import is_valid
+
+ADD = "add"
+REMOVE = "remove"
+UPDATE = "update"
+RESET = "reset"
+
+class Change(t.NamedTuple):
+    """A change of the lexicon.
+
+    Attributes:
+        kind: `ADD`, `REMOVE`, `UPDATE` or `RESET` (the whole content of the lexicon was replaced).
+        entry: The added, removed or updated entry, `None` for `RESET`.
+        field: The updated field for `UPDATE`, `None` otherwise.
+        old: The previous value of the field for `UPDATE`, the previous position of the entry for `REMOVE`.
+        new: The new value of the field for `UPDATE`, the position of the entry for `ADD`.
+    """
+
+    kind: str
+    entry: t.Optional[AbstractEntry] = None
+    field: t.Optional[str] = None
+    old: t.Any = None
+    new: t.Any = None
+
+Listener = t.Callable[[t.List[Change]], None]
+Transform = t.Union[t.Any, t.Callable[[t.Any], t.Any]] # new value of a field, or function of the current value
+
+MAX_LISTED_INVALID = 10
+
+class Lexicon:
+    """Observable collection of lexical entries."""
+
+    entries: t.List[AbstractEntry]
+    listeners: t.List[Listener]
+
+    def __init__(self, entries: t.Iterable[AbstractEntry] = ()):
+        """Create an observable collection of lexical entries.
+
+        Parameters:
+            entries: The initial entries of the lexicon.
+        """
+        self.entries = list(entries)
+        self.listeners = []
+        self._batch_depth = 0
+        self._pending = []
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.entries)
+
+    def __iter__(self) -> t.Iterator[AbstractEntry]:
+        """Iterate over the entries."""
+        return iter(self.entries)
+
+    def subscribe(self, listener: Listener):
+        """Register a function to call with the list of changes after each modification or batch of modifications.
+
+        Parameters:
+            listener: The function to call.
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener):
+        """Stop notifying a registered function.
+
+        Parameters:
+            listener: The function to stop notifying.
+        """
+        self.listeners.remove(listener)
+
+    @contextmanager
+    def batch(self):
+        """Group the modifications made in the context and dispatch them together at the end.
+
+        Batches can be nested, the changes are dispatched when the outermost batch ends.
+
+        Example:
+            with lexicon.batch():
+                lexicon.update(verb, en="to be")
+                lexicon.add(other_verb)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._dispatch()
+
+    def reset(self, entries: t.Iterable[AbstractEntry]):
+        """Replace all the entries of the lexicon.
+
+        Parameters:
+            entries: The new entries.
+        """
+        self.entries = list(entries)
+        self._emit(Change(RESET))
+
+    def add(self, entry: AbstractEntry):
+        """Add an entry at the end of the lexicon.
+
+        Parameters:
+            entry: The entry to add.
+        """
+        self.entries.append(entry)
+        self._emit(Change(ADD, entry, new=len(self.entries) - 1))
+
+    def insert(self, index: int, entry: AbstractEntry):
+        """Insert an entry at a given position of the lexicon.
+
+        Parameters:
+            index: The position of the entry.
+            entry: The entry to add.
+        """
+        self.entries.insert(index, entry)
+        self._emit(Change(ADD, entry, new=index))
+
+    def remove(self, entry: AbstractEntry, index: t.Optional[int] = None):
+        """Remove an entry from the lexicon.
+
+        Parameters:
+            entry: The entry to remove.
+            index: If provided, the expected position of the entry, which spares looking it up.
+
+        Raises:
+            ValueError: The entry is not in the lexicon.
+        """
+        if index is None or not (0 <= index < len(self.entries) and self.entries[index] is entry):
+            index = next((i for i, other in enumerate(self.entries) if other is entry), None)
+        if index is None:
+            raise ValueError("Entry is not in the lexicon.")
+        del self.entries[index]
+        self._emit(Change(REMOVE, entry, old=index))
+
+    def update(self, entry: AbstractEntry, **fields) -> t.List[Change]:
+        """Set fields of an entry, notifying only the fields whose value actually changed.
+
+        The Novan wordform `nvn` is set through `AbstractEntry.set_nvn`, and is validated before any field is set.
+
+        Parameters:
+            entry: The entry to update.
+            **fields: The new values of the fields.
+
+        Returns:
+            The list of changes.
+
+        Raises:
+            ValueError: The provided `nvn` is not a valid wordform in Novan.
+        """
+        changes = []
+        with self.batch():
+            if "nvn" in fields and fields["nvn"] != entry.nvn:
+                old_nvn, old_syllables = entry.nvn, entry.nvn_syllables
+                entry.set_nvn(fields["nvn"])
+                changes.append(Change(UPDATE, entry, "nvn", old_nvn, entry.nvn))
+                if entry.nvn_syllables != old_syllables:
+                    changes.append(Change(UPDATE, entry, "nvn_syllables", old_syllables, entry.nvn_syllables))
+
+            for field, value in fields.items():
+                if field == "nvn":
+                    continue
+                old = getattr(entry, field)
+                if old != value:
+                    setattr(entry, field, value)
+                    changes.append(Change(UPDATE, entry, field, old, value))
+
+            for change in changes:
+                self._emit(change)
+        return changes
+
+    def update_many(self, entries: t.Iterable[AbstractEntry], **transforms: Transform) -> t.List[Change]:
+        """Set fields of several entries as a single modification.
+
+        The new values are all computed and validated before any entry is modified, so that an invalid wordform
+        leaves the lexicon unchanged; the changes are then dispatched together.
+
+        Example:
+            lexicon.update_many(verbs, is_state=True, en_desc=lambda desc: desc.replace("to be ", ""))
+
+        Parameters:
+            entries: The entries to update, each once.
+            **transforms: For each field, its new value, or a function computing it from the current value.
+
+        Returns:
+            The list of changes.
+
+        Raises:
+            ValueError: Some new `nvn` are not valid wordforms in Novan.
+        """
+        updates = []
+        invalid = []
+        seen = set()
+        for entry in entries:
+            if id(entry) in seen:
+                continue
+            seen.add(id(entry))
+            fields = {field: transform(getattr(entry, field)) if callable(transform) else transform
+                for field, transform in transforms.items()}
+            if "nvn" in fields and not is_valid(fields["nvn"]):
+                invalid.append(fields["nvn"])
+            updates.append((entry, fields))
+        if invalid:
+            listed = ", ".join(f"'{nvn}'" for nvn in invalid[:MAX_LISTED_INVALID])
+            more = ", ..." if len(invalid) > MAX_LISTED_INVALID else ""
+            raise ValueError(f"{len(invalid)} form(s) invalid in Novan: {listed}{more}")
+
+        changes = []
+        with self.batch():
+            for entry, fields in updates:
+                changes.extend(self.update(entry, **fields))
+        return changes
+
+    def _emit(self, change: Change):
+        """Queue a change, and dispatch it unless a batch is in progress."""
+        self._pending.append(change)
+        if self._batch_depth == 0:
+            self._dispatch()
+
+    def _dispatch(self):
+        """Notify the listeners of the pending changes."""
+        # listeners may modify the lexicon, their changes are dispatched in a new round
+        while self._pending:
+            changes, self._pending = self._pending, []
+            self._batch_depth += 1
+            try:
+                for listener in list(self.listeners):
+                    listener(changes)
+            finally:
+                self._batch_depth -= 1
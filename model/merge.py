@@ -0,0 +1,172 @@
+"""Three-way merge of lexicons edited concurrently.
+
+Entries are matched by URI between the base version (the file as it was loaded), our version (the lexicon being edited)
+and their version (the file as another editor saved it).
+A field changed on one side only takes the changed value; a field changed on both sides to different values, or an
+entry deleted on one side and modified on the other, is a conflict to resolve.
+Our side is described by the entries changed since the base only, so that the merge itself costs the number of changed
+entries.
+"""
+import typing as t
+import uuid
+from .entry import AbstractEntry
+
+URI_PREFIX = "urn:uuid:"
+# namespace of the URIs derived from the hash of a file, arbitrary but fixed
+URI_NAMESPACE = uuid.UUID("8c1d5b0e-3f7a-4a52-9a41-6c0e2b7d9f13")
+
+Fields = t.Dict[str, t.Any]
+
+def new_uri() -> str:
+    """Create a unique URI for a new entry."""
+    return URI_PREFIX + str(uuid.uuid4())
+
+def assign_uris(entries: t.Iterable[AbstractEntry], digest: t.Optional[str] = None):
+    """Give a URI to the entries without one, or sharing one with a previous entry.
+
+    Parameters:
+        entries: The entries, in the order of their file.
+        digest: If provided, the hash of the file the entries were read from: the URIs are then derived from the hash
+            and the row of the entries, so that every editor loading the file assigns the same URIs.
+    """
+    seen = set()
+    for row, entry in enumerate(entries):
+        if not entry.uri or entry.uri in seen:
+            entry.uri = new_uri() if digest is None else URI_PREFIX + str(uuid.uuid5(URI_NAMESPACE, f"{digest}/{row}"))
+        seen.add(entry.uri)
+
+def entry_fields(entry: AbstractEntry) -> Fields:
+    """Copy the fields of an entry."""
+    return dict(vars(entry))
+
+class Conflict(t.NamedTuple):
+    """Change made on both sides of a merge.
+
+    Attributes:
+        uri: The URI of the entry.
+        field: The field changed on both sides, `None` if the entry was deleted on one side.
+        ours: Our value of the field, or our fields (`None` if we deleted the entry).
+        theirs: Their value of the field, or their fields (`None` if they deleted the entry).
+        entry: Their entry, to restore if we deleted it.
+    """
+
+    uri: str
+    field: t.Optional[str]
+    ours: t.Any
+    theirs: t.Any
+    entry: t.Optional[AbstractEntry] = None
+
+class Merge(t.NamedTuple):
+    """Changes to apply to our lexicon to merge their changes.
+
+    Attributes:
+        added: Their new entries.
+        removed: The URIs of the entries they deleted.
+        updated: URI -> the fields they changed and their new value.
+        conflicts: The changes made on both sides.
+    """
+
+    added: t.List[AbstractEntry]
+    removed: t.List[str]
+    updated: t.Dict[str, Fields]
+    conflicts: t.List[Conflict]
+
+    def __len__(self) -> int:
+        """Return the number of changes to apply."""
+        return len(self.added) + len(self.removed) + len(self.updated)
+
+def diff(base: t.Dict[str, Fields], entries: t.Iterable[AbstractEntry]) -> t.Dict[str, t.Optional[AbstractEntry]]:
+    """Find the entries added, deleted or modified since a base version.
+
+    Parameters:
+        base: URI -> fields of the entries of the base version.
+        entries: The entries of the new version.
+
+    Returns:
+        URI -> the new entry, `None` for the deleted entries, for the changed entries only.
+    """
+    changed = {}
+    seen = set()
+    for entry in entries:
+        seen.add(entry.uri)
+        if base.get(entry.uri) != vars(entry):
+            changed[entry.uri] = entry
+    for uri in base.keys() - seen:
+        changed[uri] = None
+    return changed
+
+def three_way_merge(base: t.Dict[str, Fields], ours: t.Dict[str, t.Optional[Fields]],
+        theirs: t.Dict[str, t.Optional[AbstractEntry]]) -> Merge:
+    """Merge the changes made on two sides since a base version.
+
+    Parameters:
+        base: URI -> fields of the entries of the base version.
+        ours: URI -> fields of our entries changed since the base (`None` if deleted), see `diff`.
+        theirs: URI -> their entries changed since the base (`None` if deleted), see `diff`.
+
+    Returns:
+        Their changes to apply to our version, and the conflicts.
+    """
+    merge = Merge([], [], {}, [])
+    for uri, their_entry in theirs.items():
+        base_fields = base.get(uri)
+        if uri not in ours:
+            # changed on their side only
+            if their_entry is None:
+                merge.removed.append(uri)
+            elif base_fields is None:
+                merge.added.append(their_entry)
+            else:
+                merge.updated[uri] = {field: value for field, value in vars(their_entry).items()
+                    if base_fields.get(field) != value}
+            continue
+
+        our_fields = ours[uri]
+        if our_fields is None and their_entry is None:
+            continue # deleted on both sides
+        if our_fields is None or their_entry is None:
+            if our_fields != base_fields and (their_entry is None or vars(their_entry) != base_fields):
+                merge.conflicts.append(Conflict(uri, None, our_fields,
+                    None if their_entry is None else vars(their_entry), their_entry))
+            elif their_entry is None:
+                merge.removed.append(uri)
+            continue
+
+        # changed on both sides, or added on both sides with the same URI
+        base_fields = base_fields or {}
+        updated = {}
+        for field, their_value in vars(their_entry).items():
+            our_value = our_fields.get(field)
+            base_value = base_fields.get(field)
+            if their_value == our_value or their_value == base_value:
+                continue
+            if our_value == base_value:
+                updated[field] = their_value
+            else:
+                merge.conflicts.append(Conflict(uri, field, our_value, their_value))
+        if updated:
+            merge.updated[uri] = updated
+    return merge
+
+def resolve(merge: Merge, take_theirs: bool) -> Merge:
+    """Resolve all the conflicts of a merge on one side.
+
+    Parameters:
+        merge: The merge.
+        take_theirs: `True` to apply their side of the conflicts, `False` to keep ours.
+
+    Returns:
+        The merge without conflicts.
+    """
+    resolved = Merge(list(merge.added), list(merge.removed), {uri: dict(fields) for uri, fields in
+        merge.updated.items()}, [])
+    if not take_theirs:
+        return resolved
+    for conflict in merge.conflicts:
+        if conflict.field is not None:
+            resolved.updated.setdefault(conflict.uri, {})[conflict.field] = conflict.theirs
+        elif conflict.theirs is None:
+            resolved.removed.append(conflict.uri)
+        elif conflict.ours is None:
+            resolved.added.append(conflict.entry)
+    return resolved
@@ -0,0 +1,237 @@
+"""Package to find Novan wordforms that sound alike.
+
+The distance between two wordforms is an edit distance where substituting a letter with a letter of the same sound
+class (vowels, throat, nose or tongue consonants) is cheaper than any other substitution.
+The distance is a metric, which allows indexing the wordforms in a BK-tree.
+"""
+import typing as t
+import heapq
+from .nvn import VOWELS, THROAT_CONSONANTS, NOSE_CONSONANTS, TONGUE_CONSONANTS, ALPHABET
+
+INDEL_COST = 1.
+SUBSTITUTION_COST = 1.
+SIMILAR_SUBSTITUTION_COST = .5
+SIMILAR_CLASSES = [VOWELS, THROAT_CONSONANTS, NOSE_CONSONANTS, TONGUE_CONSONANTS]
+INFINITY = float("inf")
+
+def substitution_cost(a: str, b: str) -> float:
+    """Compute the cost of substituting character `a` with character `b`.
+
+    Parameters:
+        a: The character to replace.
+        b: The replacing character.
+
+    Returns:
+        `0` if the characters are the same, `SIMILAR_SUBSTITUTION_COST` if they belong to the same sound class,
+        `SUBSTITUTION_COST` otherwise.
+    """
+    if a == b:
+        return 0.
+    if any(a in chars and b in chars for chars in SIMILAR_CLASSES):
+        return SIMILAR_SUBSTITUTION_COST
+    return SUBSTITUTION_COST
+
+_SUBSTITUTION_COSTS = {(a, b): substitution_cost(a, b) for a in ALPHABET for b in ALPHABET}
+
+def distance(a: str, b: str, bound: float = INFINITY) -> float:
+    """Compute the phonological distance between two Novan wordforms.
+
+    Parameters:
+        a: The first wordform.
+        b: The second wordform.
+        bound: If provided, the computation stops as soon as the distance is known to exceed `bound`.
+
+    Returns:
+        The weighted edit distance between `a` and `b`, or `INFINITY` if it exceeds `bound`.
+    """
+    if a == b:
+        return 0.
+    if abs(len(a) - len(b)) * INDEL_COST > bound:
+        return INFINITY
+    costs = _SUBSTITUTION_COSTS
+    previous = [i * INDEL_COST for i in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        current = [i * INDEL_COST]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + INDEL_COST,
+                current[j - 1] + INDEL_COST,
+                previous[j - 1] + costs.get((char_a, char_b), SUBSTITUTION_COST if char_a != char_b else 0.)))
+        if min(current) > bound:
+            return INFINITY
+        previous = current
+    return previous[-1] if previous[-1] <= bound else INFINITY
+
+class _Node:
+    """Node of the BK-tree, holding the items sharing a wordform."""
+
+    __slots__ = ("form", "items", "children")
+
+    def __init__(self, form: str):
+        self.form = form
+        self.items = []
+        self.children = {}
+
+class NeighbourIndex:
+    """BK-tree over Novan wordforms, to find the wordforms closest to a given form.
+
+    Each wordform is associated with one or more items (typically lexical entries).
+    """
+
+    root: t.Optional[_Node]
+    nodes: t.Dict[str, _Node]
+
+    def __init__(self, items: t.Iterable[t.Tuple[str, t.Any]] = ()):
+        """Create an index of Novan wordforms.
+
+        Parameters:
+            items: Pairs of wordforms and associated items to add to the index.
+        """
+        self.root = None
+        self.nodes = {}
+        for form, item in items:
+            self.add(form, item)
+
+    def __len__(self) -> int:
+        """Return the number of wordforms associated with at least one item."""
+        return sum(1 for node in self.nodes.values() if node.items)
+
+    def __contains__(self, form: str) -> bool:
+        """Check if a wordform is associated with at least one item."""
+        node = self.nodes.get(form)
+        return node is not None and bool(node.items)
+
+    def add(self, form: str, item: t.Any):
+        """Associate an item with a wordform.
+
+        Empty wordforms are ignored.
+
+        Parameters:
+            form: The wordform.
+            item: The item to associate with the wordform.
+        """
+        if not form:
+            return
+        if form in self.nodes:
+            self.nodes[form].items.append(item)
+            return
+
+        new_node = _Node(form)
+        new_node.items.append(item)
+        self.nodes[form] = new_node
+        if self.root is None:
+            self.root = new_node
+            return
+
+        node = self.root
+        while True:
+            d = distance(form, node.form)
+            if d not in node.children:
+                node.children[d] = new_node
+                return
+            node = node.children[d]
+
+    def remove(self, form: str, item: t.Any):
+        """Dissociate an item from a wordform.
+
+        The wordform stays in the tree to keep its structure, but is not returned by the queries anymore.
+
+        Parameters:
+            form: The wordform.
+            item: The item to dissociate from the wordform.
+        """
+        node = self.nodes.get(form)
+        if node is not None:
+            node.items = [other for other in node.items if other is not item]
+
+    def nearest(self, form: str, k: int = 5, max_distance: float = INFINITY
+            ) -> t.List[t.Tuple[float, str, t.List[t.Any]]]:
+        """Find the wordforms closest to a form.
+
+        Parameters:
+            form: The wordform to look for.
+            k: The maximum number of wordforms to return.
+            max_distance: The maximum distance of the returned wordforms.
+
+        Returns:
+            A list of `(distance, wordform, items)` tuples, sorted by increasing distance.
+        """
+        if self.root is None or k <= 0:
+            return []
+
+        best = [] # max-heap of (-distance, wordform)
+        radius = max_distance
+        # best-first traversal, ordered by the lower bound of the distance of the subtrees
+        queue = [(0., 0, self.root)]
+        counter = 1
+        while queue:
+            lower_bound, _, node = heapq.heappop(queue)
+            if lower_bound > radius:
+                break
+            d = distance(form, node.form, radius + max(node.children, default=0.))
+            if node.items and d <= radius:
+                heapq.heappush(best, (-d, node.form))
+                if len(best) > k:
+                    heapq.heappop(best)
+                if len(best) == k:
+                    radius = min(radius, -best[0][0])
+            for edge, child in node.children.items():
+                child_bound = max(lower_bound, abs(edge - d))
+                if child_bound <= radius:
+                    heapq.heappush(queue, (child_bound, counter, child))
+                    counter += 1
+
+        return [(-d, other, list(self.nodes[other].items)) for d, other in sorted(best, reverse=True)]
+
+    def within(self, form: str, max_distance: float) -> t.List[t.Tuple[float, str, t.List[t.Any]]]:
+        """Find all the wordforms within a given distance of a form.
+
+        Parameters:
+            form: The wordform to look for.
+            max_distance: The maximum distance of the returned wordforms.
+
+        Returns:
+            A list of `(distance, wordform, items)` tuples, sorted by increasing distance.
+        """
+        if self.root is None:
+            return []
+
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = distance(form, node.form, max_distance + max(node.children, default=0.))
+            if node.items and d <= max_distance:
+                found.append((d, node.form, list(node.items)))
+            for edge, child in node.children.items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+
+        return sorted(found, key=lambda x: (x[0], x[1]))
+
+    def any_within(self, form: str, max_distance: float) -> bool:
+        """Check if any wordform lies within a given distance of a form.
+
+        Faster than `within`, as the search stops at the first wordform found.
+
+        Parameters:
+            form: The wordform to look for.
+            max_distance: The maximum distance of the wordforms to look for.
+
+        Returns:
+            `True` if a wordform of the index is within `max_distance` of `form`, `False` otherwise.
+        """
+        if self.root is None:
+            return False
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = distance(form, node.form, max_distance + max(node.children, default=0.))
+            if node.items and d <= max_distance:
+                return True
+            for edge, child in node.children.items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+
+        return False
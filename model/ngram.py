@@ -0,0 +1,156 @@
+"""Package to generate Novan wordforms from the syllable n-grams of a lexicon.
+
+The n-grams are counted on the wordforms of the lexicon, each wordform being padded with start symbols.
+The counts of each order are stored as two sorted arrays, the keys encoding `(context, syllable)` and the counts, so
+that the table only holds the n-grams seen in the lexicon.
+The probability of a syllable given its context interpolates the counts of the n-grams of each order, from the longest
+context down to the weight map of the generator: `p(s | ctx) = (count(ctx, s) + smoothing * p(s | shorter ctx)) /
+(count(ctx) + smoothing)`.
+Only the syllables that may legally follow the previous one are drawn, and the cumulated distribution of each context
+is built once, on its first draw.
+"""
+import typing as t
+import random
+from bisect import bisect
+import numpy as np
+from .generator import Generator
+from .syllables import SYLLABLE_TABLE, bitset_ids
+
+ORDERS = (1, 2, 3)
+SMOOTHING = 1.
+
+SYLLABLE_COUNT = len(SYLLABLE_TABLE)
+START = SYLLABLE_COUNT # symbol preceding the first syllable of a wordform
+BASE = SYLLABLE_COUNT + 1 # base of the encoding of the contexts
+
+# syllable (or start symbol) -> IDs of the syllables that may follow it
+LEGAL = [np.array(bitset_ids(joins), dtype=np.int64) for joins in SYLLABLE_TABLE.joins]
+LEGAL.append(np.array(bitset_ids(SYLLABLE_TABLE.valid), dtype=np.int64))
+
+class NgramGenerator(Generator):
+    """Generator drawing each syllable given the previous ones, as in the lexicon."""
+
+    order: int
+    smoothing: float
+    keys: t.List[np.ndarray] # context length -> sorted keys `context * SYLLABLE_COUNT + syllable`
+    counts: t.List[np.ndarray] # context length -> count of each key
+    prior: np.ndarray
+    tables: t.Dict[t.Tuple[int, ...], t.Tuple[t.List[int], t.List[float]]]
+
+    def __init__(self, weight_map: t.Optional[t.Dict[str, float]] = None, order: int = 2,
+            smoothing: float = SMOOTHING):
+        """Create a generator drawing syllables given the previous ones.
+
+        The generator draws from the weight map alone until it is trained.
+
+        Parameters:
+            weight_map: If provided, this mapping from characters to probabilities are used to weight the syllables
+                unseen in the lexicon.
+            order: The length of the n-grams: 1 for single syllables, 2 for pairs, 3 for triples.
+            smoothing: The weight of the shorter contexts, in number of occurrences.
+
+        Raises:
+            ValueError: The order is not in `ORDERS`.
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unsupported n-gram order {order}, expected one of {ORDERS}.")
+        self.order = order
+        self.smoothing = smoothing
+        self.keys = [np.zeros(0, dtype=np.int64) for _ in range(order)]
+        self.counts = [np.zeros(0, dtype=np.int64) for _ in range(order)]
+        super().__init__(weight_map)
+
+    def train(self, wordforms: t.Iterable[str]):
+        """Count the syllable n-grams of wordforms, replacing the previous counts.
+
+        Parameters:
+            wordforms: The wordforms, the empty and invalid ones are ignored.
+        """
+        sequences = []
+        for wordform in wordforms:
+            if not wordform:
+                continue
+            try:
+                ids = SYLLABLE_TABLE.encode_wordform(wordform)
+            except KeyError: # not a Novan wordform
+                continue
+            sequences.append([START] * (self.order - 1) + ids)
+        padded = np.array([syl for ids in sequences for syl in ids], dtype=np.int64)
+        # position of each syllable in `padded`, skipping the start symbols
+        ends = np.flatnonzero(padded != START)
+
+        for length in range(self.order):
+            context = np.zeros(len(ends), dtype=np.int64)
+            for offset in range(length, 0, -1):
+                context = context * BASE + padded[ends - offset]
+            keys, counts = np.unique(context * SYLLABLE_COUNT + padded[ends], return_counts=True)
+            self.keys[length] = keys
+            self.counts[length] = counts
+        self.tables.clear()
+
+    def update_weights(self):
+        """Compute the weights of the syllables, and forget the distributions built on the previous weights."""
+        super().update_weights()
+        self.prior = np.array(self.weights, dtype=float)
+        self.tables = {}
+
+    def update_dirty_weights(self):
+        """Recompute the weights of the syllables containing a character whose weight changed."""
+        if self.dirty_chars:
+            super().update_dirty_weights()
+            self.prior = np.array(self.weights, dtype=float)
+            self.tables.clear()
+
+    def draw(self, n: int) -> str:
+        """Draw a candidate wordform by chaining legal syllables.
+
+        Parameters:
+            n: The number of syllables.
+
+        Returns:
+            The concatenated syllables, empty if the chain reached a syllable without successor.
+        """
+        context_length = max(self.order - 1, 1) # the legal joins depend on the previous syllable
+        history = [START] * context_length
+        syllables = []
+        for _ in range(n):
+            context = tuple(history[-context_length:])
+            table = self.tables.get(context)
+            if table is None:
+                table = self.tables[context] = self.table(context)
+            ids, cumulated = table
+            if not ids:
+                return ""
+            i = bisect(cumulated, random.random() * cumulated[-1])
+            syllables.append(ids[min(i, len(ids) - 1)])
+            history.append(syllables[-1])
+        return "".join(SYLLABLE_TABLE.decode(syllables))
+
+    def table(self, context: t.Tuple[int, ...]) -> t.Tuple[t.List[int], t.List[float]]:
+        """Build the distribution of the syllable following a context.
+
+        Parameters:
+            context: The IDs of the previous syllables, `START` before the first syllable.
+
+        Returns:
+            The IDs of the syllables that may follow the context and their cumulated probabilities.
+        """
+        legal = LEGAL[context[-1]]
+        if len(legal) == 0:
+            return [], []
+        p = self.prior[legal]
+        total = p.sum()
+        p = p / total if total > 0 else np.full(len(legal), 1 / len(legal))
+
+        for length in range(self.order):
+            code = 0
+            for syl in context[len(context) - length:] if length else ():
+                code = code * BASE + syl
+            keys = self.keys[length]
+            start, end = np.searchsorted(keys, [code * SYLLABLE_COUNT, (code + 1) * SYLLABLE_COUNT])
+            counts = np.zeros(SYLLABLE_COUNT)
+            counts[keys[start:end] - code * SYLLABLE_COUNT] = self.counts[length][start:end]
+            seen = counts[legal]
+            if seen.sum() > 0:
+                p = (seen + self.smoothing * p) / (seen.sum() + self.smoothing)
+        return legal.tolist(), np.cumsum(p).tolist()
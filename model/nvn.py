@@ -1,5 +1,7 @@
 """Package with tools and constants to handle Novan wordforms."""
 import typing as t
+import re
+from functools import lru_cache
 
 VOWELS = "ieaou"
 BREATH_CONSONANT = "h"
@@ -15,6 +17,22 @@ SYLLABLES += [c + v for c in CONSONANTS for v in VOWELS]
 SYLLABLES += [v + c for c in CONSONANTS for v in VOWELS]
 SYLLABLES += [c + v + cc for c in CONSONANTS for cc in CONSONANTS for v in VOWELS]
 
+# the rules of `are_compatible` and `is_valid` as a single scan for a forbidden pattern
+_C = "[" + CONSONANTS + "]"
+INVALID_PATTERN = re.compile("|".join([
+    "^" + _C + r"\Z", # single consonant
+    BREATH_CONSONANT + ".", # breath consonant followed by anything
+    r"(.)\1", # duplicate letters
+    "[" + THROAT_CONSONANTS + "]{2}", "[" + NOSE_CONSONANTS + "]{2}", "[" + TONGUE_CONSONANTS + "]{2}",
+    _C + "{3}", # chain of consonants
+    "^" + _C + "{2}", _C + r"{2}\Z", # sequence of consonants at the begining or the end
+]), re.DOTALL)
+# syllable boundaries of `syllabify`: C-C, V-V and V-CV
+_V = "[" + VOWELS + "]"
+_NOT_V = "[^" + VOWELS + "]"
+SYLLABLE_BOUNDARY_PATTERN = re.compile(
+    f"(?<={_NOT_V})(?={_NOT_V})|(?<={_V})(?={_V})|(?<={_V})(?={_NOT_V}{_V})", re.DOTALL)
+
 def are_compatible(a: str, b: str) -> bool:
     """Check if character `a` can be followed by character `b` in a single Novan wordform.
 
@@ -48,22 +66,7 @@ def is_valid(nvn: str) -> bool:
     Returns:
         `True` if the input is a valid wordform in Novan, `False` otherwise.
     """
-    # Forbid single consonants
-    if len(nvn) == 1 and nvn in CONSONANTS:
-        return False
-
-    # Check if each pair of letters is valid
-    pair_compatibility = all(are_compatible(nvn[i], nvn[i + 1]) for i in range(len(nvn) - 1))
-    
-    # Check if no more than 2 consonants follow each other
-    no_consonant_chain = not any((nvn[i] in CONSONANTS and nvn[i + 1] in CONSONANTS and nvn[i + 2] in CONSONANTS)
-        for i in range(len(nvn) - 2))
-
-    # Check that there is no sequence of consonants at the begining or the end
-    no_double_consonant = len(nvn) < 2 or not ((nvn[0] in CONSONANTS and nvn[1] in CONSONANTS) or
-        (nvn[-2] in CONSONANTS and nvn[-1] in CONSONANTS))
-
-    return pair_compatibility and no_consonant_chain and no_double_consonant
+    return INVALID_PATTERN.search(nvn) is None
 
 def cvify(nvn: str) -> str:
     """Compute the CV (consonant-vowel) form of a Novan wordform.
@@ -78,10 +81,11 @@ def cvify(nvn: str) -> str:
     return cv_labels
 
 def syllabify(nvn: str) -> t.List[str]:
-    """Split a wordform into syllables using a recursive process.
+    """Split a wordform into syllables.
 
     This functions prioritizes the onset over the coda.
     Typically, a `VCV` form will be split into `V-CV` rather than `VC-V`.
+    Consecutive consonants or vowels are always split.
 
     Parameters:
         nvn: string of characters in Novan corresponding to a wordform.
@@ -89,16 +93,42 @@ def syllabify(nvn: str) -> t.List[str]:
     Returns:
         A list of syllables corresponding to the input.
     """
-    cv = cvify(nvn)
+    return SYLLABLE_BOUNDARY_PATTERN.split(nvn)
+
+def is_completable(nvn: str) -> bool:
+    """Check if a prefix can be completed into a valid Novan wordform.
+
+    A prefix breaking a rule only at its end (single consonant, final consonant pair) can be completed with a vowel,
+    unless it ends with the breath consonant, which nothing may follow.
+
+    Parameters:
+        nvn: The prefix.
+
+    Returns:
+        `True` if a valid wordform starts with `nvn`, `False` otherwise.
+    """
+    return is_valid(nvn) or any(is_valid(nvn + v) for v in VOWELS)
 
-    # ...C-C... or ...V-V...
-    for i in range(len(nvn) - 1):
-        if cv[i] == cv[i + 1]:
-            return syllabify(nvn[:i + 1]) + syllabify(nvn[i + 1:])
+def next_chars(nvn: str) -> str:
+    """List the characters that may follow a prefix in a valid Novan wordform.
 
-    # ...V-CV...
-    for i in range(len(nvn) - 2):
-        if cv[i] == cv[i + 2] == "V" and cv[i + 1] == "C":
-            return syllabify(nvn[:i + 1]) + syllabify(nvn[i + 1:])
+    Parameters:
+        nvn: The prefix.
 
-    return [nvn]
+    Returns:
+        The characters `c` such that `nvn + c` can be completed into a valid wordform, in the order of `ALPHABET`;
+        empty if `nvn` itself cannot be completed.
+    """
+    if not is_completable(nvn):
+        return ""
+    if len(nvn) <= 2:
+        return _next_chars(nvn)
+    # the rules only look at the last two characters and at the start of the wordform: replace the rest of a longer
+    # prefix with a vowel, which does not interact with them
+    pad = VOWELS[0] if nvn[-2] != VOWELS[0] else VOWELS[1]
+    return _next_chars(pad + nvn[-2:])
+
+@lru_cache(maxsize=None)
+def _next_chars(nvn: str) -> str:
+    """List the characters that may follow a short completable prefix."""
+    return "".join(char for char in ALPHABET if is_completable(nvn + char))
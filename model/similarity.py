@@ -0,0 +1,189 @@
+"""Package to link the Novan wordforms that sound alike, without comparing all the pairs.
+
+Candidate pairs are found by deletion-neighbourhood hashing: the wordforms are first reduced to their sound classes
+(substitutions inside a class cost less than a full edit), then each reduced form is hashed with all the variants
+obtained by deleting up to `max_distance` characters.
+Two wordforms within `max_distance` share at least one variant, so only the wordforms sharing a bucket are compared
+with the exact distance, in parallel across processes for large lexicons.
+Results are cached to disk, keyed by a hash of the wordforms and the parameters.
+"""
+import typing as t
+import os
+import json
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from .entry import AbstractEntry
+from .neighbours import distance, SIMILAR_CLASSES, SIMILAR_SUBSTITUTION_COST, SUBSTITUTION_COST, INDEL_COST
+from .graph import SOUND, Edge
+
+CACHE_DIR = "data/similarity-cache"
+MAX_DISTANCE = 1.
+CHUNK_SIZE = 20000
+PARALLEL_THRESHOLD = 100000 # candidate pairs under which the verification stays in the current process
+
+Pair = t.Tuple[int, int, float]
+
+# character -> representative of its sound class
+SOUND_CLASSES = {char: chars[0] for chars in SIMILAR_CLASSES for char in chars}
+
+def reduce_form(nvn: str) -> str:
+    """Replace each character of a wordform with the representative of its sound class.
+
+    Parameters:
+        nvn: string of characters in Novan corresponding to a wordform.
+
+    Returns:
+        The reduced wordform.
+    """
+    return "".join(SOUND_CLASSES.get(char, char) for char in nvn)
+
+def deletion_variants(form: str, deletions: int) -> t.Set[str]:
+    """Compute the strings obtained by deleting up to a number of characters of a string.
+
+    Parameters:
+        form: The string.
+        deletions: The maximum number of characters to delete.
+
+    Returns:
+        The set of variants, including `form`.
+    """
+    variants = {form}
+    frontier = {form}
+    for _ in range(deletions):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+def candidate_pairs(forms: t.Sequence[str], max_distance: float = MAX_DISTANCE) -> t.Set[t.Tuple[int, int]]:
+    """Find the pairs of wordforms that may lie within a distance of each other.
+
+    Parameters:
+        forms: Distinct wordforms.
+        max_distance: The maximum phonological distance.
+
+    Returns:
+        The set of `(i, j)` pairs of indices in `forms`, with `i < j`.
+    """
+    # besides substitutions inside a sound class, each edit costs at least the cheapest of a full substitution and
+    # an insertion or deletion
+    deletions = int(max_distance // min(SUBSTITUTION_COST, INDEL_COST))
+    buckets = {}
+    for i, form in enumerate(forms):
+        for variant in deletion_variants(reduce_form(form), deletions):
+            buckets.setdefault(variant, []).append(i)
+
+    pairs = set()
+    for bucket in buckets.values():
+        if len(bucket) > 1:
+            pairs.update(itertools.combinations(bucket, 2))
+    return pairs
+
+def _verify(pairs: t.List[t.Tuple[int, int, str, str]], max_distance: float) -> t.List[Pair]:
+    """Keep the candidate pairs within the distance, with their exact distance."""
+    verified = []
+    for i, j, a, b in pairs:
+        d = distance(a, b, max_distance)
+        if d <= max_distance:
+            verified.append((i, j, d))
+    return verified
+
+def similar_pairs(forms: t.Sequence[str], max_distance: float = MAX_DISTANCE,
+        workers: t.Optional[int] = None) -> t.List[Pair]:
+    """Find all the pairs of wordforms within a phonological distance of each other.
+
+    Parameters:
+        forms: Distinct wordforms.
+        max_distance: The maximum phonological distance.
+        workers: The number of processes verifying the candidates, the number of processors if not provided.
+
+    Returns:
+        The sorted `(i, j, distance)` pairs of indices in `forms`, with `i < j`.
+    """
+    candidates = [(i, j, forms[i], forms[j]) for i, j in sorted(candidate_pairs(forms, max_distance))]
+    if len(candidates) < PARALLEL_THRESHOLD or workers == 1:
+        return _verify(candidates, max_distance)
+
+    chunks = [candidates[start:start + CHUNK_SIZE] for start in range(0, len(candidates), CHUNK_SIZE)]
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(_verify, chunks, itertools.repeat(max_distance))
+        return [pair for result in results for pair in result]
+
+def cache_key(forms: t.Sequence[str], max_distance: float) -> str:
+    """Compute the key of the cached pairs of a list of wordforms.
+
+    Parameters:
+        forms: Distinct wordforms.
+        max_distance: The maximum phonological distance.
+
+    Returns:
+        A hash of the wordforms, the distance and the costs of the edits.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((max_distance, SIMILAR_SUBSTITUTION_COST, SUBSTITUTION_COST, INDEL_COST,
+        sorted(SOUND_CLASSES.items()))).encode())
+    for form in forms:
+        digest.update(form.encode() + b"\0")
+    return digest.hexdigest()
+
+def cached_similar_pairs(forms: t.Sequence[str], max_distance: float = MAX_DISTANCE,
+        workers: t.Optional[int] = None, cache_dir: t.Optional[str] = CACHE_DIR) -> t.List[Pair]:
+    """Find all the pairs of wordforms within a phonological distance of each other, using the cache if possible.
+
+    Parameters:
+        forms: Distinct wordforms.
+        max_distance: The maximum phonological distance.
+        workers: The number of processes verifying the candidates, the number of processors if not provided.
+        cache_dir: The directory of the cache files, `None` to disable the cache.
+
+    Returns:
+        The sorted `(i, j, distance)` pairs of indices in `forms`, with `i < j`.
+    """
+    if cache_dir is None:
+        return similar_pairs(forms, max_distance, workers)
+
+    path = os.path.join(cache_dir, cache_key(forms, max_distance) + ".json")
+    try:
+        with open(path) as file:
+            return [tuple(pair) for pair in json.load(file)]
+    except (OSError, ValueError):
+        pass
+
+    pairs = similar_pairs(forms, max_distance, workers)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(pairs, file, separators=(",", ":"))
+    except OSError as e:
+        print(f"Unable to write file '{path}': {e}")
+    return pairs
+
+def similarity_edges(entries: t.Sequence[AbstractEntry], max_distance: float = MAX_DISTANCE,
+        workers: t.Optional[int] = None, cache_dir: t.Optional[str] = CACHE_DIR) -> t.List[Edge]:
+    """Link the entries whose Novan wordforms sound alike, for `LexiconGraph.from_entries`.
+
+    Entries sharing the same wordform are linked as well.
+
+    Parameters:
+        entries: The entries of the lexicon.
+        max_distance: The maximum phonological distance.
+        workers: The number of processes verifying the candidates, the number of processors if not provided.
+        cache_dir: The directory of the cache files, `None` to disable the cache.
+
+    Returns:
+        The `(source, target, SOUND)` edges, with `source < target`.
+    """
+    nodes = {}
+    for node, entry in enumerate(entries):
+        if entry.nvn:
+            nodes.setdefault(entry.nvn, []).append(node)
+    forms = sorted(nodes)
+
+    edges = []
+    for same in nodes.values():
+        edges.extend((source, target, SOUND) for source, target in itertools.combinations(same, 2))
+    for i, j, _ in cached_similar_pairs(forms, max_distance, workers, cache_dir):
+        edges.extend(
+            (min(source, target), max(source, target), SOUND)
+            for source in nodes[forms[i]] for target in nodes[forms[j]])
+    return edges
@@ -0,0 +1,128 @@
+"""Snapshots of parsed lexicons.
+
+A snapshot stores the parsed entries of a CSV file with the size, modification time and SHA-256 hash of the file, so
+that an unchanged file does not need to be parsed, evaluated and validated again.
+Snapshots are plain JSON data: they may sit on a shared drive, so reading one must not be able to run code.
+"""
+import typing as t
+import os
+import json
+import hashlib
+from operator import attrgetter
+from .entry import AbstractEntry
+from .verb import Verb
+
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".snapshot"
+HASH_BLOCK_SIZE = 1 << 16
+
+class Snapshot(t.NamedTuple):
+    """Parsed entries of a CSV file, with the signature of the file."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+    entries: t.List[AbstractEntry]
+
+def snapshot_path(csv_path: str) -> str:
+    """Return the path of the snapshot of a CSV file."""
+    return csv_path + SNAPSHOT_SUFFIX
+
+def file_stat(path: str) -> t.Tuple[int, int]:
+    """Return the size and the modification time (in nanoseconds) of a file.
+
+    Raises:
+        OSError: The file cannot be accessed.
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def file_digest(path: str) -> str:
+    """Compute the SHA-256 hash of a file.
+
+    Raises:
+        OSError: The file cannot be read.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while (block := file.read(HASH_BLOCK_SIZE)):
+            digest.update(block)
+    return digest.hexdigest()
+
+def is_fresh(snapshot: Snapshot, csv_path: str) -> bool:
+    """Check if the size and modification time of a CSV file match its snapshot.
+
+    Matching files are assumed unchanged; the hash is left to `is_unchanged`, which reads the whole file.
+    """
+    try:
+        return file_stat(csv_path) == (snapshot.size, snapshot.mtime_ns)
+    except OSError:
+        return False
+
+def is_unchanged(snapshot: Snapshot, csv_path: str) -> bool:
+    """Check if the content of a CSV file matches its snapshot."""
+    try:
+        return file_digest(csv_path) == snapshot.digest
+    except OSError:
+        return False
+
+def read_snapshot(csv_path: str, entry_class: t.Type[AbstractEntry] = Verb) -> Snapshot:
+    """Read the snapshot of a CSV file.
+
+    Parameters:
+        csv_path: The path of the CSV file.
+        entry_class: The class of the entries.
+
+    Returns:
+        The snapshot, which may be stale.
+
+    Raises:
+        OSError: The snapshot cannot be read.
+        ValueError: The snapshot is corrupted or was written by another version.
+    """
+    with open(snapshot_path(csv_path), "rb") as file:
+        data = json.load(file)
+    try:
+        version = data["version"]
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {version} is not {SNAPSHOT_VERSION}.")
+        size, mtime_ns, digest, fields = data["size"], data["mtime_ns"], data["digest"], data["fields"]
+        entries = []
+        new = entry_class.__new__
+        for values in data["entries"]:
+            # the entries were validated when the snapshot was written
+            entry = new(entry_class)
+            entry.__dict__ = dict(zip(fields, values))
+            entries.append(entry)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Corrupted snapshot: {e!r}") from e
+    return Snapshot(size, mtime_ns, digest, entries)
+
+def write_snapshot(csv_path: str, entries: t.Sequence[AbstractEntry], digest: t.Optional[str] = None) -> Snapshot:
+    """Write the snapshot of a CSV file.
+
+    The snapshot is written to a temporary file first, so that an interrupted write leaves the previous snapshot.
+
+    Parameters:
+        csv_path: The path of the CSV file.
+        entries: The entries parsed from the file.
+        digest: The hash of the file, computed if not provided.
+
+    Returns:
+        The snapshot.
+
+    Raises:
+        OSError: The CSV file cannot be read, or the snapshot cannot be written.
+    """
+    size, mtime_ns = file_stat(csv_path)
+    snapshot = Snapshot(size, mtime_ns, digest or file_digest(csv_path), list(entries))
+    path = snapshot_path(csv_path)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        # one row of values per entry, the field names being written once
+        fields = list(vars(snapshot.entries[0])) if snapshot.entries else []
+        rows = list(map(attrgetter(*fields), snapshot.entries)) if fields else []
+        json.dump({"version": SNAPSHOT_VERSION, "size": size, "mtime_ns": mtime_ns, "digest": snapshot.digest,
+            "fields": fields, "entries": rows}, file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary_path, path)
+    return snapshot
@@ -0,0 +1,175 @@
+"""Reading and writing of the lexicon data files.
+
+pandas is only imported when a file is read or written, so that importing `model` stays fast.
+"""
+import typing as t
+import os
+import sys
+import time
+import socket
+from ast import literal_eval
+from contextlib import contextmanager
+from .verb import Verb
+from .generator import Generator
+
+VERBS_PATH = "data/verbs.csv"
+GENERATORS_PATH = "data/generators.csv"
+EXPORT_PATH = "data/verb-export.csv"
+LOCK_SUFFIX = ".lock"
+LOCK_TIMEOUT = 10. # s
+LOCK_STALE_AGE = 60. # s, age from which a lock is assumed left by a crashed editor
+LOCK_POLL_DELAY = .05 # s
+EXPORT_COLUMNS = ["en_desc", "nvn_desc", "en", "nvn"]
+VERB_ENTITY_PREFIX = "v:"
+
+def packaged_path(path: str) -> str:
+    """Return the path of a data file, in the archive of a PyInstaller build if it is not found locally.
+
+    The files next to the executable take precedence, so that rebuilt data replaces the packaged one.
+
+    Parameters:
+        path: The path of the data file, relative to the working directory.
+    """
+    archive = getattr(sys, "_MEIPASS", None)
+    if archive is None or os.path.exists(path):
+        return path
+    return os.path.join(archive, path)
+
+def read_verbs(path: str = VERBS_PATH) -> t.List[Verb]:
+    """Read the verbs of a CSV file, or of a compiled bundle (see `model.bundle`), which does not need pandas.
+
+    Parameters:
+        path: Path to the verb data CSV, or to a bundle if it ends with `bundle.BUNDLE_SUFFIX`.
+
+    Returns:
+        The verbs, in the order of the file.
+
+    Raises:
+        OSError: The file cannot be read.
+        ValueError: The file is malformed, or a Novan wordform is invalid.
+    """
+    from .bundle import BUNDLE_SUFFIX, read_bundle
+    if path.endswith(BUNDLE_SUFFIX):
+        return read_bundle(path)
+    import pandas as pd
+    df = pd.read_csv(path, index_col=0, keep_default_na=False, converters={'nvn_syllables': literal_eval})
+    return [Verb(**{name: value for name, value in zip(df.columns, row)}) for _, row in df.iterrows()]
+
+def write_verbs(verbs: t.Iterable[Verb], path: str = VERBS_PATH):
+    """Write verbs to a CSV file.
+
+    The file is written to a temporary file first and then replaced, so that readers never see a partial file.
+
+    Parameters:
+        verbs: The verbs.
+        path: Path to the verb data CSV.
+    """
+    import pandas as pd
+    df = pd.DataFrame.from_records([v.__dict__ for v in verbs])
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(temporary_path)
+    os.replace(temporary_path, path)
+
+@contextmanager
+def lock_file(path: str, timeout: float = LOCK_TIMEOUT, stale_age: float = LOCK_STALE_AGE):
+    """Hold the advisory write lock of a file.
+
+    The lock is a file created next to the locked file, which works on network drives; all the editors writing the
+    file must take the lock.
+
+    Parameters:
+        path: Path to the locked file.
+        timeout: The maximum time to wait for the lock, in seconds.
+        stale_age: The age from which a lock is assumed abandoned and broken, in seconds.
+
+    Raises:
+        TimeoutError: The lock is held by another editor.
+    """
+    lock_path = path + LOCK_SUFFIX
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                owner = open(lock_path).read().strip()
+                if time.time() - os.stat(lock_path).st_mtime > stale_age:
+                    print(f"Breaking the stale lock of '{path}' held by {owner or 'unknown'}.")
+                    os.remove(lock_path)
+                    continue
+            except OSError: # released in the meantime
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"'{path}' is being written by {owner or 'another editor'}.")
+            time.sleep(LOCK_POLL_DELAY)
+            continue
+        with os.fdopen(descriptor, "w") as file:
+            file.write(f"{socket.gethostname()}:{os.getpid()}")
+        break
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+def read_generators(path: str = GENERATORS_PATH) -> t.Dict[str, Generator]:
+    """Read the weight maps of the wordform generators of a CSV file.
+
+    Parameters:
+        path: Path to the generator CSV.
+
+    The n-gram generators, with a non-zero `order`, are returned untrained.
+
+    Returns:
+        Generator name -> generator.
+
+    Raises:
+        OSError: The file cannot be read.
+        ValueError: The file is malformed.
+    """
+    import pandas as pd
+    df = pd.read_csv(path, index_col=0, keep_default_na=False)
+    generators = {}
+    for _, row in df.iterrows():
+        weight_map = {name: value for name, value in zip(df.columns, row)}
+        generator_name = weight_map.pop('generator_name')
+        order = int(weight_map.pop('order', 0) or 0)
+        if order:
+            from .ngram import NgramGenerator
+            generators[generator_name] = NgramGenerator(weight_map, order)
+        else:
+            generators[generator_name] = Generator(weight_map)
+    return generators
+
+def write_generators(generators: t.Dict[str, Generator], path: str = GENERATORS_PATH):
+    """Write the weight maps of wordform generators to a CSV file.
+
+    Parameters:
+        generators: Generator name -> generator.
+        path: Path to the generator CSV.
+    """
+    import pandas as pd
+    df = pd.DataFrame.from_records([
+        {'generator_name': generator_name, 'order': getattr(generator, 'order', 0), **generator.weight_map}
+        for generator_name, generator in generators.items()])
+    df.to_csv(path)
+
+def _quote(value: str) -> str:
+    """Quote a non-empty field of the export format."""
+    return '"' + value.replace('"', '""') + '"' if value else ""
+
+def export_verbs(verbs: t.Iterable[Verb], file: t.TextIO):
+    """Write verbs in the entity format of `data/verb-export.csv`.
+
+    The entity of a verb is its URI, or `v:` followed by its English wordform if it has no URI.
+
+    Parameters:
+        verbs: The verbs.
+        file: The text file to write to.
+    """
+    file.write(",".join(["Entity"] + EXPORT_COLUMNS) + "\n")
+    for verb in verbs:
+        entity = verb.uri or VERB_ENTITY_PREFIX + verb.en
+        file.write(",".join([entity] + [_quote(getattr(verb, column)) for column in EXPORT_COLUMNS]) + "\n")
@@ -0,0 +1,154 @@
+"""Precomputed table of the Novan syllables.
+
+Syllables are identified by integer IDs following the order of `nvn.SYLLABLES`, which is also the order of
+`data/syllable-list.txt` and the names of the clips in `nvn-syl/`.
+Sets of syllables are stored as bitsets (Python integers where bit `i` stands for syllable `i`).
+"""
+import typing as t
+from .nvn import SYLLABLES, ALPHABET, cvify, are_compatible, is_valid, syllabify
+
+WAV_PATH = "nvn-syl/{}.wav"
+
+def bitset_ids(bitset: int) -> t.List[int]:
+    """List the IDs of the syllables in a bitset.
+
+    Parameters:
+        bitset: The bitset.
+
+    Returns:
+        The sorted list of IDs.
+    """
+    ids = []
+    while bitset:
+        low_bit = bitset & -bitset
+        ids.append(low_bit.bit_length() - 1)
+        bitset ^= low_bit
+    return ids
+
+class SyllableTable:
+    """Precomputed table of the Novan syllables."""
+
+    syllables: t.List[str]
+    ids: t.Dict[str, int]
+    patterns: t.List[str]
+    valid: int
+    char_masks: t.Dict[str, int]
+    joins: t.List[int]
+
+    def __init__(self, syllables: t.Sequence[str] = SYLLABLES):
+        """Compute the table of a list of syllables.
+
+        Parameters:
+            syllables: The syllables, in the order of their IDs.
+        """
+        self.syllables = list(syllables)
+        self.ids = {syl: i for i, syl in enumerate(self.syllables)}
+        self.patterns = [cvify(syl) for syl in self.syllables]
+
+        # bitset of the syllables valid as a wordform on their own
+        self.valid = sum(1 << i for i, syl in enumerate(self.syllables) if is_valid(syl))
+
+        # character -> bitset of the syllables containing it
+        self.char_masks = {char: 0 for char in ALPHABET}
+        # character -> bitset of the syllables starting with it
+        first_masks = {char: 0 for char in ALPHABET}
+        for i, syl in enumerate(self.syllables):
+            for char in set(syl):
+                self.char_masks[char] |= 1 << i
+            first_masks[syl[0]] |= 1 << i
+
+        # syllable -> bitset of the syllables that may follow it in a wordform
+        # syllables hold at most one consonant on each side of their vowel, so only the two characters around the
+        # boundary can make a join illegal, besides the syllables invalid on their own (such as "hi"), which never join
+        follow_masks = {
+            last: sum(mask for first, mask in first_masks.items() if are_compatible(last, first)) & self.valid
+            for last in ALPHABET}
+        self.joins = [follow_masks[syl[-1]] if self.valid >> i & 1 else 0 for i, syl in enumerate(self.syllables)]
+
+    def __len__(self) -> int:
+        """Return the number of syllables."""
+        return len(self.syllables)
+
+    def encode(self, syllables: t.Iterable[str]) -> t.List[int]:
+        """Convert syllables into IDs.
+
+        Parameters:
+            syllables: The syllables.
+
+        Returns:
+            The IDs of the syllables.
+
+        Raises:
+            KeyError: A syllable is not in the table.
+        """
+        return [self.ids[syl] for syl in syllables]
+
+    def decode(self, ids: t.Iterable[int]) -> t.List[str]:
+        """Convert IDs into syllables.
+
+        Parameters:
+            ids: The IDs of the syllables.
+
+        Returns:
+            The syllables.
+        """
+        return [self.syllables[i] for i in ids]
+
+    def encode_wordform(self, nvn: str) -> t.List[int]:
+        """Syllabify a wordform and convert its syllables into IDs.
+
+        Parameters:
+            nvn: string of characters in Novan corresponding to a wordform.
+
+        Returns:
+            The IDs of the syllables of the wordform, empty for an empty wordform.
+        """
+        return self.encode(syl for syl in syllabify(nvn) if syl)
+
+    def can_join(self, a: int, b: int) -> bool:
+        """Check if syllable `a` can be followed by syllable `b` in a single Novan wordform.
+
+        Matches `is_valid` on the concatenation of the two syllables: a syllable invalid on its own joins no other.
+
+        Parameters:
+            a: The ID of the first syllable.
+            b: The ID of the second syllable.
+
+        Returns:
+            `True` if `a` can be followed by `b`, `False` otherwise.
+        """
+        return bool(self.joins[a] >> b & 1)
+
+    def successors(self, a: int) -> t.List[int]:
+        """List the syllables that can follow a syllable in a single Novan wordform.
+
+        Both the syllable and its successors are valid on their own, see `can_join`.
+
+        Parameters:
+            a: The ID of the syllable.
+
+        Returns:
+            The IDs of the syllables that can follow `a`.
+        """
+        return bitset_ids(self.joins[a])
+
+    def with_char(self, char: str) -> t.List[int]:
+        """List the syllables containing a character.
+
+        Parameters:
+            char: The character.
+
+        Returns:
+            The IDs of the syllables containing `char`.
+        """
+        return bitset_ids(self.char_masks[char])
+
+    def wav_path(self, syllable_id: int) -> str:
+        """Return the path of the audio clip of a syllable.
+
+        Parameters:
+            syllable_id: The ID of the syllable.
+        """
+        return WAV_PATH.format(self.syllables[syllable_id])
+
+SYLLABLE_TABLE = SyllableTable()
@@ -0,0 +1,165 @@
+"""Tokenization and validation of Novan texts, such as descriptions.
+
+Texts are split into words, punctuation marks and unknown characters, whitespace being skipped.
+Texts may be streamed as chunks of any size: the tokenizer carries the word cut at the end of a chunk over to the next
+one, so a corpus is processed in a single linear pass.
+Words are validated and syllabified through a cache, each distinct word being analysed once.
+"""
+import typing as t
+import re
+from functools import lru_cache
+from .nvn import ALPHABET, is_valid, syllabify
+
+WORD = "word"
+PUNCTUATION = "punctuation"
+UNKNOWN = "unknown"
+
+PUNCTUATION_MARKS = ".,;:!?'\"()-"
+TOKEN_PATTERN = re.compile(
+    r"(?P<word>[^\W\d_]+)|(?P<punctuation>[" + re.escape(PUNCTUATION_MARKS) + r"])|(?P<space>\s+)|(?P<unknown>.)",
+    re.DOTALL)
+WORD_CACHE_SIZE = 1 << 16
+
+class Token(t.NamedTuple):
+    """Token of a Novan text."""
+
+    kind: str
+    text: str
+    start: int
+    end: int
+    is_valid: bool = True
+    syllables: t.Tuple[str, ...] = ()
+
+class TextError(t.NamedTuple):
+    """Invalid span of a Novan text."""
+
+    start: int
+    end: int
+    message: str
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def analyse_word(word: str) -> t.Tuple[bool, t.Tuple[str, ...]]:
+    """Validate and syllabify a word, once per distinct word.
+
+    Parameters:
+        word: The word, in lowercase.
+
+    Returns:
+        A tuple `(is_valid, syllables)`, the syllables being empty for an invalid word.
+    """
+    if all(char in ALPHABET for char in word) and is_valid(word):
+        return True, tuple(syllabify(word))
+    return False, ()
+
+def tokenize(text: t.Union[str, t.Iterable[str]]) -> t.Iterator[Token]:
+    """Split a Novan text into tokens.
+
+    Parameters:
+        text: The text, or an iterable of chunks of the text.
+
+    Yields:
+        The word, punctuation and unknown tokens, with their offsets in the whole text.
+    """
+    chunks = [text] if isinstance(text, str) else text
+    carry = ""
+    offset = 0 # offset of the carry in the whole text
+    for chunk in chunks:
+        buffer = carry + chunk
+        position = 0
+        for match in TOKEN_PATTERN.finditer(buffer):
+            kind = match.lastgroup
+            # a word at the end of the chunk may continue in the next one
+            if kind == WORD and match.end() == len(buffer):
+                break
+            position = match.end()
+            if kind != "space":
+                yield _token(kind, match.group(), offset + match.start())
+        carry = buffer[position:]
+        offset += position
+    if carry:
+        for match in TOKEN_PATTERN.finditer(carry):
+            if match.lastgroup != "space":
+                yield _token(match.lastgroup, match.group(), offset + match.start())
+
+def _token(kind: str, text: str, start: int) -> Token:
+    """Create a token, analysing the words."""
+    if kind == WORD:
+        is_valid_word, syllables = analyse_word(text.lower())
+        return Token(kind, text, start, start + len(text), is_valid_word, syllables)
+    return Token(kind, text, start, start + len(text), kind != UNKNOWN)
+
+def check_text(text: t.Union[str, t.Iterable[str]]) -> t.List[TextError]:
+    """Find the invalid spans of a Novan text.
+
+    Parameters:
+        text: The text, or an iterable of chunks of the text.
+
+    Returns:
+        The errors, in the order of the text.
+    """
+    errors = []
+    for token in tokenize(text):
+        if token.is_valid:
+            continue
+        if token.kind == WORD:
+            errors.append(TextError(token.start, token.end, f"Word '{token.text}' is invalid in Novan."))
+        else:
+            errors.append(TextError(token.start, token.end, f"Character '{token.text}' is not used in Novan."))
+    return errors
+
+def is_valid_text(text: str) -> bool:
+    """Check if a text is valid in Novan.
+
+    Parameters:
+        text: The text.
+
+    Returns:
+        `True` if all the words of the text are valid in Novan and it only holds known punctuation, `False`
+        otherwise.
+    """
+    return all(token.is_valid for token in tokenize(text))
+
+def syllabify_text(text: str) -> t.List[t.Tuple[str, ...]]:
+    """Split each word of a Novan text into syllables.
+
+    Parameters:
+        text: The text.
+
+    Returns:
+        The syllables of each word, empty for the invalid words.
+    """
+    return [token.syllables for token in tokenize(text) if token.kind == WORD]
+
+def token_window(text: str, start: int, end: int) -> t.Tuple[int, int]:
+    """Extend a range of a text to the whitespace around it.
+
+    No token spans whitespace, so the window tokenizes as it does within the whole text: after an edit of the range,
+    only the window needs to be checked again.
+
+    Parameters:
+        text: The text.
+        start: The start of the range.
+        end: The end of the range.
+
+    Returns:
+        The start and end of the window.
+    """
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    return start, end
+
+def check_corpus(texts: t.Iterable[t.Tuple[t.Any, str]]) -> t.Iterator[t.Tuple[t.Any, t.List[TextError]]]:
+    """Find the invalid spans of several Novan texts.
+
+    Parameters:
+        texts: `(key, text)` pairs.
+
+    Yields:
+        `(key, errors)` pairs for the texts with errors.
+    """
+    for key, text in texts:
+        errors = check_text(text)
+        if errors:
+            yield key, errors
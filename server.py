@@ -0,0 +1,390 @@
+"""Local HTTP service for the Novan validation, syllabification, generation and pronunciation, without the editor.
+
+The service answers on an asyncio event loop; the generation and the audio rendering, and the large batches, run in a
+pool of worker processes, which load the generators and the lexicon once.
+The answers to the deterministic lookups are cached, and concurrent identical lookups share a single computation.
+
+Endpoints (JSON answers, except the WAV audio):
+    GET  /validate?nvn=kala
+    GET  /syllabify?nvn=kalatu
+    GET  /generate?syllables=2&count=5&generator=Custom&unique=1&min_distance=1&seed=0
+    GET  /pronounce?nvn=kalatu
+    POST /batch/validate     {"nvn": ["kala", "hka"]}
+    POST /batch/syllabify    {"nvn": ["kala", "tuno"]}
+    GET  /health
+
+Examples:
+    python server.py --port 8765
+    curl 'localhost:8765/syllabify?nvn=kalatu'
+    curl -X POST localhost:8765/batch/validate -d '{"nvn": ["kala", "hka"]}'
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import typing as t
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from model.nvn import is_valid, syllabify
+from model.storage import VERBS_PATH, GENERATORS_PATH
+
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 1 << 16 # answers
+BATCH_CHUNK_SIZE = 2000 # wordforms per worker task, smaller batches are answered on the event loop
+MAX_BATCH_SIZE = 1000000
+MAX_GENERATED_COUNT = 1000
+MAX_SYLLABLES = 10 # per generated wordform
+MAX_BODY_SIZE = 64 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+    500: "Internal Server Error"}
+
+JSON = "application/json"
+WAV = "audio/wav"
+Response = t.Tuple[int, str, bytes] # status, content type, body
+
+class RequestError(Exception):
+    """Invalid request, answered with an error status."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+# state of the worker processes
+_WORKER: t.Dict[str, t.Any] = {}
+
+def _init_worker(generators_path: str, data_path: str):
+    """Load the generators and the wordforms of the lexicon in a worker process, training the n-gram generators."""
+    from model.storage import read_generators, read_verbs
+    _WORKER["generators"] = read_generators(generators_path)
+    _WORKER["wordforms"] = [verb.nvn for verb in read_verbs(data_path)]
+    _WORKER["index"] = None
+    for generator in _WORKER["generators"].values():
+        if getattr(generator, "order", 0) > 0:
+            generator.train(_WORKER["wordforms"])
+
+def _generate(name: str, syllables: int, count: int, unique: bool, min_distance: float,
+        seed: t.Optional[int]) -> t.List[str]:
+    """Generate wordforms in a worker process, see `cli.generate`."""
+    generator = _WORKER["generators"].get(name)
+    if generator is None:
+        raise RequestError(f"Unknown generator '{name}', available: {', '.join(_WORKER['generators'])}.")
+    if seed is not None:
+        random.seed(seed)
+
+    neighbours = None
+    forbidden = set()
+    if unique or min_distance > 0:
+        if _WORKER["index"] is None:
+            from model.neighbours import NeighbourIndex
+            _WORKER["index"] = NeighbourIndex((form, None) for form in _WORKER["wordforms"])
+        neighbours = forbidden = _WORKER["index"]
+    generated = []
+    for _ in range(count):
+        try:
+            wordform = generator.generate(syllables, forbidden, neighbours, min_distance)
+        except RuntimeError as e:
+            raise RequestError(str(e))
+        generated.append(wordform)
+    return generated
+
+def _pronounce(nvn: str) -> bytes:
+    """Render the sound of a wordform as WAV in a worker process."""
+    from model.syllables import SYLLABLE_TABLE
+    from model.audio import render
+    sound = render(SYLLABLE_TABLE.encode_wordform(nvn))
+    file = io.BytesIO()
+    sound.export(file, format="wav")
+    return file.getvalue()
+
+def _validate_batch(forms: t.List[str]) -> t.List[bool]:
+    """Validate wordforms."""
+    return [is_valid(form) for form in forms]
+
+def _syllabify_batch(forms: t.List[str]) -> t.List[t.Optional[t.List[str]]]:
+    """Syllabify wordforms, `None` for the invalid ones."""
+    return [syllabify(form) if is_valid(form) else None for form in forms]
+
+def _json(value: t.Any, status: int = 200) -> Response:
+    """Create a JSON response."""
+    return status, JSON, json.dumps(value, ensure_ascii=False).encode()
+
+def _wordform(query: t.Dict[str, t.List[str]]) -> str:
+    """Read the `nvn` parameter of a query."""
+    values = query.get("nvn")
+    if not values:
+        raise RequestError("Missing parameter 'nvn'.")
+    return values[0].lower()
+
+def _parameter(query: t.Dict[str, t.List[str]], name: str, kind: t.Callable[[str], t.Any], default: t.Any) -> t.Any:
+    """Read an optional parameter of a query."""
+    if name not in query:
+        return default
+    try:
+        return kind(query[name][0])
+    except ValueError:
+        raise RequestError(f"Invalid parameter '{name}': '{query[name][0]}'.")
+
+def _flag(value: str) -> bool:
+    """Parse a boolean parameter."""
+    return value.lower() in ("1", "true", "yes")
+
+def _forms(body: bytes) -> t.List[str]:
+    """Read the wordforms of a batch request, `{"nvn": [...]}`."""
+    try:
+        forms = json.loads(body or b"{}").get("nvn")
+    except (ValueError, AttributeError):
+        raise RequestError("The body must be a JSON object.")
+    if not isinstance(forms, list) or not all(isinstance(form, str) for form in forms):
+        raise RequestError("The body must hold a list of wordforms under 'nvn'.")
+    if len(forms) > MAX_BATCH_SIZE:
+        raise RequestError(f"Batches are limited to {MAX_BATCH_SIZE} wordforms.", 413)
+    return [form.lower() for form in forms]
+
+class LookupService:
+    """Endpoints of the service, with a cache of the deterministic answers."""
+
+    executor: ProcessPoolExecutor
+    cache: "OrderedDict[t.Tuple[str, str], asyncio.Future]"
+    cache_size: int
+    hits: int
+    misses: int
+
+    def __init__(self, executor: ProcessPoolExecutor, cache_size: int = CACHE_SIZE):
+        """Create the endpoints of the service.
+
+        Parameters:
+            executor: The pool running the CPU-bound work.
+            cache_size: The maximum number of cached answers.
+        """
+        self.executor = executor
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    async def handle(self, method: str, target: str, body: bytes) -> Response:
+        """Answer a request.
+
+        Parameters:
+            method: The HTTP method.
+            target: The path and query of the request.
+            body: The body of the request.
+
+        Returns:
+            The response.
+        """
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        routes = {
+            ("GET", "/validate"): lambda: self.cached("validate", _wordform(query), self.validate),
+            ("GET", "/syllabify"): lambda: self.cached("syllabify", _wordform(query), self.syllabify),
+            ("GET", "/pronounce"): lambda: self.cached("pronounce", _wordform(query), self.pronounce),
+            ("GET", "/generate"): lambda: self.generate(query),
+            ("POST", "/batch/validate"): lambda: self.batch(_forms(body), _validate_batch, "valid"),
+            ("POST", "/batch/syllabify"): lambda: self.batch(_forms(body), _syllabify_batch, "syllables"),
+            ("GET", "/health"): lambda: self.health(),
+        }
+        route = routes.get((method, url.path))
+        if route is None:
+            if any(path == url.path for _, path in routes):
+                return _json({"error": f"Method {method} not allowed on {url.path}."}, 405)
+            return _json({"error": f"Unknown endpoint {url.path}."}, 404)
+        try:
+            return await route()
+        except RequestError as e:
+            return _json({"error": str(e)}, e.status)
+
+    async def cached(self, endpoint: str, nvn: str, compute: t.Callable[[str], t.Awaitable[Response]]) -> Response:
+        """Answer a deterministic lookup through the cache.
+
+        Parameters:
+            endpoint: The name of the endpoint.
+            nvn: The wordform looked up.
+            compute: Computes the answer of a lookup missing from the cache.
+
+        Returns:
+            The response, shared by the concurrent identical lookups.
+        """
+        key = (endpoint, nvn)
+        future = self.cache.get(key)
+        if future is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = self.cache[key] = asyncio.ensure_future(compute(nvn))
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        try:
+            response = await asyncio.shield(future)
+        except Exception:
+            self.cache.pop(key, None)
+            raise
+        if response[0] != 200:
+            self.cache.pop(key, None)
+        return response
+
+    async def validate(self, nvn: str) -> Response:
+        """Validate a wordform."""
+        return _json({"nvn": nvn, "valid": is_valid(nvn)})
+
+    async def syllabify(self, nvn: str) -> Response:
+        """Split a valid wordform into syllables."""
+        if not is_valid(nvn):
+            raise RequestError(f"Wordform '{nvn}' is invalid in Novan.")
+        return _json({"nvn": nvn, "syllables": syllabify(nvn)})
+
+    async def pronounce(self, nvn: str) -> Response:
+        """Render the sound of a valid wordform."""
+        if not nvn or not is_valid(nvn):
+            raise RequestError(f"Wordform '{nvn}' is invalid in Novan.")
+        loop = asyncio.get_running_loop()
+        try:
+            return 200, WAV, await loop.run_in_executor(self.executor, _pronounce, nvn)
+        except OSError:
+            raise RequestError(f"A syllable of '{nvn}' has no audio clip.", 404)
+
+    async def generate(self, query: t.Dict[str, t.List[str]]) -> Response:
+        """Generate new wordforms."""
+        count = _parameter(query, "count", int, 1)
+        if not 0 < count <= MAX_GENERATED_COUNT:
+            raise RequestError(f"Parameter 'count' must be between 1 and {MAX_GENERATED_COUNT}.")
+        syllables = _parameter(query, "syllables", int, 1)
+        if not 0 < syllables <= MAX_SYLLABLES:
+            raise RequestError(f"Parameter 'syllables' must be between 1 and {MAX_SYLLABLES}.")
+        arguments = (
+            _parameter(query, "generator", str, "Custom"),
+            syllables,
+            count,
+            _parameter(query, "unique", _flag, False),
+            _parameter(query, "min_distance", float, 0.),
+            _parameter(query, "seed", int, None))
+        loop = asyncio.get_running_loop()
+        return _json({"wordforms": await loop.run_in_executor(self.executor, _generate, *arguments)})
+
+    async def batch(self, forms: t.List[str], function: t.Callable[[t.List[str]], t.List[t.Any]],
+            name: str) -> Response:
+        """Apply a function to a batch of wordforms, in chunks spread over the workers for large batches."""
+        if len(forms) <= BATCH_CHUNK_SIZE:
+            results = function(forms)
+        else:
+            loop = asyncio.get_running_loop()
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, function, forms[start:start + BATCH_CHUNK_SIZE])
+                for start in range(0, len(forms), BATCH_CHUNK_SIZE)))
+            results = [result for chunk in chunks for result in chunk]
+        return _json({"nvn": forms, name: results})
+
+    async def health(self) -> Response:
+        """Report the state of the service."""
+        return _json({"status": "ok", "cached": len(self.cache), "hits": self.hits, "misses": self.misses})
+
+async def _read_request(reader: asyncio.StreamReader) -> t.Optional[t.Tuple[str, str, t.Dict[str, str], bytes]]:
+    """Read an HTTP/1.1 request, `None` once the client closed the connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise RequestError("Malformed request line.")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError("Malformed Content-Length.")
+    if length > MAX_BODY_SIZE:
+        raise RequestError("Request body too large.", 413)
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        return None
+    return method, target, headers, body
+
+def _write_response(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+    """Write an HTTP/1.1 response."""
+    status, content_type, body = response
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+
+async def serve(service: LookupService, host: str = HOST, port: int = PORT):
+    """Serve the endpoints until cancelled.
+
+    Parameters:
+        service: The endpoints.
+        host: The interface to listen on.
+        port: The port to listen on.
+    """
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except RequestError as e:
+                    _write_response(writer, _json({"error": str(e)}, e.status), False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    response = await service.handle(method, target, body)
+                except Exception as e:
+                    print(f"Error on {method} {target}: {e!r}", file=sys.stderr)
+                    response = _json({"error": "Internal error."}, 500)
+                _write_response(writer, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    print(f"Serving on http://{host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    """Run the service.
+
+    Parameters:
+        argv: The arguments, `sys.argv[1:]` if not provided.
+
+    Returns:
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST, help="interface to listen on")
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="maximum number of cached answers")
+    parser.add_argument("--data", default=VERBS_PATH, help="path to the verb data CSV")
+    parser.add_argument("--generators", default=GENERATORS_PATH, help="path to the generator CSV")
+    args = parser.parse_args(argv)
+
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.generators, args.data)) as executor:
+        try:
+            asyncio.run(serve(LookupService(executor, args.cache_size), args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Measure the cold-start time of a command, such as the CLI or its PyInstaller build.
+
+Examples:
+    python startup_time.py
+    python startup_time.py -r 20 dist/cli validate kala
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_COMMAND = [sys.executable, "cli.py", "validate", "kala"]
+RUNS = 10
+
+def measure(command, runs: int = RUNS):
+    """Run a command several times and measure its wall-clock duration.
+
+    Parameters:
+        command: The command and its arguments.
+        runs: The number of runs.
+
+    Returns:
+        The durations of the runs, in seconds.
+
+    Raises:
+        subprocess.CalledProcessError: The command failed.
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--runs", type=int, default=RUNS, help="number of runs")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="command to measure, the Python CLI by default")
+    args = parser.parse_args()
+
+    durations = measure(args.command or DEFAULT_COMMAND, args.runs)
+    print(f"{' '.join(args.command or DEFAULT_COMMAND)}: "
+        f"first {durations[0] * 1000:.0f} ms, "
+        f"median {statistics.median(durations) * 1000:.0f} ms, "
+        f"min {min(durations) * 1000:.0f} ms, "
+        f"max {max(durations) * 1000:.0f} ms over {len(durations)} runs")
@@ -1,25 +1,175 @@
 """Text class adapted to handle variables."""
-from tkinter import StringVar, END, Text
+from tkinter import StringVar, Text
+import typing as t
+
+def common_prefix_length(a: str, b: str) -> int:
+    """Compute the length of the longest common prefix of two strings.
+
+    The comparisons are done on slices, by bisection, to keep the loop out of Python.
+    """
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def common_suffix_length(a: str, b: str, limit: int) -> int:
+    """Compute the length of the longest common suffix of two strings, up to `limit` characters."""
+    low, high = 0, min(len(a), len(b), limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def diff_range(old: str, new: str) -> t.Tuple[int, int, int]:
+    """Compute the smallest range to replace in `old` to obtain `new`.
+
+    Parameters:
+        old: The previous string.
+        new: The new string.
+
+    Returns:
+        A tuple `(start, old_end, new_end)` such that `old[:start] + new[start:new_end] + old[old_end:] == new`.
+    """
+    start = common_prefix_length(old, new)
+    suffix = common_suffix_length(old, new, min(len(old), len(new)) - start)
+    return start, len(old) - suffix, len(new) - suffix
 
 class VarText(Text):
-    """Text class adapted to handle variables."""
-    
+    """Text class adapted to handle variables.
+
+    Updates of the variable only replace the modified range of the text, which keeps the cursor, the selection and the
+    undo history, and updates of the text are not echoed back from the variable to the text.
+    The widget command is wrapped (like `idlelib.redirector`) so that the inserted and deleted ranges are known without
+    reading or diffing the whole text: a keystroke costs the size of the edit, not of the text.
+    """
+
     variable: StringVar
+    text: str # content of the widget, without the trailing newline
+    edited_range: t.Optional[t.Tuple[int, int]] # range of `text` edited since `take_edited_range`
 
     def __init__(self, *args, variable=None, **kwargs):
         """Create a text adapted to handle variables."""
         super().__init__(*args, **kwargs)
         self.variable = variable
+        self.text = ""
+        self.edited_range = None
+        self._is_syncing = False
+        self._is_stale = False
+
+        # route the commands of the widget through `_dispatch`
+        self._command = self._w + "_orig"
+        self.tk.call("rename", self._w, self._command)
+        self.tk.createcommand(self._w, self._dispatch)
 
         if variable is not None:
             # bind the stringvar and the text
-            self.bind('<KeyRelease>', self.set_stringvar)
+            self.bind('<<Modified>>', self.set_stringvar, add='+')
             self.variable.trace("w", self.get_stringvar)
-        
+            self.get_stringvar()
+
+    def destroy(self):
+        """Destroy the widget and its command wrapper."""
+        super().destroy()
+        self.tk.deletecommand(self._w)
+
+    def take_edited_range(self) -> t.Optional[t.Tuple[int, int]]:
+        """Return the range of the text edited since the previous call, `None` if the text did not change."""
+        edited_range, self.edited_range = self.edited_range, None
+        return edited_range
+
     def get_stringvar(self, *args):
         """Fire when the StringVar gets updated."""
-        self.replace("1.0", END, self.variable.get())
+        if self._is_syncing:
+            return
+        self._refresh_text()
+        new = self.variable.get()
+        if new == self.text:
+            return
+
+        start, old_end, new_end = diff_range(self.text, new)
+        self._is_syncing = True
+        try:
+            if old_end > start:
+                self.delete(f"1.0 + {start} chars", f"1.0 + {old_end} chars")
+            if new_end > start:
+                self.insert(f"1.0 + {start} chars", new[start:new_end])
+        finally:
+            self._is_syncing = False
+        self._edit(start, old_end, new[start:new_end])
+        self.edit_modified(False)
 
     def set_stringvar(self, *args):
         """Fire when the text gets updated."""
-        self.variable.set(self.get("1.0", END))
+        # resetting the modified flag fires the event again
+        if self._is_syncing or not self.edit_modified():
+            return
+        self._refresh_text()
+        if self.text != self.variable.get():
+            self._is_syncing = True
+            try:
+                self.variable.set(self.text)
+            finally:
+                self._is_syncing = False
+        self.edit_modified(False)
+
+    def _dispatch(self, operation: str, *args) -> str:
+        """Run a command of the widget, recording the edits of the text."""
+        if self._is_syncing or operation not in ("insert", "delete", "replace", "edit"):
+            return self.tk.call(self._command, operation, *args)
+
+        if operation == "edit":
+            if args and args[0] in ("undo", "redo"):
+                # the undone edits do not go through the widget command
+                self._is_stale = True
+            return self.tk.call(self._command, operation, *args)
+
+        if operation == "delete" and len(args) > 2:
+            # several ranges are deleted at once
+            self._is_stale = True
+            return self.tk.call(self._command, operation, *args)
+
+        start = self._offset(args[0])
+        if operation == "insert":
+            end, inserted = start, "".join(args[1::2])
+        else:
+            end = self._offset(args[1]) if len(args) > 1 else start + 1
+            end = max(start, min(len(self.text), end))
+            inserted = "".join(args[2::2]) if operation == "replace" else ""
+        result = self.tk.call(self._command, operation, *args)
+        self._edit(start, end, inserted)
+        return result
+
+    def _offset(self, index: str) -> int:
+        """Convert an index of the widget into an offset in `text`."""
+        count = self.tk.call(self._command, "count", "-chars", "1.0", index)
+        # the trailing newline cannot be edited
+        return max(0, min(len(self.text), int(count or 0)))
+
+    def _edit(self, start: int, end: int, inserted: str):
+        """Replace a range of `text` and extend `edited_range` to cover it."""
+        if end == start and not inserted:
+            return
+        self.text = self.text[:start] + inserted + self.text[end:]
+        new_end = start + len(inserted)
+        if self.edited_range is None:
+            self.edited_range = (start, new_end)
+        else:
+            # move the previous range along the edit
+            shift = lambda offset: offset if offset <= start else offset + new_end - end if offset >= end else new_end
+            edited_start, edited_end = self.edited_range
+            self.edited_range = (min(shift(edited_start), start), max(shift(edited_end), new_end))
+
+    def _refresh_text(self):
+        """Read the whole text again after edits which could not be recorded."""
+        if self._is_stale:
+            self._is_stale = False
+            text = self.get("1.0", "end-1c")
+            start, old_end, new_end = diff_range(self.text, text)
+            self._edit(start, old_end, text[start:new_end])
@@ -0,0 +1,200 @@
+"""Listbox class adapted to display very long lists."""
+from tkinter import Listbox, END
+import typing as t
+
+class VirtualListbox(Listbox):
+    """Listbox class adapted to display very long lists.
+
+    Only the rows currently in view are materialized in the Tk widget, the others are fetched from `row_getter`
+    when scrolled into view.
+    The `yview` scrolling protocol is implemented over the full list, so that the widget can be bound to a scrollbar
+    like a normal listbox.
+    """
+
+    row_count: int
+    row_getter: t.Callable[[int], str]
+    first_row: int
+    selected_row: t.Optional[int]
+
+    def __init__(self, *args, **kwargs):
+        """Create a listbox adapted to display very long lists."""
+        self.row_count = 0
+        self.row_getter = lambda row: ""
+        self.first_row = 0
+        self.selected_row = None
+        self._yscrollcommand = kwargs.pop("yscrollcommand", None)
+        kwargs["selectmode"] = "browse"
+        super().__init__(*args, **kwargs)
+
+        self.bind("<Configure>", lambda event: self.render())
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.bind("<Up>", lambda event: self._move_selection(-1))
+        self.bind("<Down>", lambda event: self._move_selection(1))
+        self.bind("<Prior>", lambda event: self._move_selection(-self.visible_rows()))
+        self.bind("<Next>", lambda event: self._move_selection(self.visible_rows()))
+
+    def configure(self, cnf=None, **kwargs):
+        """Configure the listbox, keeping the scroll command for the virtual list."""
+        if isinstance(cnf, dict) and "yscrollcommand" in cnf:
+            cnf = dict(cnf)
+            self._yscrollcommand = cnf.pop("yscrollcommand")
+        if "yscrollcommand" in kwargs:
+            self._yscrollcommand = kwargs.pop("yscrollcommand")
+        result = super().configure(cnf, **kwargs)
+        self._notify_scroll()
+        return result
+
+    config = configure
+
+    def set_rows(self, row_count: int, row_getter: t.Callable[[int], str]):
+        """Replace the rows displayed by the listbox.
+
+        Parameters:
+            row_count: The number of rows of the list.
+            row_getter: A function returning the label of a row from its index.
+        """
+        self._sync_selection()
+        super().selection_clear(0, END)
+        self.row_count = row_count
+        self.row_getter = row_getter
+        if self.selected_row is not None and self.selected_row >= row_count:
+            self.selected_row = None
+        self.render()
+
+    def render(self):
+        """Materialize the rows currently in view."""
+        visible = self.visible_rows()
+        self._set_first_row(self.first_row)
+        last_row = min(self.row_count, self.first_row + visible)
+
+        super().delete(0, END)
+        if last_row > self.first_row:
+            super().insert(0, *(self.row_getter(row) for row in range(self.first_row, last_row)))
+        if self.selected_row is not None and self.first_row <= self.selected_row < last_row:
+            super().selection_set(self.selected_row - self.first_row)
+        self._notify_scroll()
+
+    def visible_rows(self) -> int:
+        """Compute the number of rows fitting in the widget."""
+        height = self.winfo_height()
+        if height <= 1:
+            # not mapped yet
+            return int(self.cget("height"))
+        border = 2 * (int(self.cget("borderwidth")) + int(self.cget("highlightthickness")))
+        linespace = int(self.tk.call("font", "metrics", self.cget("font"), "-linespace"))
+        pitch = linespace + 1 + 2 * int(self.cget("selectborderwidth"))
+        return max(1, (height - border) // pitch)
+
+    def select(self, row: t.Optional[int]):
+        """Select a row and scroll it into view.
+
+        Parameters:
+            row: The index of the row to select, `None` to clear the selection.
+        """
+        self.selected_row = row
+        super().selection_clear(0, END)
+        if row is not None:
+            self._scroll_into_view(row)
+        self.render()
+
+    def see(self, row: int):
+        """Scroll the list so that a row is visible.
+
+        Parameters:
+            row: The index of the row to show.
+        """
+        self._scroll_into_view(row)
+        self.render()
+
+    def curselection(self) -> t.Tuple[int, ...]:
+        """Return the indices of the selected rows in the full list."""
+        self._sync_selection()
+        return () if self.selected_row is None else (self.selected_row,)
+
+    def size(self) -> int:
+        """Return the number of rows of the full list."""
+        return self.row_count
+
+    def get(self, first, last=None):
+        """Return the label of a row or the labels of a range of rows of the full list."""
+        if last is None:
+            return self.row_getter(int(first))
+        last = self.row_count - 1 if last == END else int(last)
+        return tuple(self.row_getter(row) for row in range(int(first), last + 1))
+
+    def yview(self, *args):
+        """Query or change the vertical position of the view, over the full list."""
+        if not args:
+            if self.row_count == 0:
+                return (0.0, 1.0)
+            return (self.first_row / self.row_count,
+                min(1.0, (self.first_row + self.visible_rows()) / self.row_count))
+
+        if args[0] == "moveto":
+            self._set_first_row(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows()
+            self._set_first_row(self.first_row + amount)
+        else:
+            self.see(int(args[0]))
+        self.render()
+
+    def yview_moveto(self, fraction: float):
+        """Adjust the view so that `fraction` of the full list is off-screen to the top."""
+        self.yview("moveto", fraction)
+
+    def yview_scroll(self, number: int, what: str):
+        """Shift the view by `number` units or pages."""
+        self.yview("scroll", number, what)
+
+    def _sync_selection(self):
+        """Read the selection made in the materialized rows, if any."""
+        local = super().curselection()
+        if local:
+            self.selected_row = self.first_row + int(local[0])
+
+    def _set_first_row(self, row: int):
+        """Move the first row of the view, without rendering.
+
+        The selection made in the materialized rows is read first and then cleared, as its local index refers to the
+        previous first row.
+        """
+        self._sync_selection()
+        super().selection_clear(0, END)
+        self.first_row = max(0, min(row, self.row_count - self.visible_rows()))
+
+    def _scroll_into_view(self, row: int):
+        """Move the first row of the view so that a row is visible, without rendering."""
+        visible = self.visible_rows()
+        if row < self.first_row:
+            self._set_first_row(row)
+        elif row >= self.first_row + visible:
+            self._set_first_row(row - visible + 1)
+
+    def _notify_scroll(self):
+        """Send the position of the view over the full list to the scroll command."""
+        if callable(self._yscrollcommand):
+            self._yscrollcommand(*self.yview())
+
+    def _scroll_by(self, amount: int):
+        """Scroll by a number of rows."""
+        self.yview("scroll", amount, "units")
+        return "break"
+
+    def _on_mousewheel(self, event):
+        """Scroll with the mouse wheel."""
+        return self._scroll_by(-1 if event.delta > 0 else 1)
+
+    def _move_selection(self, amount: int):
+        """Move the selection by a number of rows with the keyboard."""
+        if self.row_count == 0:
+            return "break"
+        self._sync_selection()
+        row = 0 if self.selected_row is None else self.selected_row + amount
+        self.select(max(0, min(self.row_count - 1, row)))
+        self.event_generate("<<ListboxSelect>>")
+        return "break"